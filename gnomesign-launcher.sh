@@ -2,7 +2,6 @@
 # sets path for application modules in Python
 export PYTHONPATH=/app/share/gnomesign
 
-# runs the application main script
-cd /app/share/gnomesign
-exec python3 main.py "$@"
+# runs the application main script (without changing directory, so relative paths given on the command line keep working)
+exec python3 /app/share/gnomesign/main.py "$@"
 
@@ -0,0 +1,1067 @@
+# application.py
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+gi.require_version("Secret", "1")
+from gi.repository import Gtk, Adw, Gio, Secret, GLib, GObject
+import fitz, os, cairo, threading, time
+from datetime import datetime
+from io import BytesIO
+from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+from pyhanko.sign import signers, fields
+from pyhanko.sign.signers.pdf_signer import PdfSigner, PdfSignatureMetadata
+from pyhanko.keys.internal import (
+    translate_pyca_cryptography_key_to_asn1,
+    translate_pyca_cryptography_cert_to_asn1
+)
+from pyhanko_certvalidator.registry import SimpleCertificateStore
+
+from i18n import I18NManager
+from certificate_manager import CertificateManager, KEYRING_SCHEMA
+from config_manager import ConfigManager
+from ui.dialogs import create_password_dialog, create_about_dialog, show_error_dialog
+from stamp_creator import StampAppearanceCache, pango_to_html
+from signature_validator import SignatureValidationJob, SignatureValidationEngine, ValidationSettings, DeepVerificationJob
+from validation_cache import ValidationCache
+from stamp_cache import StampCache
+from stamp_template import compile_template
+from document_source import DocumentSource
+from render_service import RenderService
+from display_list_cache import DisplayListCache
+from thumbnail_store import ThumbnailStore
+from incremental_update import is_incremental_successor, unchanged_pages
+
+PRINT_DPI = 300
+
+def is_running_in_flatpak():
+    """Checks if the application is running inside a Flatpak sandbox."""
+    return os.getenv('FLATPAK_ID') is not None
+
+class SearchResult:
+    """A data class to hold information about a single text search result."""
+    def __init__(self, page_num, rect, context):
+        self.page_num = page_num
+        self.rect = rect
+        self.context = context
+
+class GnomeSign(Adw.Application):
+    """The main application class, managing state and high-level logic."""
+    __gsignals__ = {
+        'language-changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+        'certificates-changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+        'document-changed': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+        'page-changed': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT, GObject.TYPE_INT, GObject.TYPE_INT, GObject.TYPE_BOOLEAN)),
+        'signature-state-changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+        'signatures-found': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+        'toast-request': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_STRING, GObject.TYPE_STRING, GObject.TYPE_PYOBJECT)),
+        'highlight-rect-changed': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+        'search-highlights-updated': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+        'search-result-selected': (GObject.SignalFlags.RUN_FIRST, None, (GObject.TYPE_PYOBJECT,)),
+    }
+
+    def __init__(self):
+        """Initializes the application."""
+        super().__init__(application_id="io.github.ppgllrd.GNOME-Sign", flags=Gio.ApplicationFlags.HANDLES_OPEN)
+        self.config = ConfigManager()
+        self.i18n = I18NManager()
+        self.cert_manager = CertificateManager()
+        self.doc, self.current_page, self.active_cert_path = None, 0, None
+        self.page, self.current_file_path = None, None
+        self.document_source = None
+        self.display_lists = None
+        self.stamp_appearances = StampAppearanceCache()
+        self.thumbnail_store, self.thumbnail_pack = None, None
+        self.document_digest, self.predecessor, self.unchanged_pages = None, None, set()
+        self.signature_rect, self.is_dragging_rect = None, False
+        self.signature_page = None
+        self.drag_offset_x, self.drag_offset_y = 0, 0
+        self.start_x, self.start_y, self.end_x, self.end_y = -1, -1, -1, -1
+        self.highlight_rect = None
+        self.window, self.preferences_window = None, None
+        self.signatures = []
+        self.validation_job, self.validation_engine = None, None
+        self.render_service = None
+        self.deep_verification_job = None
+        self._stamp_content = None
+        self.search_results = []
+        self.search_highlights_on_page = []
+        self.current_search_result_index = -1
+    
+    def _(self, key):
+        """A shorthand for the translation function."""
+        return self.i18n._(key)
+    
+    def do_startup(self):
+        """Called when the application is starting up."""
+        Adw.Application.do_startup(self)
+        self.config.load()
+        self.i18n.set_language(self.config.get_language())
+        self.cert_manager.set_cert_paths(self.config.get_cert_paths())
+        self.cert_manager.set_session_ttl(self.config.get_credential_session_ttl())
+        validation_cache = ValidationCache(os.path.join(self.config.get_config_dir(), "validation_cache"))
+        self.validation_engine = SignatureValidationEngine(self.config.get_validation_workers(), cache=validation_cache, settings=self.get_validation_settings())
+        self.render_service = RenderService(self.config.get_render_workers())
+        self.stamp_appearances.store = StampCache(os.path.join(self.config.get_cache_dir(), "stamps"))
+        self.stamp_appearances.backend = self.config.get_stamp_backend()
+        self.thumbnail_store = ThumbnailStore(os.path.join(self.config.get_cache_dir(), "thumbnails"), self.config.get_thumbnail_cache_size() * 1024 * 1024)
+        quit_action = Gio.SimpleAction.new("quit", None)
+        quit_action.connect("activate", lambda action, param: self.quit())
+        self.add_action(quit_action)
+        self._build_actions()
+
+        self.set_accels_for_action("app.open", ["<Primary>o"])
+        self.set_accels_for_action("app.sign", ["<Primary>s"])
+        self.set_accels_for_action("app.print", ["<Primary>p"])
+        self.set_accels_for_action("app.preferences", ["<Primary>comma"])
+        self.set_accels_for_action("app.quit", ["<Primary>q"])
+        self.set_accels_for_action("app.toggle_search", ["<Primary>f"])
+        self.set_accels_for_action("app.zoom_in", ["<Primary>plus", "<Primary>equal", "<Primary>KP_Add"])
+        self.set_accels_for_action("app.zoom_out", ["<Primary>minus", "<Primary>KP_Subtract"])
+        self.set_accels_for_action("app.zoom::fit-width", ["<Primary>0"])
+
+        self.active_cert_path = self.config.get_active_cert_path()
+        from ui.app_window import AppWindow
+        self.window = AppWindow(application=self)
+        self.window.sidebar.connect("signature-selected", self.on_signature_selected)
+        self.window.connect("close-request", self._on_window_close_request)
+        self.window.connect("notify::is-active", lambda window, param: window.is_active() and self.reload_if_changed())
+        self.connect("shutdown", self._on_shutdown)
+
+    def _on_window_close_request(self, window):
+        """Handles the main window close request."""
+        self.quit()
+        return True
+
+    def _on_shutdown(self, app):
+        """Saves the configuration when the application is shutting down."""
+        self._cancel_signature_validation()
+        self.cert_manager.lock()
+        if self.stamp_appearances.store: self.stamp_appearances.store.flush()
+        self.validation_engine.shutdown()
+        self.render_service.shutdown()
+        self.config.save()
+    
+    def do_activate(self):
+        """Called when the application is activated (e.g., launched from the desktop)."""
+        self.window.present()
+    
+    def do_open(self, files, n_files, hint):
+        """Handles opening files passed as arguments to the application."""
+        if n_files > 0 and files[0].get_path():
+            self.open_file_path(files[0].get_path())
+        self.do_activate()
+    
+    def _build_actions(self):
+        """Creates and adds application-wide actions."""
+        actions_with_params = [("open_recent", self.on_open_recent_clicked, "s"), ("change_lang", self.on_lang_change_state, 's', self.i18n.get_language())]
+        for name, callback, p_type, *state in actions_with_params:
+            action = Gio.SimpleAction.new_stateful(name, GLib.VariantType(p_type), GLib.Variant(p_type, state[0])) if state else Gio.SimpleAction.new(name, GLib.VariantType(p_type))
+            if state: action.connect("change-state", callback)
+            else: action.connect("activate", callback)
+            self.add_action(action)
+
+        toggle_search_action = Gio.SimpleAction.new_stateful("toggle_search", None, GLib.Variant('b', False))
+        toggle_search_action.connect("activate", self.on_toggle_search_activate)
+        toggle_search_action.connect("change-state", self.on_toggle_search_state_change)
+        toggle_search_action.set_enabled(False)
+        self.add_action(toggle_search_action)
+
+        continuous_scroll_action = Gio.SimpleAction.new_stateful("continuous_scroll", None, GLib.Variant('b', self.config.get_continuous_scroll()))
+        continuous_scroll_action.connect("change-state", self.on_continuous_scroll_state_change)
+        self.add_action(continuous_scroll_action)
+
+        zoom_action = Gio.SimpleAction.new_stateful("zoom", GLib.VariantType('s'), GLib.Variant('s', 'fit-width'))
+        zoom_action.connect("change-state", self.on_zoom_change_state)
+        zoom_action.set_enabled(False)
+        self.add_action(zoom_action)
+        for name, callback in (("zoom_in", lambda action, param: self.window.zoom_in()), ("zoom_out", lambda action, param: self.window.zoom_out())):
+            action = Gio.SimpleAction.new(name, None)
+            action.connect("activate", callback)
+            action.set_enabled(False)
+            self.add_action(action)
+
+        action_open = Gio.SimpleAction.new("open", None)
+        action_open.connect("activate", self.on_open_pdf_clicked)
+        self.add_action(action_open)
+
+        action_sign = Gio.SimpleAction.new("sign", None)
+        action_sign.connect("activate", self.on_sign_document_clicked)
+        action_sign.set_enabled(False) 
+        self.add_action(action_sign)
+
+        action_print = Gio.SimpleAction.new("print", None)
+        action_print.connect("activate", self.on_print_clicked)
+        action_print.set_enabled(False)
+        self.add_action(action_print)
+
+        action_show_sigs = Gio.SimpleAction.new("show_signatures", None)
+        action_show_sigs.connect("activate", self.on_show_signatures_clicked)
+        action_show_sigs.set_enabled(False) 
+        self.add_action(action_show_sigs)
+        
+        action_prefs = Gio.SimpleAction.new("preferences", None)
+        action_prefs.connect("activate", self.on_preferences_clicked)
+        self.add_action(action_prefs)
+
+        action_manage_certs = Gio.SimpleAction.new("manage_certs", None)
+        action_manage_certs.connect("activate", self.on_preferences_clicked)
+        self.add_action(action_manage_certs)
+
+        action_edit_stamps = Gio.SimpleAction.new("edit_stamps", None)
+        action_edit_stamps.connect("activate", self.on_edit_stamps_clicked)
+        self.add_action(action_edit_stamps)
+        
+        action_about = Gio.SimpleAction.new("about", None)
+        action_about.connect("activate", self.on_about_clicked)
+        self.add_action(action_about)  
+
+    def open_file_path(self, file_path, show_toast=True):
+        """Opens a PDF document, analyzes it for signatures, and updates the application state."""
+        try:
+            if not os.path.exists(file_path): raise FileNotFoundError(f"File not found: {file_path}")
+            self._cancel_signature_validation()
+            document_source = DocumentSource(file_path)
+            try: doc = fitz.open(stream=document_source.buffer(), filetype="pdf")
+            except Exception:
+                document_source.close()
+                raise
+            unchanged = self._find_unchanged_pages(document_source, doc)
+            predecessor = (self.document_digest, self.document_source.size) if unchanged and self.document_digest else None
+            self._close_document_source()
+            self.unchanged_pages, self.predecessor = unchanged, predecessor
+
+            self.clear_search()
+            self.signatures = []
+
+            self.document_source, self.doc = document_source, doc
+            self.current_file_path = file_path; self.current_page = 0
+            self.display_lists = DisplayListCache(self.doc)
+            self.config.add_recent_file(file_path); self.config.set_last_folder(os.path.dirname(file_path))
+
+            self.emit("document-changed", self.doc)
+            self.reset_signature_state(); self.display_page(0)
+            self._update_actions_state()
+            self._start_signature_validation(file_path, show_toast)
+            self._open_thumbnail_pack(self.document_source)
+
+        except Exception as e:
+            show_error_dialog(self.window, self._("error"), self._("open_pdf_error").format(e))
+            self._close_document_source()
+            self.doc = None; self.signatures = []
+            self.emit("document-changed", None)
+
+    def _find_unchanged_pages(self, document_source, doc):
+        """
+        Returns the pages of a document being opened that render as in the current one, when it is an
+        incremental update of it saved to another file (e.g. its signed copy), so their rendered tiles and
+        thumbnails can be kept. Re-opening the same path is excluded, as the old mapping may see the new contents.
+        The objects each page reaches are compared byte for byte, which is all the tiles need; that the old file
+        is a prefix of the new one is checked in the background (see _open_thumbnail_pack) before stored
+        thumbnails are copied, so the main thread never reads the whole file.
+        """
+        if not (self.doc and self.document_source) or os.path.abspath(document_source.file_path) == os.path.abspath(self.document_source.file_path): return set()
+        if document_source.size <= self.document_source.size: return set()
+        try:
+            return unchanged_pages(self.doc, doc)
+        except Exception as e:
+            print(f"Error comparing document revisions: {e}")
+            return set()
+
+    def _open_thumbnail_pack(self, document_source):
+        """
+        Hashes the document in the background (once: validation shares the source's digest) and then attaches its stored
+        thumbnails to the sidebar. If it may be an incremental update of the previous document, its prefix is checked
+        against that document's digest there too.
+        """
+        predecessor = self.predecessor
+        def run():
+            try:
+                digest = document_source.digest()
+                successor = predecessor is not None and is_incremental_successor(*predecessor, document_source)
+            except Exception as e:
+                print(f"Error hashing document for thumbnails: {e}")
+                return
+            GLib.idle_add(self._on_document_digest, document_source, digest, successor)
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_document_digest(self, document_source, digest, successor):
+        """Main-loop handler for the digest of an opened document; ignored if another document was opened since."""
+        if document_source is self.document_source and self.thumbnail_store:
+            self.document_digest = digest
+            self.thumbnail_pack = self.thumbnail_store.open_pack(digest)
+            if self.thumbnail_pack and successor and self.unchanged_pages:
+                self.thumbnail_store.copy_pages(self.predecessor[0], self.thumbnail_pack, self.unchanged_pages)
+            if self.window: self.window.sidebar.set_thumbnail_pack(self.thumbnail_pack)
+        return GLib.SOURCE_REMOVE
+
+    def _close_document_source(self):
+        """Closes the current document and releases its memory-mapped source."""
+        self.display_lists = None
+        self.document_digest, self.predecessor, self.unchanged_pages = None, None, set()
+        if self.thumbnail_pack:
+            if self.window: self.window.sidebar.set_thumbnail_pack(None)
+            self.thumbnail_pack.close(); self.thumbnail_pack = None
+        if self.doc: self.doc.close()
+        if self.document_source:
+            self.document_source.close()
+            self.document_source = None
+
+    def reload_if_changed(self):
+        """Re-opens the current document if its file was modified on disk; returns True if it was."""
+        if not (self.document_source and self.document_source.is_stale()): return False
+        if os.path.exists(self.current_file_path): self.open_file_path(self.current_file_path, show_toast=False)
+        else: self.display_page(-1)
+        return True
+
+    def _start_signature_validation(self, file_path, show_toast):
+        """Starts validating the document's signatures in the background; results arrive one by one."""
+        self.validation_job = SignatureValidationJob(
+            file_path, self.validation_engine,
+            on_signature=lambda job, details: GLib.idle_add(self._on_signature_validated, job, details),
+            on_finished=lambda job: GLib.idle_add(self._on_signature_validation_finished, job, show_toast)
+        )
+        if self.window: self.window.activity_spinner.start()
+        self.validation_job.start()
+
+    def _cancel_signature_validation(self):
+        """Cancels the validation and deep verification of the previously opened document, if still running."""
+        if self.validation_job:
+            self.validation_job.cancel()
+            self.validation_job = None
+        self._cancel_deep_verification()
+        if self.window: self.window.activity_spinner.stop()
+
+    def _on_signature_validated(self, job, sig_details):
+        """Main-loop handler for a single validated signature; ignores results from stale jobs."""
+        if job is self.validation_job:
+            self.signatures.append(sig_details)
+            self.emit("signatures-found", self.signatures)
+            self._update_actions_state()
+        return GLib.SOURCE_REMOVE
+
+    def _on_signature_validation_finished(self, job, show_toast):
+        """Main-loop handler called once every signature of the document has been validated."""
+        if job is self.validation_job:
+            self.validation_job = None
+            if self.window: self.window.activity_spinner.stop()
+            if not self.signatures and self.active_cert_path and show_toast:
+                self.emit("toast-request", self._("toast_select_area"), None, None)
+            if self.signatures and self.config.get_deep_verification():
+                self._start_deep_verification(job.file_path)
+        return GLib.SOURCE_REMOVE
+
+    def _start_deep_verification(self, file_path):
+        """Starts the background difference analysis of every signed revision of the document."""
+        self.deep_verification_job = DeepVerificationJob(
+            file_path, self.validation_engine, len(self.signatures),
+            on_progress=lambda job, index, total, level: GLib.idle_add(self._on_deep_verification_progress, job, index, total, level),
+            on_finished=lambda job: GLib.idle_add(self._on_deep_verification_finished, job)
+        )
+        if self.window:
+            self.window.activity_spinner.set_tooltip_text(self._("deep_verification_progress").format(0, len(self.signatures)))
+            self.window.activity_spinner.start()
+        self.deep_verification_job.start()
+
+    def _cancel_deep_verification(self):
+        """Cancels the running deep verification, if any."""
+        if self.deep_verification_job:
+            self.deep_verification_job.cancel()
+            self.deep_verification_job = None
+        if self.window:
+            self.window.activity_spinner.set_tooltip_text(None)
+            self.window.activity_spinner.stop()
+
+    def _on_deep_verification_progress(self, job, index, total, level):
+        """Main-loop handler for one analyzed revision; records its modification level on the signature."""
+        if job is self.deep_verification_job and index < len(self.signatures):
+            self.signatures[index].modification_level = level
+            if self.window: self.window.activity_spinner.set_tooltip_text(self._("deep_verification_progress").format(index + 1, total))
+        return GLib.SOURCE_REMOVE
+
+    def _on_deep_verification_finished(self, job):
+        """Main-loop handler called once every signed revision has been analyzed."""
+        if job is self.deep_verification_job:
+            self.deep_verification_job = None
+            if self.window:
+                self.window.activity_spinner.set_tooltip_text(None)
+                self.window.activity_spinner.stop()
+        return GLib.SOURCE_REMOVE
+
+    def on_show_signatures_clicked(self, action, param):
+        """Focuses the sidebar on the list of existing signatures."""
+        if self.window:
+            if not self.window.flap.get_reveal_flap(): self.window.flap.set_reveal_flap(True)
+            self.window.hide_signature_info()
+            self.window.sidebar.focus_on_signatures()
+            
+    def on_signature_selected(self, sidebar, sig_details):
+        """Shows details for a selected signature."""
+        if self.window:
+            self.window.hide_signature_info()
+        if self.window:
+            if not self.window.flap.get_reveal_flap():
+                self.window.flap.set_reveal_flap(True)
+            self.window.sidebar.select_signature(sig_details)    
+        if sig_details.page_num != -1:
+            self.display_page(sig_details.page_num, keep_sidebar_view=True)
+            if sig_details.rect:
+                self.highlight_rect = sig_details.rect
+                self.emit("highlight-rect-changed", self.highlight_rect)
+                if self.window:
+                    self.window.scroll_to_rect(sig_details.rect)
+        
+        dialog = Adw.MessageDialog.new(self.window,
+                                       heading=self._("sig_details_title"),
+                                       body="") 
+
+        validity_parts = [f"<b>{self._('sig_validity_title')}</b>"]
+        if sig_details.intact and sig_details.valid:
+            validity_parts.append(f"<span color='green'>{self._('sig_integrity_ok')}</span>")
+            if sig_details.trusted:
+                 validity_parts.append(f"<span color='green'>{self._('sig_trust_ok')}</span>")
+            elif sig_details.revoked:
+                 validity_parts.append(f"<span color='red'>{self._('sig_revoked')}</span>")
+            else:
+                 validity_parts.append(f"<span color='orange'>{self._('sig_trust_untrusted')}</span>")
+        else:
+            validity_parts.append(f"<span color='red'>{self._('sig_integrity_error')}</span>")
+
+        level = sig_details.modification_level
+        if level is not None:
+            color = {'NONE': 'green', 'LTA_UPDATES': 'green', 'FORM_FILLING': 'orange', 'ANNOTATIONS': 'orange'}.get(level, 'red')
+            validity_parts.append(f"<b>{self._('sig_modifications')}:</b> <span color='{color}'>{self._('modification_' + level)}</span>")
+        elif self.deep_verification_job:
+            validity_parts.append(f"<b>{self._('sig_modifications')}:</b> {self._('sig_modifications_pending')}")
+        
+        validity_text = "\n".join(validity_parts)
+        
+        signer_esc = GLib.markup_escape_text(sig_details.signer_name)
+        issuer_esc = GLib.markup_escape_text(sig_details.issuer_cn)
+        serial_esc = GLib.markup_escape_text(sig_details.serial)
+        
+        details_parts = [
+            validity_text,
+            f"\n<b>{self._('signer')}:</b> {signer_esc}",
+            f"<b>{self._('sign_date')}:</b> {sig_details.sign_time.strftime('%Y-%m-%d %H:%M:%S %Z') if sig_details.sign_time else 'N/A'}"
+        ]
+        
+        if sig_details.reason:
+            details_parts.append(f"<b>{self._('signature_reason_label')}:</b> {GLib.markup_escape_text(sig_details.reason)}")
+
+        if sig_details.location:
+            details_parts.append(f"<b>{self._('signature_location_label')}:</b> {GLib.markup_escape_text(sig_details.location)}")
+            
+        if sig_details.contact_info:
+            details_parts.append(f"<b>{self._('signature_contact_label')}:</b> {GLib.markup_escape_text(sig_details.contact_info)}")
+
+        details_parts.extend([
+            f"\n<b>{self._('issuer')}:</b> {issuer_esc}",
+            f"<b>{self._('serial')}:</b> {serial_esc}"
+        ])
+
+        # The certificate's validity and the digest algorithm are only in the pyHanko signature, re-opened from the file.
+        if (embedded_sig := sig_details.load_embedded_signature()) is not None:
+            try:
+                expires = embedded_sig.signer_cert['tbs_certificate']['validity']['not_after'].native
+                details_parts.append(f"<b>{self._('expires')}:</b> {expires.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+                details_parts.append(f"<b>{self._('sig_digest_algorithm')}:</b> {GLib.markup_escape_text(embedded_sig.md_algorithm.upper())}")
+            except Exception as e:
+                print(f"Error reading signature details: {e}")
+        
+        details_text = "\n".join(details_parts)
+        
+        body_label = Gtk.Label(
+            use_markup=True,
+            label=details_text,
+            wrap=True,
+            xalign=0, 
+            selectable=True,
+            justify=Gtk.Justification.CENTER
+        )
+        
+        dialog.set_extra_child(body_label)
+        
+        dialog.add_response("ok", self._("accept"))
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+        
+        dialog.present()
+
+    def on_open_pdf_clicked(self, action, param):
+        """Handles the 'Open' action, showing a file chooser."""
+        def on_response(dialog, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                if file := dialog.get_file(): self.open_file_path(file.get_path())
+        file_chooser = Gtk.FileChooserNative.new(self._("open_pdf_dialog_title"), self.window, Gtk.FileChooserAction.OPEN, self._("open"), self._("cancel"))
+        filter_pdf = Gtk.FileFilter(); filter_pdf.set_name(self._("pdf_files")); filter_pdf.add_mime_type("application/pdf")
+        file_chooser.add_filter(filter_pdf)
+        if os.path.isdir(last_folder := self.config.get_last_folder()):
+            file_chooser.set_current_folder(Gio.File.new_for_path(last_folder))
+        file_chooser.connect("response", on_response); file_chooser.show()
+
+    def on_open_recent_clicked(self, action, param):
+        """Handles opening a file from the 'Open Recent' menu."""
+        file_path = param.get_string()
+        if os.path.exists(file_path): self.open_file_path(file_path)
+        else:
+            self.emit("toast-request", f"File not found: {file_path}", None, None)
+            self.config.remove_recent_file(file_path); self.emit("language-changed")
+
+    def on_preferences_clicked(self, action, param):
+        """Shows the preferences window."""
+        if self.preferences_window and self.preferences_window.is_visible():
+            self.preferences_window.present()
+            return
+        from ui.preferences_window import PreferencesWindow
+        page_name = 'certificates' if action.get_name() == 'manage_certs' else None
+        self.preferences_window = PreferencesWindow(application=self, initial_page_name=page_name)
+        self.preferences_window.connect("destroy", lambda w: self.config.save())
+        self.preferences_window.present()
+
+    def on_edit_stamps_clicked(self, action, param):
+        """Shows the stamp editor dialog."""
+        from ui.stamp_editor_dialog import StampEditorDialog
+        dialog = StampEditorDialog(parent_window=self.window, app=self)
+        dialog.connect("destroy", lambda w: self.config.save())
+        dialog.present()
+    
+    def on_lang_change_state(self, action, value):
+        """Handles changing the application language."""
+        new_lang = value.get_string()
+        if action.get_state().get_string() != new_lang:
+            action.set_state(value); self.i18n.set_language(new_lang)
+            self.config.set_language(new_lang); self.emit('language-changed')
+
+    def on_toggle_search_activate(self, action, param):
+        """Handles activation of search action (e.g., via Ctrl+F)."""
+        current_state = action.get_state().get_boolean()
+        action.change_state(GLib.Variant('b', not current_state))
+    
+    def on_toggle_search_state_change(self, action, value):
+        """Callback that updates the state of the 'toggle_search' action."""
+        action.set_state(value)
+    
+    def on_continuous_scroll_state_change(self, action, value):
+        """Switches the document view between single pages and continuous scrolling."""
+        action.set_state(value)
+        self.config.set_continuous_scroll(value.get_boolean())
+        if self.window: self.window.set_continuous_scroll(value.get_boolean())
+
+    def on_zoom_change_state(self, action, value):
+        """Applies a zoom chosen from the zoom menu: 'fit-width', 'fit-page' or a factor."""
+        zoom = value.get_string()
+        if self.window: self.window.set_zoom(zoom if zoom in ('fit-width', 'fit-page') else float(zoom))
+
+    def on_sign_document_clicked(self, action=None, param=None):
+        """Handles the main 'Sign Document' action."""
+        if not self.active_cert_path:
+            self.emit("toast-request", self._("no_cert_selected_error"), None, None); return
+        if not all([self.doc, self.signature_rect, self.current_file_path]):
+            self.emit("toast-request", self._("need_pdf_and_area"), None, None); return
+        if self.reload_if_changed():
+            self.emit("toast-request", self._("document_changed_on_disk"), None, None); return
+        private_key_pyca, certificate_pyca = self.cert_manager.get_session_credentials(self.active_cert_path)
+        if not (private_key_pyca and certificate_pyca):
+            show_error_dialog(self.window, self._("error"), self._("credential_load_error"))
+            return
+
+        self._perform_signing(private_key_pyca, certificate_pyca)
+
+    def on_print_clicked(self, action, param):
+        """Handles the 'Print' action."""
+        self.reload_if_changed()
+        if not self.doc: return
+
+        print_op = Gtk.PrintOperation()
+        print_op.set_job_name(os.path.basename(self.current_file_path) if self.current_file_path else "Document")
+        print_op.set_n_pages(len(self.doc))
+        print_op.connect("draw_page", self._on_print_draw_page)
+
+        res = print_op.run(Gtk.PrintOperationAction.PRINT_DIALOG, self.window)
+
+        if res == Gtk.PrintOperationResult.ERROR:
+            show_error_dialog(self.window, self._("print_error_title"), self._("print_error_message").format(print_op.get_status_string()))
+        elif res == Gtk.PrintOperationResult.APPLY:
+            self.emit("toast-request", self._("print_success_toast"), None, None)
+
+    def _on_print_draw_page(self, operation, context, page_nr):
+        """Draws a single page for the print operation."""
+        try:
+            page = self.doc.load_page(page_nr)
+            cr = context.get_cairo_context()
+
+            # Get page dimensions from PDF and print context dimensions
+            pdf_width, pdf_height = page.rect.width, page.rect.height
+            page_setup = context.get_page_setup()
+            printable_width = page_setup.get_printable_width(Gtk.Unit.POINTS)
+            printable_height = page_setup.get_printable_height(Gtk.Unit.POINTS)
+
+            # Scale to fit printable area while maintaining aspect ratio
+            scale_w = printable_width / pdf_width
+            scale_h = printable_height / pdf_height
+            scale = min(scale_w, scale_h)
+
+            # Center the page
+            cr.save()
+            cr.translate(
+                (printable_width - pdf_width * scale) / 2,
+                (printable_height - pdf_height * scale) / 2
+            )
+            cr.scale(scale, scale)
+
+            # Rasterize the page's cached display list at print resolution
+            zoom = PRINT_DPI / 72
+            pix = self.display_lists.render_rgb24(page_nr, zoom)
+            # The surface paints from the pixmap's own buffer, which pix keeps alive until the page is drawn.
+            surface = cairo.ImageSurface.create_for_data(pix.samples_mv, cairo.FORMAT_RGB24, pix.width, pix.height, pix.stride)
+            cr.scale(1 / zoom, 1 / zoom)
+            cr.set_source_surface(surface, 0, 0); cr.paint()
+
+            cr.restore()
+
+        except Exception as e:
+            # It's hard to report errors from here, but we can log them.
+            print(f"Error drawing page {page_nr} for printing: {e}")
+
+    def _generate_output_path(self, input_path):
+        """
+        Generates a unique output filename based on the input path.
+        Appends '-signed.pdf', and adds a version number if a file with that name exists.
+        
+        NOTE: In Flatpak, os.path.exists() is limited by sandbox permissions.
+        This provides a best-effort suggestion; the portal itself will prevent overwrites.
+        """
+        base_path, ext = os.path.splitext(input_path)
+        output_path = f"{base_path}-signed{ext}"
+        version = 1
+        while os.path.exists(output_path):
+            output_path = f"{base_path}-signed-{version}{ext}"
+            version += 1
+        return output_path
+
+    def _perform_signing(self, private_key_pyca, certificate_pyca):
+        """Orchestrates the signing and saving process, adapting for Flatpak."""
+        try:
+            signed_bytes = self._get_signed_pdf_bytes_in_memory(private_key_pyca, certificate_pyca)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            show_error_dialog(self.window, self._("sig_error_title"), self._("sig_error_message").format(e))
+            return
+
+        if is_running_in_flatpak():
+            self._save_via_portal(signed_bytes)
+        else:
+            try:
+                output_path = self._generate_output_path(self.current_file_path)
+                with open(output_path, "wb") as out_f:
+                    out_f.write(signed_bytes)
+                
+                self.emit("toast-request", self._("sign_success_message").format(os.path.basename(output_path)), self._("open"), lambda: self.open_file_path(output_path, show_toast=False))
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                show_error_dialog(self.window, self._("sig_error_title"), self._("sig_error_message").format(e))
+
+    def _get_signed_pdf_bytes_in_memory(self, private_key_pyca, certificate_pyca):
+        """Encapsulates the pyHanko signing logic, returning the result as bytes."""
+        signing_key_asn1 = translate_pyca_cryptography_key_to_asn1(private_key_pyca)
+        signer_cert_asn1 = translate_pyca_cryptography_cert_to_asn1(certificate_pyca)
+        
+        signer = signers.SimpleSigner(signing_cert=signer_cert_asn1, signing_key=signing_key_asn1, cert_registry=SimpleCertificateStore.from_certs([signer_cert_asn1]))
+        x, y, w, h = self.signature_rect
+        page_num = self.get_signature_page(); page = self.doc.load_page(page_num)
+        view_width = self.window.get_page_view_width(page_num)
+        scale = page.rect.width / view_width if view_width > 0 else 1
+        fitz_rect = fitz.Rect(x * scale, y * scale, (x + w) * scale, (y + h) * scale)
+        stamp_creator = self.stamp_appearances.get(self.get_stamp_content(certificate_pyca), fitz_rect.width, fitz_rect.height)
+        
+        meta = PdfSignatureMetadata(
+            field_name=f'Signature-{int(datetime.now().timestamp() * 1000)}',
+            reason=self.config.get_signature_reason() or None,
+            location=self.config.get_signature_location() or None
+        )
+        
+        pdf_box_y0 = page.rect.height - fitz_rect.y1
+        pdf_box_y1 = page.rect.height - fitz_rect.y0
+        new_field_spec = fields.SigFieldSpec(sig_field_name=meta.field_name, on_page=page_num, box=(fitz_rect.x0, pdf_box_y0, fitz_rect.x1, pdf_box_y1))
+        
+        pdf_signer = PdfSigner(meta, signer, stamp_style=stamp_creator.get_style(), new_field_spec=new_field_spec)
+        
+        output_buffer = BytesIO()
+        with self.document_source.open_stream() as orig_f:
+            writer = IncrementalPdfFileWriter(orig_f, strict=False)
+            pdf_signer.sign_pdf(writer, output=output_buffer)
+        return output_buffer.getvalue()
+
+    def _save_via_portal(self, content_to_save_bytes):
+        """Handles saving the signed file using the Gtk.FileChooserNative portal."""
+        suggested_path = self._generate_output_path(self.current_file_path)
+        suggested_name = os.path.basename(suggested_path)
+
+        dialog = Gtk.FileChooserNative.new(
+            self._("save_pdf_dialog_title"),
+            self.window,
+            Gtk.FileChooserAction.SAVE
+        )
+        dialog.set_modal(True)
+        dialog.set_current_name(suggested_name)
+
+        original_gfile = Gio.File.new_for_path(self.current_file_path)
+        parent_folder = original_gfile.get_parent()
+        if parent_folder:
+            dialog.set_current_folder(parent_folder)
+
+        dialog.connect("response", self._on_save_dialog_response, content_to_save_bytes)
+        dialog.show()
+
+    def _on_save_dialog_response(self, dialog, response_id, content_bytes):
+        """Callback for when the user interacts with the save dialog."""
+        if response_id == Gtk.ResponseType.ACCEPT:
+            output_gfile = dialog.get_file()
+            if output_gfile:
+                try:
+                    output_gfile.replace_contents(
+                        content_bytes, None, False, 
+                        Gio.FileCreateFlags.REPLACE_DESTINATION, None
+                    )
+                    output_path = output_gfile.get_path()
+                    self.emit("toast-request", self._("sign_success_message").format(os.path.basename(output_path)), self._("open"), lambda: self.open_file_path(output_path, show_toast=False))
+                except GLib.Error as e:
+                    show_error_dialog(self.window, self._("sig_error_title"), self._("sig_error_message").format(e))
+        dialog.destroy()
+
+    def on_about_clicked(self, action, param):
+        """Shows the 'About' dialog."""
+        create_about_dialog(self.window, self._)
+
+    def search_text(self, text):
+        """Performs a text search in the document and updates the UI."""
+        if not self.doc or not text:
+            return
+        self.clear_search()
+        for page_num, page in enumerate(self.doc):
+            found_rects = page.search_for(text) 
+            for rect in found_rects:
+                context_rect = fitz.Rect(
+                    rect.x0 - 50,  
+                    rect.y0 - 5,   
+                    rect.x1 + 50,  
+                    rect.y1 + 5    
+                )  
+                context = page.get_textbox(context_rect).replace('\n', ' ').strip()                
+                self.search_results.append(SearchResult(page_num, rect, context))
+        self.window.sidebar.populate_search_results(self.search_results)
+        if self.search_results:
+            self.select_search_result(0)
+        self.display_page(self.current_page, keep_sidebar_view=True)
+        self.window.sidebar.populate_search_results(self.search_results)
+        if self.search_results:
+            self.select_search_result(0)
+        self.display_page(self.current_page, keep_sidebar_view=True)
+
+    def clear_search(self):
+        """Clears the current search."""
+        self.search_results = []
+        self.search_highlights_on_page = []
+        self.current_search_result_index = -1
+        self.emit("search-highlights-updated", [])
+        if self.window:
+            self.window.sidebar.populate_search_results([])
+            self.window.queue_draw_pages()
+            self.window.update_search_nav_buttons()
+
+    def select_search_result(self, index):
+        """Selects a search result by its index."""
+        if not (0 <= index < len(self.search_results)):
+            return
+        self.current_search_result_index = index
+        result = self.search_results[index]
+        self.display_page(result.page_num, keep_sidebar_view=True)
+        if self.page:
+            page_height = self.page.rect.height
+            search_rect = result.rect  
+            converted_rect = (
+                search_rect.x0,
+                page_height - search_rect.y1,
+                search_rect.x1,
+                page_height - search_rect.y0
+            )
+            self.highlight_rect = converted_rect
+        else:
+            self.highlight_rect = None
+        self.emit("search-result-selected", result)
+        if self.window:
+            self.window.update_search_nav_buttons()
+
+    def next_search_result(self, button=None):
+        """Navigates to the next search result, wrapping around to the start."""
+        num_results = len(self.search_results)
+        if num_results == 0:
+            return
+        next_index = (self.current_search_result_index + 1) % num_results
+        self.select_search_result(next_index)
+
+    def previous_search_result(self, button=None):
+        """Navigates to the previous search result."""
+        if self.current_search_result_index > 0:
+            self.select_search_result(self.current_search_result_index - 1)
+
+    def _update_actions_state(self):
+        """Centralized method to update the enabled state of actions."""
+        doc_loaded = self.doc is not None
+
+        toggle_search_action = self.lookup_action("toggle_search")
+        if toggle_search_action:
+            toggle_search_action.set_enabled(doc_loaded)
+            if not doc_loaded and toggle_search_action.get_state().get_boolean():
+                toggle_search_action.set_state(GLib.Variant('b', False))
+
+        can_sign = doc_loaded and self.signature_rect is not None and self.active_cert_path is not None
+        sign_action = self.lookup_action("sign")
+        if sign_action:
+            sign_action.set_enabled(can_sign)
+
+        print_action = self.lookup_action("print")
+        if print_action:
+            print_action.set_enabled(doc_loaded)
+
+        for name in ("zoom", "zoom_in", "zoom_out"):
+            if zoom_action := self.lookup_action(name): zoom_action.set_enabled(doc_loaded)
+
+        doc_has_signatures = doc_loaded and len(self.signatures) > 0
+        show_sigs_action = self.lookup_action("show_signatures")
+        if show_sigs_action:
+            show_sigs_action.set_enabled(doc_has_signatures)    
+    
+    def reset_signature_state(self):
+        """Resets all properties related to the current signature drawing/selection."""
+        self.signature_rect, self.signature_page = None, None
+        self.start_x, self.start_y, self.end_x, self.end_y = -1, -1, -1, -1
+        self.is_dragging_rect = False
+        self.highlight_rect = None
+        self.emit("signature-state-changed")
+        self._update_actions_state()
+
+    def display_page(self, page_num, keep_sidebar_view=False):
+        """Loads and displays a specific page of the current document."""
+        if self.highlight_rect:
+            self.highlight_rect = None
+            self.emit("highlight-rect-changed", None)
+
+        self.search_highlights_on_page = []
+        if self.search_results:
+            for result in self.search_results:
+                if result.page_num == page_num:
+                    self.search_highlights_on_page.append(result.rect)
+        self.emit("search-highlights-updated", self.search_highlights_on_page)
+
+        if not self.doc or not (0 <= page_num < len(self.doc)):
+            self._cancel_signature_validation()
+            self._close_document_source()
+            self.page = None; self.doc = None; self.current_file_path = None; self.signatures = []
+            self.emit("document-changed", None)
+        else:
+            self.current_page = page_num
+            self.page = self.doc.load_page(page_num)
+            self.emit("page-changed", self.page, self.current_page, len(self.doc), keep_sidebar_view)
+    
+    def on_prev_page_clicked(self, button):
+        """Navigates to the previous page."""
+        if self.doc and self.current_page > 0:
+            self.reset_signature_state(); self.display_page(self.current_page - 1)
+    
+    def on_next_page_clicked(self, button):
+        """Navigates to the next page."""
+        if self.doc and self.current_page < len(self.doc) - 1:
+            self.reset_signature_state(); self.display_page(self.current_page + 1)
+            
+    def on_jump_to_page_clicked(self, button):
+        """Shows a dialog to jump to a specific page."""
+        if not self.doc: return
+        dialog = Gtk.Dialog(title=self._("jump_to_page_title"), transient_for=self.window, modal=True)
+        dialog.add_buttons(self._("cancel"), Gtk.ResponseType.CANCEL, self._("accept"), Gtk.ResponseType.OK)
+        content_area = dialog.get_content_area(); content_area.set_spacing(10); content_area.set_margin_top(10); content_area.set_margin_bottom(10); content_area.set_margin_start(10); content_area.set_margin_end(10)
+        content_area.append(Gtk.Label(label=self._("jump_to_page_prompt").format(len(self.doc))))
+        adj = Gtk.Adjustment(value=self.current_page + 1, lower=1, upper=len(self.doc), step_increment=1)
+        spin = Gtk.SpinButton(adjustment=adj, numeric=True); content_area.append(spin)
+        dialog.set_default_widget(spin); spin.connect("activate", lambda w: dialog.response(Gtk.ResponseType.OK))
+        def on_response(d, res):
+            if res == Gtk.ResponseType.OK:
+                self.reset_signature_state(); self.display_page(spin.get_value_as_int() - 1)
+            d.destroy()
+        dialog.connect("response", on_response); dialog.present()
+
+    def on_drag_begin(self, gesture, start_x, start_y):
+        """Handles the beginning of a drag gesture on the document view."""
+        self.highlight_rect = None; self.emit("highlight-rect-changed", None)
+        if self.signature_rect and self.get_signature_page() == self.current_page:
+            x, y, w, h = self.signature_rect
+            if x <= start_x <= x + w and y <= start_y <= y + h:
+                self.is_dragging_rect, self.drag_offset_x, self.drag_offset_y = True, start_x - x, start_y - y; return
+        self.is_dragging_rect, self.start_x, self.start_y = False, start_x, start_y
+        self.end_x, self.end_y = start_x, start_y; self.signature_rect = None
+        self.signature_page = self.current_page
+        self.emit("signature-state-changed")
+
+    def on_drag_update(self, gesture, offset_x, offset_y):
+        """Handles the update of a drag gesture."""
+        success, start_point_x, start_point_y = gesture.get_start_point()
+        if not success: return
+        current_x, current_y = start_point_x + offset_x, start_point_y + offset_y
+        if self.is_dragging_rect:
+            _, _, w, h = self.signature_rect
+            self.signature_rect = (current_x - self.drag_offset_x, current_y - self.drag_offset_y, w, h)
+        else: self.end_x, self.end_y = current_x, current_y
+        self.emit("signature-state-changed")
+
+    def on_drag_end(self, gesture, offset_x, offset_y):
+        """Handles the end of a drag gesture, finalizing the signature rectangle."""
+        if not self.is_dragging_rect:
+            x1, y1 = min(self.start_x, self.end_x), min(self.start_y, self.end_y)
+            width, height = abs(self.start_x - self.end_x), abs(self.start_y - self.end_y)
+            self.signature_rect = (x1, y1, width, height) if width > 5 and height > 5 else None
+        self.is_dragging_rect = False
+        self.emit("signature-state-changed")
+        self._update_actions_state()
+
+    def get_signature_page(self):
+        """Returns the page the signature area is being selected on (the current page if none)."""
+        return self.current_page if self.signature_page is None else self.signature_page
+
+    def get_parsed_stamp_text(self, certificate, override_template=None):
+        """Parses a signature template, replacing placeholders with actual certificate data."""
+        template = compile_template(override_template) if override_template is not None else self.config.get_active_compiled_template()
+        if template is None: return "Error: No active signature template found."
+        return template.render(certificate)
+
+    def get_stamp_content(self, certificate):
+        """Returns the stamp of a certificate as the stamp backend lays it out: its Pango markup, or the HTML converted from it."""
+        markup = self.get_parsed_stamp_text(certificate)
+        return markup if self.stamp_appearances.backend == 'markup' else pango_to_html(markup)
+
+    def get_active_stamp_content(self):
+        """
+        Returns the stamp content of the active certificate (None without one) for the signature preview, built
+        once per certificate, template, stamp backend and minute (or second, if the template shows the seconds).
+        """
+        template = self.config.get_active_compiled_template()
+        key = (self.active_cert_path, template, self.stamp_appearances.backend, int(time.time()) // (template.time_resolution if template else 60))
+        if self._stamp_content is None or self._stamp_content[0] != key:
+            certificate = self.cert_manager.get_certificate(self.active_cert_path) if self.active_cert_path else None
+            self._stamp_content = (key, self.get_stamp_content(certificate) if certificate else None)
+        return self._stamp_content[1]
+
+    def get_validation_settings(self):
+        """Builds the signature validation settings from the current configuration."""
+        return ValidationSettings(offline=self.config.get_validation_mode() == "offline", trust_store_dir=self.config.get_trust_store_dir(),
+                                  revocation_cache_dir=os.path.join(self.config.get_cache_dir(), "revocation"))
+
+    def set_validation_mode(self, mode):
+        """Switches between online and offline validation for documents opened from now on."""
+        self.config.set_validation_mode(mode)
+        self.validation_engine.settings = self.get_validation_settings()
+
+    def set_validation_workers(self, count):
+        """Sets the number of processes validating signatures (0 for one per CPU core), from the next validation on."""
+        self.config.set_validation_workers(count)
+        self.validation_engine.set_max_workers(count)
+
+    def set_trust_store_dir(self, path):
+        """Sets the local trust store directory used for validation."""
+        self.config.set_trust_store_dir(path)
+        self.validation_engine.settings = self.get_validation_settings()
+
+    def set_deep_verification(self, enabled):
+        """Enables or disables deep verification, applying it to the open document right away."""
+        self.config.set_deep_verification(enabled)
+        if not enabled: self._cancel_deep_verification()
+        elif self.signatures and not self.validation_job and not self.deep_verification_job and any(s.modification_level is None for s in self.signatures):
+            self._start_deep_verification(self.current_file_path)
+
+    def set_credential_session_ttl(self, seconds):
+        """Sets how long, in idle seconds, an unlocked private key is kept (0 to never keep it), forgetting expired keys right away."""
+        self.config.set_credential_session_ttl(seconds)
+        self.cert_manager.set_session_ttl(seconds)
+
+    def set_tile_cache_size(self, size_mb):
+        """Sets the memory budget, in MiB, of the rendered page tiles, evicting tiles right away if needed."""
+        self.config.set_tile_cache_size(size_mb)
+        if self.window: self.window.tile_renderer.set_max_bytes(size_mb * 1024 * 1024)
+
+    def set_render_workers(self, count):
+        """Sets the number of processes rendering pages in the background."""
+        self.config.set_render_workers(count)
+        self.render_service.set_max_workers(count)
+
+    def set_thumbnail_cache_size(self, size_mb):
+        """Sets the disk budget, in MiB, of the stored thumbnails, never evicting those of the open document."""
+        self.config.set_thumbnail_cache_size(size_mb)
+        self.thumbnail_store.set_max_bytes(size_mb * 1024 * 1024, keep=self.thumbnail_pack.path if self.thumbnail_pack else None)
+
+    def set_stamp_backend(self, backend):
+        """Sets how signature stamps are laid out ('html' or 'markup'), redrawing the stamp preview with it."""
+        self.config.set_stamp_backend(backend)
+        self.stamp_appearances.backend = backend
+        if self.window: self.window.queue_draw_pages()
+
+    def set_active_certificate(self, path):
+        """Sets the active certificate, saves the config, and notifies the UI."""
+        self.active_cert_path = path
+        self.config.set_active_cert_path(path)
+        self._stamp_content = None
+        self.emit("certificates-changed")
+        self._update_actions_state()
+
+    def add_certificate(self, pkcs12_path, password):
+        """Adds a new certificate, saves it, and notifies the UI."""
+        common_name = self.cert_manager.test_certificate(pkcs12_path, password)
+        if common_name:
+            self.cert_manager.clear(pkcs12_path)
+            Secret.password_store_sync(KEYRING_SCHEMA, {"path": pkcs12_path}, Secret.COLLECTION_DEFAULT, f"Certificate password for {common_name}", password, None)
+            self.config.add_cert_path(pkcs12_path)
+            self.config.set_last_folder(os.path.dirname(pkcs12_path))
+            self.cert_manager.add_cert_path(pkcs12_path)
+            self.set_active_certificate(pkcs12_path)
+            self.config.save()
+            return True
+        else:
+            show_error_dialog(self.window, self._("error"), self._("bad_password_or_file"))
+            return False
+
+    def remove_certificate(self, path):
+        """Removes a certificate and notifies the UI."""
+        self.cert_manager.remove_credentials_from_keyring(path)
+        self.config.remove_cert_path(path)
+        self.cert_manager.remove_cert_path(path)
+
+        if self.active_cert_path == path:
+            certs = self.cert_manager.get_all_certificate_details()
+            new_path = certs[0]['path'] if certs else None
+            self.set_active_certificate(new_path)
+        else:
+            self._stamp_content = None
+            self.emit("certificates-changed")
+        
+        self.config.save()
+
+    def request_add_new_certificate(self):
+        """Manages the full flow of adding a new certificate."""
+        def on_file_chooser_response(dialog, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                if file := dialog.get_file():
+                    pkcs12_path = file.get_path()
+                    
+                    def on_password_response(password):
+                        if password is not None:
+                            self.add_certificate(pkcs12_path, password)
+                    
+                    create_password_dialog(self.preferences_window, self._("password"), os.path.basename(pkcs12_path), self._, on_password_response)
+
+        file_chooser = Gtk.FileChooserNative.new(self._("open_cert_dialog_title"), self.preferences_window, Gtk.FileChooserAction.OPEN, self._("open"), self._("cancel"))
+        filter_p12 = Gtk.FileFilter()
+        filter_p12.set_name(self._("p12_files"))
+        filter_p12.add_pattern("*.p12"); filter_p12.add_pattern("*.pfx")
+        file_chooser.add_filter(filter_p12)
+        file_chooser.connect("response", on_file_chooser_response)
+        file_chooser.show()
@@ -1,19 +1,36 @@
 from cryptography.hazmat.primitives.serialization import pkcs12
 from cryptography import x509
+import os, time, math
 import gi
 gi.require_version('Secret', '1')
-from gi.repository import Secret
+from gi.repository import Secret, GLib
 
 KEYRING_SCHEMA = Secret.Schema.new("io.github.ppgllrd.GNOME-Sign.p12",
                                    Secret.SchemaFlags.NONE,
                                    {"path": Secret.SchemaAttributeType.STRING})
 
 class CertificateManager:
-    """Manages certificate paths and loads their data on demand using passwords from the system's keyring."""
-    def __init__(self):
-        """Initializes the certificate manager."""
+    """
+    Manages certificate paths and loads their data on demand using passwords from the system's keyring.
+    Parsed public certificates (or the failure to load one, e.g. without a stored password) are kept
+    until their file changes, so previews and listings never query the keyring or decrypt a PKCS#12 file
+    again. Private keys are kept in a session that expires after session_ttl seconds without use, or when
+    lock() is called; both caches follow the file's modification time.
+    """
+    def __init__(self, session_ttl=300):
+        """Initializes the certificate manager; a session_ttl of 0 disables keeping private keys."""
         self.cert_paths = []
         self.KEYRING_SCHEMA = KEYRING_SCHEMA
+        self.session_ttl = session_ttl
+        self._certificates = {}
+        self._sessions = {}
+        self._expiry_source = None
+
+    def set_session_ttl(self, seconds):
+        """Changes the idle time after which unlocked private keys are forgotten."""
+        self.session_ttl = seconds
+        if self._expiry_source: GLib.source_remove(self._expiry_source); self._expiry_source = None
+        self._expire_sessions()
 
     def set_cert_paths(self, paths):
         """Sets the list of certificate paths known to the manager."""
@@ -28,19 +45,84 @@ class CertificateManager:
         """Removes a certificate path from the manager."""
         if path in self.cert_paths:
             self.cert_paths.remove(path)
+        self.clear(path)
 
     def remove_credentials_from_keyring(self, path):
         """Removes the stored password for a given certificate path from the keyring."""
+        self.clear(path)
         return Secret.password_clear_sync(self.KEYRING_SCHEMA, {"path": path}, None)
 
+    @staticmethod
+    def _file_mtime(path):
+        """Returns the modification time of a certificate file, or None if it cannot be accessed."""
+        try: return os.stat(path).st_mtime_ns
+        except OSError: return None
+
+    def _load_from_keyring(self, path, keep_key=False):
+        """
+        Loads a certificate file with the password stored in the keyring, caching its public certificate, or None if it
+        could not be loaded (and, if keep_key, its private key in a session).
+        """
+        mtime = self._file_mtime(path)
+        password = Secret.password_lookup_sync(self.KEYRING_SCHEMA, {"path": path}, None) if mtime is not None else None
+        private_key, certificate = self.get_credentials(path, password) if password else (None, None)
+        self._certificates[path] = (mtime, certificate)
+        if keep_key and private_key and certificate and self.session_ttl > 0:
+            self._sessions[path] = (mtime, private_key, certificate, time.monotonic())
+            self._schedule_expiry()
+        return private_key, certificate
+
+    def get_certificate(self, path):
+        """Returns the public certificate of a known certificate file (None if it cannot be loaded), parsed once and kept until the file changes."""
+        cached = self._certificates.get(path)
+        if cached and cached[0] == self._file_mtime(path): return cached[1]
+        self._certificates.pop(path, None)
+        return self._load_from_keyring(path)[1]
+
+    def get_session_credentials(self, path):
+        """Returns the private key and certificate of a certificate file, from the current session or unlocked with the keyring password."""
+        session = self._sessions.get(path)
+        if session and session[0] == self._file_mtime(path) and time.monotonic() - session[3] < self.session_ttl:
+            self._sessions[path] = session[:3] + (time.monotonic(),)
+            return session[1], session[2]
+        self._sessions.pop(path, None)
+        return self._load_from_keyring(path, keep_key=True)
+
+    def lock(self):
+        """Forgets every unlocked private key; public certificates are kept."""
+        self._sessions.clear()
+        if self._expiry_source: GLib.source_remove(self._expiry_source); self._expiry_source = None
+
+    def clear(self, path=None):
+        """Forgets the cached certificate and private key of a file, or of every file."""
+        if path is None:
+            self._certificates.clear(); self.lock()
+        else:
+            self._certificates.pop(path, None); self._sessions.pop(path, None)
+
+    def _schedule_expiry(self):
+        """Arranges for the session idle the longest to be dropped as soon as it expires, even if the credentials are not requested again."""
+        if self._expiry_source is None and self._sessions:
+            delay = min(session[3] for session in self._sessions.values()) + self.session_ttl - time.monotonic()
+            self._expiry_source = GLib.timeout_add(max(1, math.ceil(delay * 1000)), self._on_expiry_timeout)
+
+    def _on_expiry_timeout(self):
+        """Main-loop handler that drops expired sessions and reschedules itself while any remain."""
+        self._expiry_source = None
+        self._expire_sessions()
+        return GLib.SOURCE_REMOVE
+
+    def _expire_sessions(self):
+        """Drops the sessions idle for session_ttl or longer, and schedules the next expiry."""
+        now = time.monotonic()
+        for path in [path for path, session in self._sessions.items() if now - session[3] >= self.session_ttl]: del self._sessions[path]
+        self._schedule_expiry()
+
     def get_all_certificate_details(self):
         """Retrieves and parses details for all known and accessible certificates."""
         details_list = []
         for path in self.cert_paths:
-            password = Secret.password_lookup_sync(self.KEYRING_SCHEMA, {"path": path}, None)
-            if not password: continue
-            
-            _, cert = self.get_credentials(path, password)
+            cert = self.get_certificate(path)
             if cert:
                 try:
                     def get_cn(name_obj):
@@ -4,6 +4,7 @@ import json
 import uuid
 from collections import deque
 from gi.repository import GLib
+from stamp_template import compile_template, DEFAULT_TEMPLATES
 
 class ConfigManager:
     """Manages loading, saving, and accessing application configuration settings."""
@@ -16,11 +17,13 @@ class ConfigManager:
         app_config_dir = os.path.join(config_dir_base, "gnomesign")
         self.config_file = os.path.join(app_config_dir, "config.json")
         self.config_data = {}
+        self._compiled_templates = {}
 
     def load(self):
         """Loads configuration from the JSON file, or creates it with defaults if it doesn't exist."""
         config_dir = os.path.dirname(self.config_file)
         os.makedirs(config_dir, exist_ok=True)
+        self._compiled_templates.clear()
         try:
             with open(self.config_file, 'r') as f:
                 self.config_data = json.load(f)
@@ -32,7 +35,17 @@ class ConfigManager:
             'active_template_id': None, 'last_folder': os.path.expanduser("~"),
             'language': "en", 'active_cert_path': None,
             'signature_reason': '', 
-            'signature_location': '' 
+            'signature_location': '',
+            'validation_workers': 0,
+            'validation_mode': 'online',
+            'trust_store_dir': None,
+            'deep_verification': False,
+            'tile_cache_mb': 128,
+            'render_workers': 2,
+            'thumbnail_cache_mb': 64,
+            'credential_session_ttl': 300,
+            'stamp_backend': 'html',
+            'continuous_scroll': False
         }
         for key, value in defaults.items():
             self.config_data.setdefault(key, value)
@@ -41,22 +54,19 @@ class ConfigManager:
     def _create_default_templates_if_needed(self):
         """Creates and saves a set of default signature templates if none are present in the config."""
         if not self.config_data['signature_templates']:
-            simple_id = uuid.uuid4().hex
-            simple_template = { 
-                "id": simple_id, 
-                "name": "Simple", 
-                "template": "Digitally signed by:\n<b>$$SUBJECTCN$$</b>\nDate: $$SIGNDATE=dd-MM-yyyy$$" 
-            }
-            detailed_id = uuid.uuid4().hex
-            detailed_template = { 
-                "id": detailed_id, 
-                "name": "Detailed", 
-                "template": "Digitally signed by: <b>$$SUBJECTCN$$</b>\nDate: $$SIGNDATE=dd-MM-yyyy$$\nIssuer: <b>$$ISSUERCN$$</b>"
-            }
-            self.config_data['signature_templates'].extend([simple_template, detailed_template])
-            self.config_data['active_template_id'] = simple_id
+            templates = [{"id": uuid.uuid4().hex, "name": name, "template": text} for name, text in DEFAULT_TEMPLATES]
+            self.config_data['signature_templates'].extend(templates)
+            self.config_data['active_template_id'] = templates[0]["id"]
             self.save() # Initial save is OK here, as it's part of first-time setup.
 
+    def get_config_dir(self):
+        """Returns the application's configuration directory, where config.json lives."""
+        return os.path.dirname(self.config_file)
+
+    def get_cache_dir(self):
+        """Returns the application's directory under the user cache dir, for disposable caches."""
+        return os.path.join(GLib.get_user_cache_dir(), "gnomesign")
+
     def save(self):
         """Saves the current configuration data to the JSON file."""
         try:
@@ -105,6 +115,7 @@ class ConfigManager:
 
     def save_template(self, template_data):
         """Saves a signature template, either by updating an existing one or adding a new one."""
+        self._compiled_templates.pop(template_data.get('id'), None)
         templates = self.get_signature_templates()
         for i, t in enumerate(templates):
             if t.get('id') == template_data.get('id'):
@@ -114,6 +125,7 @@ class ConfigManager:
 
     def delete_template(self, template_id):
         """Deletes a signature template by its ID."""
+        self._compiled_templates.pop(template_id, None)
         self.config_data['signature_templates'] = [t for t in self.get_signature_templates() if t.get('id') != template_id]
 
     def get_active_template_id(self):
@@ -128,6 +140,14 @@ class ConfigManager:
         """Returns the full data of the currently active signature template."""
         return self.get_template_by_id(self.get_active_template_id())
     
+    def get_active_compiled_template(self):
+        """Returns the active signature template compiled into a StampTemplate, compiled once until the template is saved again; None if there is none."""
+        template_id = self.get_active_template_id()
+        if (compiled := self._compiled_templates.get(template_id)) is None:
+            if not (template_obj := self.get_template_by_id(template_id)): return None
+            compiled = self._compiled_templates[template_id] = compile_template(template_obj.get("template", template_obj.get("template_es", "")))
+        return compiled
+
     def get_active_cert_path(self):
         """Returns the path of the currently active certificate."""
         return self.config_data.get("active_cert_path")
@@ -166,4 +186,84 @@ class ConfigManager:
 
     def set_signature_location(self, location):
         """Sets the default signature location."""
-        self.config_data["signature_location"] = location
\ No newline at end of file
+        self.config_data["signature_location"] = location
+
+    def get_validation_workers(self):
+        """Returns the number of processes used to validate signatures (0 means one per CPU core)."""
+        return self.config_data.get("validation_workers", 0)
+
+    def set_validation_workers(self, count):
+        """Sets the number of processes used to validate signatures."""
+        self.config_data["validation_workers"] = count
+
+    def get_validation_mode(self):
+        """Returns the signature validation mode: 'online' (fetching allowed) or 'offline'."""
+        return self.config_data.get("validation_mode", "online")
+
+    def set_validation_mode(self, mode):
+        """Sets the signature validation mode."""
+        self.config_data["validation_mode"] = mode
+
+    def get_trust_store_dir(self):
+        """Returns the directory holding local trust anchors and intermediates."""
+        return self.config_data.get("trust_store_dir") or os.path.join(self.get_config_dir(), "trust_store")
+
+    def set_trust_store_dir(self, path):
+        """Sets the directory holding local trust anchors and intermediates."""
+        self.config_data["trust_store_dir"] = path
+
+    def get_deep_verification(self):
+        """Returns whether signed revisions are checked for later modifications in the background."""
+        return self.config_data.get("deep_verification", False)
+
+    def set_deep_verification(self, enabled):
+        """Enables or disables the background modification analysis."""
+        self.config_data["deep_verification"] = enabled
+
+    def get_tile_cache_size(self):
+        """Returns the memory budget, in MiB, of the rendered page tile cache."""
+        return self.config_data.get("tile_cache_mb", 128)
+
+    def set_tile_cache_size(self, size_mb):
+        """Sets the memory budget, in MiB, of the rendered page tile cache."""
+        self.config_data["tile_cache_mb"] = size_mb
+
+    def get_thumbnail_cache_size(self):
+        """Returns the disk budget, in MiB, of the stored page thumbnails."""
+        return self.config_data.get("thumbnail_cache_mb", 64)
+
+    def set_thumbnail_cache_size(self, size_mb):
+        """Sets the disk budget, in MiB, of the stored page thumbnails."""
+        self.config_data["thumbnail_cache_mb"] = size_mb
+
+    def get_credential_session_ttl(self):
+        """Returns the idle time, in seconds, after which an unlocked private key is forgotten (0 to never keep it)."""
+        return self.config_data.get("credential_session_ttl", 300)
+
+    def set_credential_session_ttl(self, seconds):
+        """Sets the idle time, in seconds, after which an unlocked private key is forgotten."""
+        self.config_data["credential_session_ttl"] = seconds
+
+    def get_stamp_backend(self):
+        """Returns how signature stamps are laid out: 'html' (MuPDF's HTML engine) or 'markup' (the direct Pango markup layout)."""
+        return self.config_data.get("stamp_backend", 'html')
+
+    def set_stamp_backend(self, backend):
+        """Sets how signature stamps are laid out ('html' or 'markup')."""
+        self.config_data["stamp_backend"] = backend
+
+    def get_render_workers(self):
+        """Returns the number of background processes used to render pages."""
+        return self.config_data.get("render_workers", 2)
+
+    def set_render_workers(self, count):
+        """Sets the number of background processes used to render pages."""
+        self.config_data["render_workers"] = count
+
+    def get_continuous_scroll(self):
+        """Returns whether documents are shown as a continuous scroll of pages instead of one page at a time."""
+        return self.config_data.get("continuous_scroll", False)
+
+    def set_continuous_scroll(self, enabled):
+        """Sets whether documents are shown as a continuous scroll of pages."""
+        self.config_data["continuous_scroll"] = enabled
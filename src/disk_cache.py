@@ -0,0 +1,161 @@
+# disk_cache.py
+import os
+import json
+import time
+import fcntl
+import hashlib
+import tempfile
+import threading
+from document_source import find_source, open_stream
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's contents, read in chunks, or that of its open DocumentSource."""
+    if (source := find_source(file_path)) is not None: return source.digest()
+    digest = hashlib.sha256()
+    with open_stream(file_path) as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DiskCache:
+    """
+    A directory of cached blobs described by a JSON index.
+    Entries may expire after max_age seconds, and the total size is kept under
+    max_bytes by evicting the least recently used entries first. Blobs are written
+    atomically; changes to the index are kept in memory until flush(), which merges
+    it with the on-disk copy under a file lock, so several processes can share one
+    cache directory.
+    """
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory, max_bytes, max_age=None):
+        """Initializes the cache in a directory, creating it and loading its index."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._removed = set()
+        os.makedirs(directory, exist_ok=True)
+        self._index = {name: entry for name, entry in self._read_index_file().items() if os.path.exists(self._blob_path(name))}
+
+    def _read_index_file(self):
+        """Reads the index file as currently stored on disk."""
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return {}
+
+    def _blob_path(self, name):
+        """Returns the path of the blob file for an entry name."""
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _entry_name(key):
+        """Maps an arbitrary string key to a file-system safe entry name."""
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Returns the cached bytes for a key, or None if missing or expired."""
+        name = self._entry_name(key)
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None and os.path.exists(self._blob_path(name)):
+                # Possibly written by another process since our index was loaded.
+                if (entry := self._read_index_file().get(name)) is not None: self._index[name] = entry
+            if entry is None: return None
+            now = time.time()
+            if self.max_age is not None and now - entry['created'] > self.max_age:
+                self._remove_entry(name)
+                return None
+            try:
+                with open(self._blob_path(name), 'rb') as f:
+                    data = f.read()
+            except IOError:
+                self._remove_entry(name)
+                return None
+            entry['last_used'] = now
+            self._dirty = True
+            return data
+
+    def put(self, key, data):
+        """Stores bytes under a key, evicting old entries if the size cap is exceeded; the index is written by flush()."""
+        name = self._entry_name(key)
+        with self._lock:
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'wb') as f: f.write(data)
+                    os.replace(tmp_path, self._blob_path(name))
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+            except IOError as e:
+                print(f"Error writing cache entry: {e}")
+                return
+            now = time.time()
+            self._index[name] = {'size': len(data), 'created': now, 'last_used': now}
+            self._removed.discard(name)
+            self._dirty = True
+            self._evict()
+
+    def remove(self, key):
+        """Removes the entry for a key, if present; the index is written by flush()."""
+        with self._lock:
+            self._remove_entry(self._entry_name(key))
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        with self._lock:
+            for name in list(self._index):
+                self._remove_entry(name)
+            self._save_index()
+
+    def total_size(self):
+        """Returns the total size in bytes of all cached entries."""
+        with self._lock:
+            return sum(entry['size'] for entry in self._index.values())
+
+    def flush(self):
+        """Writes the index changes (new, removed and used entries) made since the last write."""
+        with self._lock:
+            if self._dirty: self._save_index()
+
+    def _remove_entry(self, name):
+        """Deletes an entry's blob and index record. Must be called with the lock held."""
+        self._index.pop(name, None)
+        self._removed.add(name)
+        try: os.remove(self._blob_path(name))
+        except OSError: pass
+        self._dirty = True
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes. Must be called with the lock held."""
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes: return
+        for name, entry in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes: break
+            total -= entry['size']
+            self._remove_entry(name)
+
+    def _save_index(self):
+        """Merges the index with the on-disk copy, evicts, and writes it atomically. Must be called with the lock held."""
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        try:
+            with open(index_path + ".lock", 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                merged = self._read_index_file()
+                for name in self._removed: merged.pop(name, None)
+                for name, entry in self._index.items():
+                    if name not in merged or merged[name]['last_used'] < entry['last_used']:
+                        merged[name] = entry
+                self._index = merged
+                self._evict()
+                self._removed.clear()
+                with open(index_path + ".tmp", 'w') as f:
+                    json.dump(self._index, f)
+                os.replace(index_path + ".tmp", index_path)
+            self._dirty = False
+        except IOError as e:
+            print(f"Error saving cache index: {e}")
@@ -0,0 +1,54 @@
+# display_list_cache.py
+from collections import OrderedDict
+import fitz
+
+def render_rgb24(display_list, zoom, clip=None):
+    """
+    Rasterizes a display list (the clip region of it, in page coordinates) straight into an opaque
+    BGRA fitz.Pixmap, the memory layout of a cairo FORMAT_RGB24 surface on little-endian machines,
+    so it can be painted without converting it pixel by pixel in Python.
+    """
+    mupdf = fitz.mupdf
+    ctm = mupdf.FzMatrix(zoom, 0, 0, zoom, 0, 0)
+    rect = mupdf.fz_bound_display_list(display_list.this)
+    if clip is not None: rect = mupdf.fz_intersect_rect(rect, mupdf.FzRect(*clip))
+    bbox = mupdf.fz_round_rect(mupdf.fz_transform_rect(rect, ctm))
+    pixmap = mupdf.fz_new_pixmap_with_bbox(mupdf.fz_device_bgr(), bbox, mupdf.FzSeparations(), 1)
+    mupdf.fz_clear_pixmap_with_value(pixmap, 255)
+    device = mupdf.fz_new_draw_device(mupdf.FzMatrix(), pixmap)
+    mupdf.fz_run_display_list(display_list.this, device, ctm, mupdf.fz_rect_from_irect(bbox), mupdf.FzCookie())
+    mupdf.fz_close_device(device)
+    return fitz.Pixmap(pixmap)
+
+class DisplayListCache:
+    """
+    Keeps the MuPDF display lists of the most recently used pages of a document. A page's
+    content stream is interpreted once, when its display list is built, and every later
+    rendering of the page (view tiles at any zoom, thumbnails, printing) replays the list.
+    """
+    def __init__(self, doc, max_pages=16):
+        """Initializes an empty cache for a fitz.Document, holding at most max_pages lists."""
+        self.doc = doc
+        self.max_pages = max_pages
+        self._lists = OrderedDict()
+
+    def get(self, page_num):
+        """Returns the display list of a page, building it on first use."""
+        if (display_list := self._lists.get(page_num)) is not None:
+            self._lists.move_to_end(page_num)
+            return display_list
+        display_list = self._lists[page_num] = self.doc.load_page(page_num).get_displaylist()
+        while len(self._lists) > self.max_pages: self._lists.popitem(last=False)
+        return display_list
+
+    def get_pixmap(self, page_num, zoom, clip=None):
+        """Rasterizes a page (or the clip region of it) at the given zoom, as page.get_pixmap would."""
+        return self.get(page_num).get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+
+    def render_rgb24(self, page_num, zoom, clip=None):
+        """Rasterizes a page (or the clip region of it) at the given zoom in cairo's RGB24 layout, see render_rgb24."""
+        return render_rgb24(self.get(page_num), zoom, clip)
+
+    def clear(self):
+        """Drops every cached display list."""
+        self._lists.clear()
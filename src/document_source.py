@@ -0,0 +1,113 @@
+# document_source.py
+import io
+import os
+import mmap
+import hashlib
+import threading
+
+_open_sources = {}
+_sources_lock = threading.Lock()
+
+class MappedStream(io.RawIOBase):
+    """A read-only, seekable file object over a shared memory mapping, with its own position."""
+    def __init__(self, mapping):
+        """Initializes the stream at the start of the mapping."""
+        super().__init__()
+        self._mapping = mapping
+        self._pos = 0
+
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Moves the stream position, as for regular files."""
+        if whence == io.SEEK_CUR: offset += self._pos
+        elif whence == io.SEEK_END: offset += len(self._mapping)
+        if offset < 0: raise ValueError("negative seek position")
+        self._pos = offset
+        return self._pos
+
+    def read(self, size=-1):
+        """Reads up to size bytes (everything left if size is negative)."""
+        end = len(self._mapping) if size is None or size < 0 else min(self._pos + size, len(self._mapping))
+        data = self._mapping[self._pos:end] if end > self._pos else b""
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer):
+        """Reads bytes into a pre-allocated buffer, returning the number of bytes read."""
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+class DocumentSource:
+    """
+    Memory-maps a PDF file once and shares the mapping between consumers: MuPDF gets a
+    zero-copy memoryview, pyHanko's reader and incremental writer get independent
+    MappedStreams. The file's mtime and size are recorded so that changes on disk can be
+    detected with is_stale() before the (then inconsistent) mapping is used again. The
+    content digest is computed once, by whichever consumer asks for it first.
+    """
+    def __init__(self, file_path):
+        """Initializes the source by mapping the file; raises ValueError for empty files."""
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size == 0: raise ValueError(f"Empty file: {file_path}")
+            self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self._digest, self._digest_lock = None, threading.Lock()
+        with _sources_lock:
+            _open_sources[os.path.abspath(file_path)] = self
+
+    def is_stale(self):
+        """Checks whether the file on disk has been modified, replaced or removed since it was mapped."""
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return True
+        return (stat.st_mtime_ns, stat.st_size) != self.signature
+
+    @property
+    def size(self):
+        """The size in bytes of the mapped file."""
+        return self.signature[1]
+
+    def buffer(self):
+        """Returns a zero-copy memoryview over the whole file, e.g. for fitz.open(stream=...)."""
+        return memoryview(self._mapping)
+
+    def digest(self):
+        """Returns the SHA-256 hex digest of the file's contents, hashing the mapping on the first call only."""
+        with self._digest_lock:
+            if self._digest is None: self._digest = hashlib.sha256(self._mapping).hexdigest()
+            return self._digest
+
+    def open_stream(self):
+        """Returns a new independent, seekable read-only stream over the file contents."""
+        return MappedStream(self._mapping)
+
+    def close(self):
+        """Unregisters the source and releases the mapping once no consumer exports it any more."""
+        with _sources_lock:
+            if _open_sources.get(os.path.abspath(self.file_path)) is self:
+                del _open_sources[os.path.abspath(self.file_path)]
+        try:
+            self._mapping.close()
+        except BufferError:
+            pass # Still exported (e.g. to a fitz.Document); released when the last view goes away.
+
+def find_source(file_path):
+    """Returns the DocumentSource of a file if one is open and up to date in this process, or None."""
+    with _sources_lock:
+        source = _open_sources.get(os.path.abspath(file_path))
+    return source if source is not None and not source.is_stale() else None
+
+def open_stream(file_path):
+    """
+    Opens a file for reading, served from its DocumentSource if one is open and up to date
+    in this process, or from disk otherwise.
+    """
+    if (source := find_source(file_path)) is not None: return source.open_stream()
+    return open(file_path, 'rb')
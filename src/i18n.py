@@ -68,7 +68,43 @@ class I18NManager:
                 "prev_result_tooltip": "Resultado anterior",
                 "next_result_tooltip": "Siguiente resultado",
                 "print_document": "Imprimir Documento...",
-                "show_signatures_menu_item": "Mostrar Firmas"
+                "show_signatures_menu_item": "Mostrar Firmas",
+                "signature_validation": "Validación de Firmas",
+                "validation_mode": "Modo de validación",
+                "validation_mode_online": "En línea (descargar certificados y revocaciones)",
+                "validation_mode_offline": "Sin conexión (solo almacén de confianza local)",
+                "trust_store_folder": "Carpeta de certificados de confianza",
+                "choose_folder": "Elegir carpeta",
+                "deep_verification": "Verificación profunda",
+                "deep_verification_subtitle": "Analizar en segundo plano los cambios posteriores a cada firma (lento)",
+                "credential_session_ttl": "Recordar la clave desbloqueada (segundos)",
+                "credential_session_ttl_subtitle": "Tiempo sin uso tras el que se vuelve a pedir la contraseña (0: pedirla siempre)",
+                "validation_workers": "Procesos de validación",
+                "validation_workers_subtitle": "Firmas validadas en paralelo (0: uno por núcleo)",
+                "performance": "Rendimiento",
+                "stamp_backend": "Composición del sello",
+                "stamp_backend_subtitle": "El modo directo es más rápido y genera sellos más pequeños; usa HTML para textos que no admite",
+                "stamp_backend_html": "HTML (MuPDF)",
+                "stamp_backend_markup": "Directo (fuentes PDF estándar)",
+                "render_workers": "Procesos de dibujo",
+                "render_workers_subtitle": "Procesos que dibujan las páginas en segundo plano",
+                "tile_cache_size": "Memoria para páginas (MiB)",
+                "tile_cache_size_subtitle": "Memoria reservada a las partes de página ya dibujadas",
+                "thumbnail_cache_size": "Disco para miniaturas (MiB)",
+                "thumbnail_cache_size_subtitle": "Espacio para las miniaturas guardadas de los documentos abiertos",
+                "deep_verification_progress": "Analizando modificaciones ({0}/{1})",
+                "sig_modifications": "Modificaciones posteriores",
+                "sig_modifications_pending": "Analizando...",
+                "sig_digest_algorithm": "Algoritmo de resumen",
+                "modification_NONE": "Ninguna",
+                "modification_LTA_UPDATES": "Solo datos de archivo a largo plazo",
+                "modification_FORM_FILLING": "Relleno de formularios y nuevas firmas",
+                "modification_ANNOTATIONS": "Anotaciones",
+                "modification_OTHER": "Cambios en el contenido",
+                "modification_SUSPICIOUS": "Modificaciones sospechosas",
+                "document_changed_on_disk": "El documento ha cambiado en el disco y se ha vuelto a cargar. Seleccione de nuevo el área de firma.",
+                "continuous_scroll": "Desplazamiento continuo",
+                "zoom": "Zoom", "zoom_in": "Ampliar", "zoom_out": "Reducir", "fit_width": "Ajustar al ancho", "fit_page": "Ajustar a la página"
             },
             "en": {
                 "window_title": "GNOME-Sign", "open_pdf": "Open PDF...", "prev_page": "Previous page", "next_page": "Next page", 
@@ -134,7 +170,43 @@ class I18NManager:
                 "prev_result_tooltip": "Previous result",
                 "next_result_tooltip": "Next result",
                 "print_document": "Print Document...",
-                "show_signatures_menu_item": "Show Signatures"
+                "show_signatures_menu_item": "Show Signatures",
+                "signature_validation": "Signature Validation",
+                "validation_mode": "Validation mode",
+                "validation_mode_online": "Online (fetch certificates and revocation data)",
+                "validation_mode_offline": "Offline (local trust store only)",
+                "trust_store_folder": "Trust store folder",
+                "choose_folder": "Choose folder",
+                "deep_verification": "Deep verification",
+                "deep_verification_subtitle": "Analyze changes made after each signature in the background (slow)",
+                "credential_session_ttl": "Remember the unlocked key (seconds)",
+                "credential_session_ttl_subtitle": "Idle time after which the password is asked again (0: always ask)",
+                "validation_workers": "Validation processes",
+                "validation_workers_subtitle": "Signatures validated in parallel (0: one per core)",
+                "performance": "Performance",
+                "stamp_backend": "Stamp layout",
+                "stamp_backend_subtitle": "Direct layout is faster and makes smaller stamps; it falls back to HTML for text it cannot show",
+                "stamp_backend_html": "HTML (MuPDF)",
+                "stamp_backend_markup": "Direct (standard PDF fonts)",
+                "render_workers": "Rendering processes",
+                "render_workers_subtitle": "Processes drawing pages in the background",
+                "tile_cache_size": "Page memory (MiB)",
+                "tile_cache_size_subtitle": "Memory kept for already rendered parts of pages",
+                "thumbnail_cache_size": "Thumbnail disk space (MiB)",
+                "thumbnail_cache_size_subtitle": "Disk space for the stored thumbnails of opened documents",
+                "deep_verification_progress": "Analyzing modifications ({0}/{1})",
+                "sig_modifications": "Later modifications",
+                "sig_modifications_pending": "Analyzing...",
+                "sig_digest_algorithm": "Digest algorithm",
+                "modification_NONE": "None",
+                "modification_LTA_UPDATES": "Long-term archival data only",
+                "modification_FORM_FILLING": "Form filling and new signatures",
+                "modification_ANNOTATIONS": "Annotations",
+                "modification_OTHER": "Content changes",
+                "modification_SUSPICIOUS": "Suspicious modifications",
+                "document_changed_on_disk": "The document changed on disk and has been reloaded. Please select the signature area again.",
+                "continuous_scroll": "Continuous Scrolling",
+                "zoom": "Zoom", "zoom_in": "Zoom In", "zoom_out": "Zoom Out", "fit_width": "Fit Width", "fit_page": "Fit Page"
             }
         }
 
@@ -0,0 +1,67 @@
+# incremental_update.py
+import re
+import hashlib
+
+_REFERENCE = re.compile(r'(\d+) 0 R')
+# Keys pointing back up or across the document (parent nodes, other pages, actions, signature values)
+# whose targets do not affect how a page is rendered. Parent nodes are compared through _INHERITABLE_KEYS.
+_NON_RENDERING_KEY = re.compile(r'/(Parent|P|Dest|A|V|Next|Prev|First|Last)\s+\d+ 0 R')
+# Page attributes that may be inherited from the ancestor /Pages nodes.
+_INHERITABLE_KEYS = ("Resources", "MediaBox", "CropBox", "Rotate")
+
+def is_incremental_successor(old_digest, old_size, new_source):
+    """
+    Tells whether the file of new_source (a DocumentSource) is a file of old_size bytes and SHA-256 hex digest
+    old_digest with an incremental update appended, by hashing its first old_size bytes; meant for a worker thread.
+    """
+    if new_source.size <= old_size: return False
+    return hashlib.sha256(new_source.buffer()[:old_size]).hexdigest() == old_digest
+
+def unchanged_pages(old_doc, new_doc):
+    """
+    Returns the numbers of the pages of new_doc (an incremental-update successor of old_doc) that
+    render exactly as in old_doc: same page object, same attributes inherited from its ancestor
+    /Pages nodes, and every object it reaches (contents, resources, annotations and their
+    appearance streams) byte-identical in both documents.
+    """
+    if len(old_doc) != len(new_doc): return set()
+    old_catalog, new_catalog = old_doc.pdf_catalog(), new_doc.pdf_catalog()
+    if old_doc.xref_get_key(old_catalog, "OCProperties") != new_doc.xref_get_key(new_catalog, "OCProperties"): return set()
+    old_length = old_doc.xref_length()
+    same, references, inherited = {}, {}, {}
+
+    def object_unchanged(xref):
+        if xref not in same:
+            source = new_doc.xref_object(xref, compressed=True) if xref < new_doc.xref_length() else None
+            same[xref] = (xref < old_length and source is not None and source == old_doc.xref_object(xref, compressed=True)
+                          and (not new_doc.xref_is_stream(xref) or new_doc.xref_stream_raw(xref) == old_doc.xref_stream_raw(xref)))
+            references[xref] = [int(r) for r in _REFERENCE.findall(_NON_RENDERING_KEY.sub('', source or ''))]
+        return same[xref]
+
+    def node_inherited(xref):
+        """Returns the references reached by the inheritable attributes of a /Pages node, or None if they (or its parent) changed."""
+        if xref not in inherited:
+            inherited[xref] = None
+            values = [new_doc.xref_get_key(xref, key) for key in _INHERITABLE_KEYS + ("Parent",)]
+            if values == [old_doc.xref_get_key(xref, key) for key in _INHERITABLE_KEYS + ("Parent",)]:
+                inherited[xref] = [int(r) for _, value in values[:-1] for r in _REFERENCE.findall(value)]
+                if values[-1][0] == 'xref':
+                    parent = node_inherited(int(values[-1][1].split()[0]))
+                    inherited[xref] = None if parent is None else inherited[xref] + parent
+        return inherited[xref]
+
+    def page_unchanged(page_num):
+        xref = new_doc.page_xref(page_num)
+        if xref != old_doc.page_xref(page_num) or new_doc.page_cropbox(page_num) != old_doc.page_cropbox(page_num): return False
+        parent = new_doc.xref_get_key(xref, "Parent")
+        ancestors = node_inherited(int(parent[1].split()[0])) if parent[0] == 'xref' else []
+        if ancestors is None: return False
+        seen, pending = {xref, *ancestors}, [xref, *ancestors]
+        while pending:
+            xref = pending.pop()
+            if not object_unchanged(xref): return False
+            for reference in references[xref]:
+                if reference not in seen: seen.add(reference); pending.append(reference)
+        return True
+
+    return {page_num for page_num in range(len(new_doc)) if page_unchanged(page_num)}
@@ -0,0 +1,81 @@
+# page_index.py
+from pyhanko.pdf_utils.generic import DictionaryObject, IndirectObject, Reference
+
+def ref_key(obj):
+    """Returns a hashable (idnum, generation) key for an indirect reference, or None for direct objects."""
+    if isinstance(obj, (IndirectObject, Reference)): return (obj.idnum, obj.generation)
+    return None
+
+class PageIndex:
+    """
+    Maps page object references to page numbers for one document.
+    The /Pages tree is walked once, so trees of any depth (including balanced
+    trees whose /Kids hold intermediate /Pages nodes) are supported, and every
+    lookup afterwards is a dictionary access. Nodes are told apart by their /Type
+    (by their /Kids if they have none); kids that are neither pages nor page tree
+    nodes are skipped, so page numbers match the pages MuPDF shows. Annotation
+    references are indexed lazily from the pages' /Annots arrays, for widgets
+    that carry no /P entry.
+    """
+    def __init__(self, reader):
+        """Initializes the index by walking the page tree of a pyHanko reader."""
+        self._page_refs = []
+        self._pages = {}
+        self._annotations = None
+        self._build(reader.root.raw_get('/Pages'))
+
+    def __len__(self):
+        """Returns the number of pages in the document."""
+        return len(self._page_refs)
+
+    def _build(self, root_ref):
+        """Walks the page tree depth first, in document order, skipping nodes already visited and objects that are not pages."""
+        stack, visited = [root_ref], set()
+        while stack:
+            node_ref = stack.pop()
+            key = ref_key(node_ref)
+            if key is not None:
+                if key in visited: continue
+                visited.add(key)
+            node = node_ref.get_object()
+            if not isinstance(node, DictionaryObject): continue
+            node_type = node.get('/Type')
+            if node_type == '/Pages' or (node_type is None and '/Kids' in node):
+                if '/Kids' not in node: continue
+                kids = node.raw_get('/Kids').get_object()
+                stack.extend(kids.raw_get(i) for i in reversed(range(len(kids))))
+            elif node_type == '/Page' or node_type is None:
+                if key is not None: self._pages[key] = len(self._page_refs)
+                self._page_refs.append(node_ref)
+
+    def page_number(self, page_ref):
+        """Returns the zero-based page number of a page reference, or -1 if it is not a page of this document."""
+        return self._pages.get(ref_key(page_ref), -1)
+
+    def annotation_page(self, annot_ref):
+        """Returns the page number whose /Annots array holds the given annotation, or -1."""
+        if self._annotations is None:
+            self._annotations = {}
+            for page_num, page_ref in enumerate(self._page_refs):
+                annots = page_ref.get_object().get('/Annots')
+                if annots is None: continue
+                for i in range(len(annots)):
+                    key = ref_key(annots.raw_get(i))
+                    if key is not None: self._annotations.setdefault(key, page_num)
+        return self._annotations.get(ref_key(annot_ref), -1)
+
+    @staticmethod
+    def field_widget(field):
+        """Returns the widget annotation of a form field and its reference: the field itself, or its first kid."""
+        if '/Kids' in field:
+            kids = field['/Kids']
+            if len(kids) > 0: return kids[0], kids.raw_get(0)
+        return field, field.container_ref
+
+    def field_page(self, field):
+        """Returns the page number on which a form field's widget is placed, or -1 if it cannot be found."""
+        widget, widget_ref = self.field_widget(field)
+        if '/P' in widget:
+            page_num = self.page_number(widget.raw_get('/P'))
+            if page_num >= 0: return page_num
+        return self.annotation_page(widget_ref)
@@ -0,0 +1,172 @@
+# render_service.py
+import os
+import mmap
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import fitz
+from display_list_cache import DisplayListCache
+
+_worker_docs = {}
+# Rendered samples are handed from the worker processes to the UI process through files in shared memory.
+_SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+class SharedSamples:
+    """
+    The samples of a pixmap rendered in a worker process, written once into a file in shared memory.
+    Only its path crosses the pool's pipe; the UI process maps the file (see map()) and paints from
+    the mapping, so the pixels are neither pickled nor copied again.
+    """
+    def __init__(self, pix):
+        """Writes a pixmap's samples into a new shared memory file."""
+        self.size, self.path = len(pix.samples_mv), None
+        if not self.size: return
+        fd, self.path = tempfile.mkstemp(prefix="gnomesign-samples-", dir=_SHARED_DIR)
+        try:
+            os.ftruncate(fd, self.size)
+            with mmap.mmap(fd, self.size) as mapping: mapping[:] = pix.samples_mv
+        finally: os.close(fd)
+
+    def map(self):
+        """Maps the samples as a writable buffer and removes the file, whose memory is freed with the mapping."""
+        if self.path is None: return bytearray()
+        fd = os.open(self.path, os.O_RDWR)
+        try: return mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd); os.unlink(self.path)
+
+def map_shared(result):
+    """Returns a worker's result with its SharedSamples (at any depth of nested tuples) replaced by their mappings."""
+    if isinstance(result, SharedSamples): return result.map()
+    if isinstance(result, tuple): return tuple(map_shared(item) for item in result)
+    return result
+
+def _raster(pix):
+    """Returns the (x, y, width, height, stride, samples) of a pixmap rendered in a worker, its samples shared with the UI process."""
+    return pix.x, pix.y, pix.width, pix.height, pix.stride, SharedSamples(pix)
+
+def _get_worker_document(file_path, signature):
+    """Returns this worker's display lists of a file's pages, re-opening the file if it changed."""
+    key = (file_path, signature)
+    if key not in _worker_docs:
+        for display_lists in _worker_docs.values(): display_lists.doc.close()
+        _worker_docs.clear()
+        _worker_docs[key] = DisplayListCache(fitz.open(file_path))
+    return _worker_docs[key]
+
+def render_region(file_path, signature, page_num, zoom, clip=None):
+    """
+    Worker process entry point: rasterizes a region of a page (the whole page if clip is None).
+    Returns (x, y, width, height, stride, samples), with the samples in cairo's RGB24 layout as
+    SharedSamples, which RenderService maps so that the UI wraps them in a cairo surface in place.
+    """
+    return _raster(_get_worker_document(file_path, signature).render_rgb24(page_num, zoom, clip))
+
+def render_thumbnail(file_path, signature, page_num, zoom):
+    """Worker process entry point: rasterizes a page's thumbnail and returns it encoded as PNG, so the UI never encodes it on its main loop."""
+    return _get_worker_document(file_path, signature).get_pixmap(page_num, zoom).tobytes("png")
+
+def render_stamp(html, width, height, zoom, pdf_bytes=None, layout_scale=None, backend='html'):
+    """
+    Worker process entry point: lays out a signature stamp's HTML (or Pango markup, with the 'markup' backend) in a
+    width x height point box (unless the laid-out pdf_bytes are given; layout_scale is a hint for the layout) and rasterizes it like render_region.
+    Returns (pdf_bytes, layout_scale, raster), pdf_bytes being None if they were given.
+    """
+    from stamp_creator import HtmlStamp
+    stamp = HtmlStamp(html_content=html, width=width, height=height, pdf_bytes=pdf_bytes, layout_scale=layout_scale, backend=backend)
+    return stamp.pdf_bytes if pdf_bytes is None else None, stamp.layout_scale, _raster(stamp.get_pixmap_rgb24(zoom))
+
+class RenderService:
+    """
+    Rasterizes pages with MuPDF on a pool of worker processes, each holding its own
+    fitz.Document and page display lists, so that rendering never blocks the UI. PyMuPDF holds the GIL
+    while rendering, so a tile rendered on a thread stalls the main loop for as long as it takes to render
+    (about 280 ms for a 1024 px tile of a heavy page, against 6 ms with a worker process). Workers are
+    spawned once and keep their document open. Requests are identified by a key (a tuple, whose
+    first element tells the page tiles of the view from e.g. thumbnails); duplicate
+    requests are merged and results are delivered through a callback, from a
+    background thread, unless the document changed or the request was cancelled;
+    rendered samples arrive mapped from shared memory (see SharedSamples).
+    """
+    def __init__(self, max_workers=2):
+        """Initializes the service; worker processes are spawned on first use."""
+        self.max_workers = max(1, max_workers)
+        self.file_path, self.signature = None, None
+        self._executor = None
+        self._pending = {}
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def _get_executor(self):
+        """Lazily creates the process pool. Workers are spawned, never forked, to stay clear of GTK state."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def set_max_workers(self, max_workers):
+        """Changes the number of worker processes; the current pool finishes its pending requests and a new one is spawned on next use."""
+        with self._lock:
+            self.max_workers = max(1, max_workers)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def set_document(self, file_path, signature=None):
+        """Switches to another document (or version of it), discarding every pending request."""
+        with self._lock:
+            self.cancel_where(lambda key: True)
+            self.file_path, self.signature = file_path, signature
+            self._generation += 1
+
+    def is_pending(self, key):
+        """Returns True if a request with this key is queued or running."""
+        with self._lock: return key in self._pending
+
+    def request(self, key, page_num, zoom, clip, callback):
+        """
+        Queues the rendering of a page region unless an identical request is pending.
+        callback(key, result) is called with render_region's result once it is ready.
+        """
+        if self.file_path is None: return
+        self.submit(key, render_region, (self.file_path, self.signature, page_num, zoom, clip), callback, f"page {page_num + 1}")
+
+    def request_thumbnail(self, key, page_num, zoom, callback):
+        """Queues the rendering of a page's thumbnail unless an identical request is pending; callback(key, png_bytes) is called once it is ready."""
+        if self.file_path is None: return
+        self.submit(key, render_thumbnail, (self.file_path, self.signature, page_num, zoom), callback, f"thumbnail of page {page_num + 1}")
+
+    def submit(self, key, function, args, callback, description="request"):
+        """Queues a call of a worker entry point (such as render_stamp) unless a request with the same key is pending."""
+        with self._lock:
+            if key in self._pending: return
+            generation = self._generation
+            future = self._get_executor().submit(function, *args)
+            self._pending[key] = future
+        def on_done(f):
+            with self._lock:
+                if self._pending.get(key) is f: del self._pending[key]
+                if f.cancelled(): return
+                current = generation == self._generation
+            try:
+                # Mapped even if the result is dropped, so that its shared memory is released.
+                result = map_shared(f.result())
+            except Exception as e:
+                print(f"Error rendering {description}: {e}")
+                return
+            if current: callback(key, result)
+        future.add_done_callback(on_done)
+
+    def cancel_where(self, predicate):
+        """Cancels the pending requests whose key matches the predicate, if they have not started yet."""
+        with self._lock:
+            for key, future in list(self._pending.items()):
+                if predicate(key) and future.cancel():
+                    self._pending.pop(key, None)
+
+    def shutdown(self):
+        """Stops the worker processes, discarding any queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
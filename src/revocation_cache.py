@@ -0,0 +1,122 @@
+# revocation_cache.py
+from datetime import datetime, timezone, timedelta
+from asn1crypto import crl, ocsp
+from pyhanko_certvalidator.fetchers import Fetchers
+from pyhanko_certvalidator.fetchers.requests_fetchers import RequestsFetcherBackend
+from pyhanko_certvalidator.fetchers.requests_fetchers.crl_client import RequestsCRLFetcher
+from pyhanko_certvalidator.fetchers.requests_fetchers.ocsp_client import RequestsOCSPFetcher
+from pyhanko_certvalidator.fetchers.requests_fetchers.cert_fetch_client import RequestsCertificateFetcher
+from pyhanko_certvalidator.util import issuer_serial
+from disk_cache import DiskCache
+
+class RevocationCache:
+    """
+    Stores fetched CRLs and OCSP responses on disk and serves them again for as long
+    as each response's own thisUpdate/nextUpdate window says it is current.
+    Responses without a nextUpdate are considered fresh for DEFAULT_LIFETIME.
+    """
+    MAX_BYTES = 32 * 1024 * 1024
+    DEFAULT_LIFETIME = timedelta(hours=1)
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        """Initializes the cache in the given directory."""
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+
+    def _is_current(self, this_update, next_update):
+        """Checks whether a response's validity window covers the current time."""
+        now = datetime.now(timezone.utc)
+        if this_update is None or this_update > now: return False
+        return now < (next_update or this_update + self.DEFAULT_LIFETIME)
+
+    def get_crl(self, url):
+        """Returns the cached CRL for a distribution point URL, or None if absent or stale."""
+        data = self.store.get(f"crl:{url}")
+        if data is None: return None
+        try:
+            crl_obj = crl.CertificateList.load(data)
+            tbs = crl_obj['tbs_cert_list']
+            if self._is_current(tbs['this_update'].native, tbs['next_update'].native): return crl_obj
+        except ValueError:
+            pass
+        self.store.remove(f"crl:{url}")
+        return None
+
+    def put_crl(self, url, crl_obj):
+        """Stores a freshly fetched CRL."""
+        self.store.put(f"crl:{url}", crl_obj.dump())
+
+    def flush(self):
+        """Writes the cache index, making the responses stored since the last flush visible to other processes."""
+        self.store.flush()
+
+    @staticmethod
+    def _ocsp_key(cert, authority):
+        """Builds the cache key of an OCSP response for a certificate and its issuing authority."""
+        return f"ocsp:{issuer_serial(cert)!r}:{authority.hashable!r}"
+
+    def get_ocsp(self, cert, authority):
+        """Returns the cached OCSP response for a certificate, or None if absent or stale."""
+        key = self._ocsp_key(cert, authority)
+        data = self.store.get(key)
+        if data is None: return None
+        try:
+            response = ocsp.OCSPResponse.load(data)
+            single = response.basic_ocsp_response['tbs_response_data']['responses'][0]
+            if self._is_current(single['this_update'].native, single['next_update'].native): return response
+        except (ValueError, KeyError, IndexError, TypeError):
+            pass
+        self.store.remove(key)
+        return None
+
+    def put_ocsp(self, cert, authority, response):
+        """Stores a freshly fetched OCSP response, if the responder answered successfully."""
+        if response['response_status'].native == 'successful':
+            self.store.put(self._ocsp_key(cert, authority), response.dump())
+
+class CachingCRLFetcher(RequestsCRLFetcher):
+    """A CRL fetcher that consults the RevocationCache before going to the network."""
+    def __init__(self, cache, *args, **kwargs):
+        """Initializes the fetcher with the cache to read from and write to."""
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    async def _fetch_single(self, url):
+        """Returns a current cached CRL for the URL, fetching and caching it otherwise."""
+        if (cached := self.cache.get_crl(url)) is not None:
+            async def from_cache(): return cached
+            return await self._perform_fetch(url, from_cache)
+        crl_obj = await super()._fetch_single(url)
+        self.cache.put_crl(url, crl_obj)
+        return crl_obj
+
+class CachingOCSPFetcher(RequestsOCSPFetcher):
+    """An OCSP fetcher that consults the RevocationCache before querying the responder."""
+    def __init__(self, cache, *args, **kwargs):
+        """Initializes the fetcher with the cache to read from and write to."""
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    async def fetch(self, cert, authority):
+        """Returns a current cached OCSP response for the certificate, querying and caching it otherwise."""
+        async def task():
+            if (cached := self.cache.get_ocsp(cert, authority)) is not None: return cached
+            response = await self._fetch(cert, authority)
+            self.cache.put_ocsp(cert, authority, response)
+            return response
+        return await self._perform_fetch((issuer_serial(cert), authority.hashable), task)
+
+class CachingFetcherBackend(RequestsFetcherBackend):
+    """A requests-based fetcher backend whose CRL and OCSP fetchers share a RevocationCache."""
+    def __init__(self, cache, per_request_timeout=10):
+        """Initializes the backend with the revocation cache to use."""
+        super().__init__(per_request_timeout=per_request_timeout)
+        self.cache = cache
+
+    def get_fetchers(self):
+        """Returns the fetchers used by a ValidationContext."""
+        timeout = self.per_request_timeout
+        return Fetchers(
+            ocsp_fetcher=CachingOCSPFetcher(self.cache, per_request_timeout=timeout),
+            crl_fetcher=CachingCRLFetcher(self.cache, per_request_timeout=timeout),
+            cert_fetcher=RequestsCertificateFetcher(per_request_timeout=timeout)
+        )
@@ -0,0 +1,429 @@
+# signature_validator.py
+import os
+import base64
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.pdf_utils.misc import PdfReadError
+from pyhanko.sign.validation import validate_pdf_signature
+from pyhanko.sign.diff_analysis import SuspiciousModification
+from pyhanko_certvalidator import ValidationContext
+from asn1crypto import x509
+from disk_cache import file_digest
+from document_source import DocumentSource, open_stream
+from page_index import PageIndex
+from trust_store import TrustStore
+from revocation_cache import RevocationCache, CachingFetcherBackend
+
+SUSPICIOUS_MODIFICATION = "SUSPICIOUS"
+
+_trust_stores = {}
+_revocation_caches = {}
+_worker_documents = {}
+
+_UNSET = object()
+_CERT_FIELDS = ('signer_name', 'issuer_cn', 'serial')
+
+def _get_cn_from_name(name_obj):
+    """Returns the common name of an X.509 name, or its string form."""
+    if not name_obj: return "N/A"
+    try:
+        native_dict = name_obj.native
+        return native_dict.get('common_name', str(name_obj))
+    except Exception: return str(name_obj)
+
+class SignatureDetails:
+    """
+    A compact record holding processed information about a digital signature.
+    Certificate-derived fields are decoded on first access and memoized; the pyHanko
+    signature and status objects (which keep the whole document reader alive) are
+    not retained, but the signature can be re-opened from the file on demand.
+    """
+    SUMMARY_FIELDS = ('field_name', 'intact', 'valid', 'trusted', 'revoked', 'signer_name', 'issuer_cn', 'serial',
+                      'sign_time', 'reason', 'location', 'contact_info', 'page_num', 'rect', 'modification_level')
+    __slots__ = ('field_name', 'intact', 'valid', 'trusted', 'revoked', 'reason', 'location', 'contact_info',
+                 'page_num', 'rect', 'modification_level', 'file_path', 'index',
+                 '_cert', '_signed_attrs', '_timestamp', '_signer_name', '_issuer_cn', '_serial', '_sign_time')
+
+    def __init__(self, pyhanko_sig, validation_status, page_num, rect, file_path=None, index=None):
+        """Initializes the signature details from pyHanko objects, keeping only what is needed to decode them later."""
+        self.field_name = str(pyhanko_sig.field_name)
+        self.intact = validation_status.intact
+        self.trusted = validation_status.trusted
+        self.revoked = validation_status.revoked
+        self.valid = validation_status.bottom_line
+        self.page_num = page_num
+        self.rect = rect
+        self.modification_level = None
+        self.file_path, self.index = file_path, index
+
+        sig_obj = pyhanko_sig.sig_object
+        self.reason = str(sig_obj.get('/Reason', ''))
+        self.location = str(sig_obj.get('/Location', ''))
+        self.contact_info = str(sig_obj.get('/ContactInfo', ''))
+
+        self._cert = getattr(validation_status, 'signer_cert', None) or pyhanko_sig.signer_cert
+        try: self._signed_attrs = pyhanko_sig.signer_info['signed_attrs']
+        except (KeyError, AttributeError, TypeError): self._signed_attrs = None
+        self._timestamp = validation_status.timestamp_validity.timestamp if validation_status.timestamp_validity else None
+        self._signer_name = self._issuer_cn = self._serial = self._sign_time = _UNSET
+
+    def _decode_cert(self):
+        """Decodes the signer, issuer and serial number from the signer certificate."""
+        self._signer_name, self._issuer_cn, self._serial = "Unknown", "Unknown", "Unknown"
+        cert = self._cert
+        if cert:
+            try:
+                self._signer_name = _get_cn_from_name(cert.subject)
+                self._issuer_cn = _get_cn_from_name(cert.issuer)
+                self._serial = str(cert.serial_number)
+            except Exception as e:
+                print(f"Error parsing certificate details: {e}")
+                self._signer_name = str(cert.subject) if cert.subject else "Parsing Error"
+                self._issuer_cn = str(cert.issuer) if cert.issuer else "Parsing Error"
+
+    @property
+    def signer_name(self):
+        """The common name of the signer."""
+        if self._signer_name is _UNSET: self._decode_cert()
+        return self._signer_name
+
+    @property
+    def issuer_cn(self):
+        """The common name of the signer certificate's issuer."""
+        if self._issuer_cn is _UNSET: self._decode_cert()
+        return self._issuer_cn
+
+    @property
+    def serial(self):
+        """The serial number of the signer certificate."""
+        if self._serial is _UNSET: self._decode_cert()
+        return self._serial
+
+    @property
+    def sign_time(self):
+        """The signing time from the signed attributes, falling back to the timestamp token."""
+        if self._sign_time is _UNSET:
+            self._sign_time = None
+            try:
+                for attr in self._signed_attrs or ():
+                    if attr['type'].native == 'signing_time':
+                        self._sign_time = attr['values'][0].native
+                        break
+            except (KeyError, AttributeError, IndexError, TypeError):
+                pass
+            if not self._sign_time: self._sign_time = self._timestamp
+        return self._sign_time
+
+    def to_summary(self):
+        """Returns the processed fields as a plain, picklable dictionary."""
+        return {name: getattr(self, name) for name in self.SUMMARY_FIELDS}
+
+    def to_cache_summary(self):
+        """
+        Returns a summary for the ValidationCache (or the UI process) without decoding the certificate: if its fields
+        have not been decoded yet, the signer certificate is kept instead, as base64 DER, for from_summary to decode on demand.
+        """
+        summary = {name: getattr(self, name) for name in self.SUMMARY_FIELDS if name not in _CERT_FIELDS}
+        if self._signer_name is _UNSET and self._cert is not None:
+            summary['certificate'] = base64.b64encode(self._cert.dump()).decode('ascii')
+        else:
+            summary.update((name, getattr(self, name)) for name in _CERT_FIELDS)
+        return summary
+
+    def load_embedded_signature(self):
+        """
+        Re-opens the file and returns its pyHanko EmbeddedPdfSignature for these details (with the signer certificate,
+        the CMS signed data and the signature dictionary), or None if unknown or the file no longer holds it.
+        """
+        if self.file_path is None or self.index is None: return None
+        try:
+            signatures = PdfFileReader(open_stream(self.file_path), strict=False).embedded_signatures
+            sig = signatures[self.index] if self.index < len(signatures) else None
+        except (OSError, PdfReadError) as e:
+            print(f"Error re-opening signature: {e}")
+            return None
+        return sig if sig is not None and str(sig.field_name) == self.field_name else None
+
+    @classmethod
+    def from_summary(cls, summary, file_path=None, index=None):
+        """Rebuilds signature details from a summary (see to_cache_summary), without the underlying pyHanko objects."""
+        details = cls.__new__(cls)
+        details.file_path, details.index = file_path, index
+        details._cert, details._signed_attrs, details._timestamp = None, None, None
+        for name in cls.SUMMARY_FIELDS:
+            setattr(details, '_' + name if name in _CERT_FIELDS + ('sign_time',) else name, summary.get(name))
+        if summary.get('certificate'):
+            details._cert = x509.Certificate.load(base64.b64decode(summary['certificate']))
+            details._signer_name = details._issuer_cn = details._serial = _UNSET
+        return details
+
+class ValidationSettings:
+    """A picklable description of how signatures are validated, shared with the worker processes."""
+    def __init__(self, offline=False, trust_store_dir=None, revocation_cache_dir=None):
+        """Initializes the settings; offline validation relies only on the local trust store."""
+        self.offline = offline
+        self.trust_store_dir = trust_store_dir
+        self.revocation_cache_dir = revocation_cache_dir
+
+    def cache_key(self):
+        """
+        Returns a string identifying these settings, so cached results are not mixed across modes. The trust store
+        is identified by the certificates it holds, so adding or removing anchors invalidates the cached verdicts.
+        """
+        trust_store = get_trust_store(self.trust_store_dir).digest if self.trust_store_dir else ''
+        return f"offline:{trust_store}" if self.offline else f"online:{trust_store}"
+
+def get_trust_store(directory):
+    """Returns the TrustStore for a directory, reloading it only when the directory contents change."""
+    store = _trust_stores.get(directory)
+    if store is None or store.fingerprint != TrustStore.directory_fingerprint(directory):
+        store = _trust_stores[directory] = TrustStore(directory)
+    return store
+
+def get_revocation_cache(directory):
+    """Returns the RevocationCache for a directory, shared by every validation in this process."""
+    if directory not in _revocation_caches:
+        _revocation_caches[directory] = RevocationCache(directory)
+    return _revocation_caches[directory]
+
+def flush_revocation_caches():
+    """Writes the index of every RevocationCache of this process."""
+    for cache in _revocation_caches.values(): cache.flush()
+
+def build_validation_context(settings=None):
+    """Builds the pyHanko ValidationContext described by the given settings."""
+    if settings is None: return ValidationContext(allow_fetching=True)
+    fetcher_backend = None
+    if not settings.offline and settings.revocation_cache_dir:
+        fetcher_backend = CachingFetcherBackend(get_revocation_cache(settings.revocation_cache_dir))
+    if not settings.trust_store_dir:
+        return ValidationContext(allow_fetching=not settings.offline, fetcher_backend=fetcher_backend)
+    return get_trust_store(settings.trust_store_dir).build_validation_context(allow_fetching=not settings.offline, fetcher_backend=fetcher_backend)
+
+def _validate_embedded_signature(sig, validation_context, page_index, file_path=None, index=None):
+    """Validates a single pyHanko embedded signature and locates it through the document's PageIndex."""
+    page_num = page_index.field_page(sig.sig_field)
+    rect = None
+    if page_num >= 0:
+        try: rect = [float(v) for v in page_index.field_widget(sig.sig_field)[0].get('/Rect', [])]
+        except (ValueError, TypeError): rect = None
+    status = validate_pdf_signature(sig, validation_context, skip_diff=True)
+    return SignatureDetails(sig, status, page_num, rect, file_path, index)
+
+def iter_validated_signatures(file_path, cancel_event=None, indexes=None, settings=None):
+    """
+    Validates the embedded signatures of a PDF file, yielding a SignatureDetails for each one in document order.
+    If indexes is given, only the signatures at those positions are validated.
+    """
+    with open_stream(file_path) as f:
+        reader = PdfFileReader(f, strict=False)
+        validation_context = build_validation_context(settings)
+        page_index = PageIndex(reader)
+        try:
+            for index, sig in enumerate(reader.embedded_signatures):
+                if indexes is not None and index not in indexes: continue
+                if cancel_event is not None and cancel_event.is_set(): return
+                yield _validate_embedded_signature(sig, validation_context, page_index, file_path, index)
+        finally:
+            flush_revocation_caches()
+
+def read_signature_byte_ranges(file_path):
+    """Returns the /ByteRange of every embedded signature in a PDF file, without validating them."""
+    with open_stream(file_path) as f:
+        reader = PdfFileReader(f, strict=False)
+        return [[int(v) for v in sig.sig_object.get('/ByteRange', [])] for sig in reader.embedded_signatures]
+
+def _get_worker_document(file_path):
+    """
+    Returns this worker's reader and PageIndex of a file, so that the page tree is walked once per document
+    however many of its signatures the worker validates. The file is mapped again if it changed on disk.
+    """
+    entry = _worker_documents.get(file_path)
+    if entry is None or entry[0].is_stale():
+        for source, _, _ in _worker_documents.values(): source.close()
+        _worker_documents.clear()
+        source = DocumentSource(file_path)
+        reader = PdfFileReader(source.open_stream(), strict=False)
+        entry = _worker_documents[file_path] = (source, reader, PageIndex(reader))
+    return entry[1], entry[2]
+
+def _validate_signature_at(file_path, index, settings=None):
+    """Worker process entry point: validates the signature at the given index, with the worker's reader of the file."""
+    reader, page_index = _get_worker_document(file_path)
+    try: return _validate_embedded_signature(reader.embedded_signatures[index], build_validation_context(settings), page_index).to_cache_summary()
+    finally: flush_revocation_caches()
+
+def analyze_modifications_at(file_path, index):
+    """
+    Runs pyHanko's difference analysis for the signature at the given index and returns
+    the name of the resulting ModificationLevel, or SUSPICIOUS_MODIFICATION.
+    """
+    with open_stream(file_path) as f:
+        reader = PdfFileReader(f, strict=False)
+        sig = reader.embedded_signatures[index]
+        sig.compute_integrity_info(skip_diff=False)
+        if isinstance(sig.diff_result, SuspiciousModification): return SUSPICIOUS_MODIFICATION
+        return sig.diff_result.modification_level.name
+
+class SignatureValidationEngine:
+    """
+    Validates the signatures of a document in parallel over a pool of worker processes.
+    Each signature hashes its own byte range and checks its own CMS blob, so they
+    are independent; results are still delivered in document order.
+    Signatures found in the optional ValidationCache are not validated again.
+    """
+    def __init__(self, max_workers=0, cache=None, settings=None):
+        """Initializes the engine; a max_workers of 0 uses one worker per CPU core."""
+        self.max_workers = max_workers if max_workers and max_workers > 0 else (os.cpu_count() or 1)
+        self.cache = cache
+        self.settings = settings or ValidationSettings()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Lazily creates the process pool. Workers are spawned, never forked, to stay clear of GTK state."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def set_max_workers(self, max_workers):
+        """Changes the number of worker processes (0 for one per CPU core); the current pool finishes its work and a new one is spawned on next use."""
+        with self._lock:
+            self.max_workers = max_workers if max_workers and max_workers > 0 else (os.cpu_count() or 1)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def validate(self, file_path, cancel_event=None):
+        """Yields a SignatureDetails for each signature of the file, in document order."""
+        settings = self.settings
+        byte_ranges = read_signature_byte_ranges(file_path)
+        if not byte_ranges: return
+        digest = file_digest(file_path) if self.cache is not None else None
+        context_key = settings.cache_key()
+        cached = [self.cache.lookup(digest, byte_range, context_key) if digest else None for byte_range in byte_ranges]
+        missing = [index for index, summary in enumerate(cached) if summary is None]
+
+        futures, in_thread = {}, None
+        if self.max_workers > 1 and len(missing) > 1:
+            executor = self._get_executor()
+            futures = {index: executor.submit(_validate_signature_at, file_path, index, settings) for index in missing}
+        elif missing:
+            in_thread = iter_validated_signatures(file_path, cancel_event, indexes=set(missing), settings=settings)
+        try:
+            for index, byte_range in enumerate(byte_ranges):
+                if cancel_event is not None and cancel_event.is_set(): return
+                if cached[index] is not None:
+                    yield SignatureDetails.from_summary(cached[index], file_path, index)
+                    continue
+                if index in futures:
+                    summary = futures[index].result()
+                    details = SignatureDetails.from_summary(summary, file_path, index)
+                else:
+                    # The in-thread generator stops early once cancelled: check first, and treat exhaustion as cancellation.
+                    if cancel_event is not None and cancel_event.is_set(): return
+                    if (details := next(in_thread, None)) is None: return
+                    summary = details.to_cache_summary()
+                if digest: self.cache.store_summary(digest, byte_range, context_key, summary)
+                yield details
+        finally:
+            for future in futures.values(): future.cancel()
+            if in_thread is not None: in_thread.close()
+            if self.cache is not None: self.cache.flush()
+
+    def analyze_modifications(self, file_path, cancel_event=None):
+        """
+        Yields (index, modification level) for each signature of the file, in document order.
+        Results are cached per file digest, as they depend only on the document's contents.
+        """
+        count = len(read_signature_byte_ranges(file_path))
+        if not count: return
+        digest = file_digest(file_path) if self.cache is not None else None
+        levels = self.cache.lookup_modifications(digest) if digest else None
+        if levels is not None and len(levels) == count:
+            yield from enumerate(levels)
+            return
+        futures, levels = {}, []
+        if self.max_workers > 1 and count > 1:
+            executor = self._get_executor()
+            futures = {index: executor.submit(analyze_modifications_at, file_path, index) for index in range(count)}
+        try:
+            for index in range(count):
+                if cancel_event is not None and cancel_event.is_set(): return
+                level = futures[index].result() if futures else analyze_modifications_at(file_path, index)
+                levels.append(level)
+                yield index, level
+            if digest: self.cache.store_modifications(digest, levels)
+        finally:
+            for future in futures.values(): future.cancel()
+
+    def shutdown(self):
+        """Stops the worker processes, discarding any queued work."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+class SignatureValidationJob:
+    """
+    Validates the signatures of a document on a worker thread.
+    Callbacks are invoked from the worker thread; callers are responsible for
+    dispatching them to their own main loop. A cancelled job never reports again.
+    """
+    def __init__(self, file_path, engine, on_signature, on_finished):
+        """Initializes the job for a file with per-signature and completion callbacks."""
+        self.file_path = file_path
+        self.engine = engine
+        self.on_signature = on_signature
+        self.on_finished = on_finished
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="signature-validation", daemon=True)
+
+    def start(self):
+        """Starts validating on the worker thread."""
+        self._thread.start()
+
+    def cancel(self):
+        """Requests the job to stop; pending results are discarded."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        """Returns True if the job has been cancelled."""
+        return self._cancel_event.is_set()
+
+    def _run(self):
+        """Worker thread body: validates each signature and reports it as soon as it is ready."""
+        try:
+            for details in self.engine.validate(self.file_path, self._cancel_event):
+                if self.is_cancelled(): return
+                self.on_signature(self, details)
+        except Exception as e:
+            print(f"Could not analyze for signatures: {e}")
+        if not self.is_cancelled():
+            self.on_finished(self)
+
+class DeepVerificationJob(SignatureValidationJob):
+    """
+    Runs the (slow) difference analysis of every signature of a document on a worker thread,
+    to detect content changed by incremental updates after signing. on_progress receives
+    the job, the signature index, the number of signatures and the modification level.
+    """
+    def __init__(self, file_path, engine, signature_count, on_progress, on_finished):
+        """Initializes the job for a file with per-revision progress and completion callbacks."""
+        super().__init__(file_path, engine, on_progress, on_finished)
+        self.signature_count = signature_count
+        self._thread.name = "deep-verification"
+
+    def _run(self):
+        """Worker thread body: analyzes each signed revision and reports it as soon as it is done."""
+        try:
+            for index, level in self.engine.analyze_modifications(self.file_path, self._cancel_event):
+                if self.is_cancelled(): return
+                self.on_signature(self, index, self.signature_count, level)
+        except Exception as e:
+            print(f"Could not analyze document modifications: {e}")
+        if not self.is_cancelled():
+            self.on_finished(self)
@@ -0,0 +1,51 @@
+# stamp_benchmark.py
+import sys
+import time
+import argparse
+import statistics
+from stamp_template import compile_template
+from stamp_creator import HtmlStamp, pango_to_html
+
+TEMPLATES = {
+    "simple": "Digitally signed by:\n<b>$$SUBJECTCN$$</b>\nDate: $$SIGNDATE=dd-MM-yyyy$$",
+    "detailed": "Digitally signed by: <b>$$SUBJECTCN$$</b>\nDate: $$SIGNDATE=dd-MM-yyyy$$\nIssuer: <b>$$ISSUERCN$$</b>",
+    "styled": "<span font_family=\"serif\" size=\"large\"><b>$$SUBJECTCN$$</b></span>\n<i>$$SUBJECTO$$</i>\n"
+              "<span color=\"#1c71d8\">$$SIGNDATE=yyyy.MM.dd HH:mm:ss$$</span>\n<u>$$SUBJECTEMAIL$$</u>",
+}
+
+def time_layout(backend, markup, width, height, iterations):
+    """Lays out a stamp iterations times with a backend (the 'html' one including the Pango to HTML conversion); returns the times in ms."""
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        content = markup if backend == 'markup' else pango_to_html(markup)
+        HtmlStamp(content, width, height, backend=backend)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stamp_benchmark", description="Compare the layout time of signature stamps with the HTML and the direct markup backends.")
+    parser.add_argument("-n", "--iterations", type=int, default=50, help="layouts per template and backend (default: 50)")
+    parser.add_argument("--size", type=float, nargs=2, default=(200, 60), metavar=("WIDTH", "HEIGHT"), help="stamp box in points (default: 200 60)")
+    parser.add_argument("-t", "--template", action="append", help="a template text to time, instead of the built-in ones")
+    return parser
+
+def main(argv):
+    """Times every template with both backends and prints the median and best layout times."""
+    args = build_parser().parse_args(argv)
+    templates = {f"#{i + 1}": text for i, text in enumerate(args.template)} if args.template else TEMPLATES
+    width, height = args.size
+    print(f"{'template':<10} {'backend':<8} {'median ms':>10} {'best ms':>9} {'speed-up':>9}")
+    for name, text in templates.items():
+        markup = compile_template(text).render_sample()
+        medians = {}
+        for backend in ('html', 'markup'):
+            time_layout(backend, markup, width, height, 1)
+            times = time_layout(backend, markup, width, height, max(1, args.iterations))
+            medians[backend] = statistics.median(times)
+            speed_up = f"{medians['html'] / medians[backend]:.1f}x" if medians[backend] else "-"
+            print(f"{name:<10} {backend:<8} {medians[backend]:>10.2f} {min(times):>9.2f} {speed_up:>9}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,77 @@
+# stamp_cache.py
+import re
+import json
+import hashlib
+from disk_cache import DiskCache
+
+_TAG = re.compile(r'(<[^>]*>)')
+_DIGIT = re.compile(r'\d')
+
+def layout_skeleton(html):
+    """
+    Returns a stamp's HTML (or Pango markup) with every digit of its text, outside the tags, replaced by 0,
+    such as those of the signing date and time. Digits have the same advance width in the stamp fonts, so
+    stamps sharing a skeleton have the same layout.
+    """
+    parts = _TAG.split(html)
+    parts[::2] = [_DIGIT.sub('0', text) for text in parts[::2]]
+    return "".join(parts)
+
+class StampCache:
+    """
+    Persists the laid-out single-page PDF of signature stamps, keyed by a hash of their HTML and
+    their box size, so a stamp already used with the same template, certificate and size is never
+    laid out again. A stamp showing digits such as the signing date or time rarely repeats, so only
+    the layout scale found for its digit-free skeleton is stored, which lets the next such stamp be
+    laid out in a single pass. Hit and miss counts are available through stats().
+    """
+    MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        """Initializes the cache in the given directory."""
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+        self.hits, self.misses = 0, 0
+        self.skeleton_hits, self.skeleton_misses = 0, 0
+
+    @staticmethod
+    def _key(kind, html, width, height):
+        """Builds the cache key of a stamp (or of its skeleton's layout) at a box size."""
+        return f"{kind}:{hashlib.sha256(html.encode('utf-8')).hexdigest()}:{width:.1f}x{height:.1f}"
+
+    def lookup(self, html, width, height):
+        """Returns the cached PDF bytes of a stamp, or None; stamps with digits are never stored (see store_stamp)."""
+        if layout_skeleton(html) != html: return None
+        data = self.store.get(self._key("stamp", html, width, height))
+        if data is None: self.misses += 1
+        else: self.hits += 1
+        return data
+
+    def lookup_layout_scale(self, html, width, height):
+        """Returns the layout scale stored for the skeleton of a stamp's HTML at a box size, or None."""
+        data = self.store.get(self._key("skeleton", layout_skeleton(html), width, height))
+        try: scale = float(json.loads(data)['scale']) if data is not None else None
+        except (ValueError, KeyError, TypeError): scale = None
+        if scale is None: self.skeleton_misses += 1
+        else: self.skeleton_hits += 1
+        return scale
+
+    def store_stamp(self, html, width, height, pdf_bytes, layout_scale=None):
+        """Stores a freshly laid-out stamp if its HTML has no digits, or else only the layout scale (if known) of its skeleton."""
+        skeleton = layout_skeleton(html)
+        if skeleton == html: self.store.put(self._key("stamp", html, width, height), pdf_bytes)
+        elif layout_scale:
+            self.store.put(self._key("skeleton", skeleton, width, height), json.dumps({'scale': layout_scale}).encode('utf-8'))
+
+    def stats(self):
+        """Returns the hit and miss counts of this session, the hit ratios and the cache's size on disk."""
+        lookups, skeleton_lookups = self.hits + self.misses, self.skeleton_hits + self.skeleton_misses
+        return {
+            'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'skeleton_hits': self.skeleton_hits, 'skeleton_misses': self.skeleton_misses,
+            'skeleton_hit_ratio': self.skeleton_hits / skeleton_lookups if skeleton_lookups else 0.0,
+            'bytes': self.store.total_size()
+        }
+
+    def flush(self):
+        """Persists pending access-time updates to disk."""
+        self.store.flush()
@@ -10,6 +10,8 @@ from pyhanko.pdf_utils.content import ImportedPdfPage
 from pyhanko.pdf_utils.reader import PdfFileReader
 import uuid 
 from binascii import hexlify 
+from collections import OrderedDict
+from stamp_cache import layout_skeleton
 
 def pango_to_html(pango_text: str) -> str:
     converter = PangoToHtmlConverter(); converter.feed(pango_text)
@@ -71,21 +73,23 @@ class PangoToHtmlConverter(HTMLParser):
     def get_html(self) -> str: return "".join(self.html_parts).replace('\n', '<br/>')
 
 class InMemoryPdfPage(ImportedPdfPage):
-    def __init__(self, pdf_bytes: bytes, page_ix=0):
+    def __init__(self, stamp, page_ix=0):
         self.name = hexlify(uuid.uuid4().bytes).decode('ascii')
         super().__init__(self.name, page_ix=page_ix)
-        self.pdf_bytes = pdf_bytes
+        self.stamp = stamp
+        self._imported = None
 
     def render(self) -> bytes:
         """
-        Override the render method to use the in-memory buffer.
+        Override the render method to use the stamp's already parsed in-memory PDF.
+        The page is imported as an XObject once per writer, however often pyHanko renders it.
         IMPORTANT: We do not modify self.box. The size is already defined
         by the container of the stamp (StaticContentStamp).
         """
         w = self._ensure_writer
-        r = PdfFileReader(BytesIO(self.pdf_bytes))
-        
-        xobj_ref = w.import_page_as_xobject(r, page_ix=self.page_ix)
+        if self._imported is None or self._imported[0] is not w:
+            self._imported = (w, w.import_page_as_xobject(self.stamp.reader, page_ix=self.page_ix))
+        xobj_ref = self._imported[1]
         
         resource_name = b'/Import' + self.name.encode('ascii')
         self.resources.xobject[resource_name.decode('ascii')] = xobj_ref
@@ -93,18 +97,65 @@ class InMemoryPdfPage(ImportedPdfPage):
         return resource_name + b' Do'
 
 class HtmlStamp:
-    def __init__(self, html_content: str, width: float, height: float):
-        self.pdf_buffer = self._render_html_to_pdf(html_content, width, height)
+    """
+    A signature stamp's appearance: its HTML laid out once as a one-page PDF of width x height points.
+    With the 'markup' backend the content is the stamp's Pango markup instead, laid out directly by
+    stamp_layout (or, for text the base-14 fonts cannot show, converted to HTML as before). The PDF bytes (or those laid out by a worker process, if given), the pyHanko reader parsing them
+    and the previews rendered from them are kept together, so the stamp that is signed is the one
+    that was previewed, without a second layout.
+    """
+    MAX_PREVIEWS = 4
+
+    def __init__(self, html_content: str, width: float, height: float, pdf_bytes: bytes = None, layout_scale: float = None, backend: str = 'html'):
+        self.html_content, self.width, self.height = html_content, width, height
+        self.layout_scale = layout_scale
+        if pdf_bytes is not None: self.pdf_buffer = BytesIO(pdf_bytes)
+        elif backend == 'markup': self.pdf_buffer = self._render_markup_to_pdf(html_content, width, height)
+        else: self.pdf_buffer = self._render_html_to_pdf(html_content, width, height)
+        self.previews = OrderedDict()
+        self._reader = None
+
+    @property
+    def pdf_bytes(self) -> bytes:
+        return self.pdf_buffer.getvalue()
+
+    @property
+    def reader(self) -> PdfFileReader:
+        """The pyHanko reader of the laid-out PDF, parsed on first use."""
+        if self._reader is None: self._reader = PdfFileReader(BytesIO(self.pdf_buffer.getvalue()))
+        return self._reader
+
+    def add_preview(self, size, preview):
+        """Keeps a preview rendered at size (width, height in pixels), dropping the oldest ones."""
+        self.previews[size] = preview
+        while len(self.previews) > self.MAX_PREVIEWS: self.previews.popitem(last=False)
 
     def _render_html_to_pdf(self, html: str, width: float, height: float) -> BytesIO:
+        """
+        Lays out the HTML as page.insert_htmlbox does, shrinking it to fit the box. The scale found is kept in
+        layout_scale; if a layout_scale was given (see StampCache), it is tried first instead of searching.
+        """
         temp_doc = fitz.open()
         page_rect = fitz.Rect(0, 0, width, height)
         page = temp_doc.new_page(width=width, height=height)
-        page.insert_htmlbox(page_rect, html, rotate=0)
+        story = fitz.Story(html=html, user_css="body {margin:1px;}")
+        fit = story.fit_scale(page_rect, scale_min=self.layout_scale, scale_max=self.layout_scale) if self.layout_scale else None
+        if fit is None or not fit.big_enough: fit = story.fit_scale(page_rect, scale_min=1)
+        self.layout_scale = fit.parameter
+        story_doc = story.write_with_links(lambda *args: (fit.rect, fit.rect, fitz.Identity))
+        page.show_pdf_page(page_rect, story_doc, 0)
+        story_doc.close()
         pdf_bytes = temp_doc.tobytes()
         temp_doc.close()
         return BytesIO(pdf_bytes)
 
+    def _render_markup_to_pdf(self, markup: str, width: float, height: float) -> BytesIO:
+        """Lays out Pango markup in one pass with stamp_layout, falling back to the HTML layout for text outside WinAnsiEncoding."""
+        from stamp_layout import layout_markup
+        try: pdf_bytes, self.layout_scale = layout_markup(markup, width, height)
+        except UnicodeEncodeError: return self._render_html_to_pdf(pango_to_html(markup), width, height)
+        return BytesIO(pdf_bytes)
+
     def get_pixbuf(self, width: int, height: int):
         if not self.pdf_buffer or width <= 0 or height <= 0: return None
         self.pdf_buffer.seek(0)
@@ -116,13 +167,19 @@ class HtmlStamp:
         pixbuf = GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(pix.samples), GdkPixbuf.Colorspace.RGB, False, 8, pix.width, pix.height, pix.stride)
         doc.close(); return pixbuf
 
+    def get_pixmap_rgb24(self, zoom: float):
+        """Rasterizes the stamp at a zoom factor in cairo's RGB24 layout (see display_list_cache.render_rgb24)."""
+        from display_list_cache import render_rgb24
+        doc = fitz.open(stream=self.pdf_buffer.getvalue(), filetype="pdf")
+        try: return render_rgb24(doc.load_page(0).get_displaylist(), zoom)
+        finally: doc.close()
+
     def get_style(self) -> StaticStampStyle:
         """
         Gets a StaticStampStyle from pyHanko based on the PDF rendered
         directly from memory, ensuring it has no internal margins.
         """
-        pdf_bytes = self.pdf_buffer.getvalue()
-        stamp_style_background = InMemoryPdfPage(pdf_bytes)
+        stamp_style_background = InMemoryPdfPage(self)
 
         background_layout_rule = layout.SimpleBoxLayoutRule(
             x_align=AxisAlignment.ALIGN_MID,
@@ -134,4 +191,63 @@ class HtmlStamp:
             background=stamp_style_background, 
             border_width=0,
             background_layout=background_layout_rule 
-        )
\ No newline at end of file
+        )
+
+class StampAppearanceCache:
+    """
+    Keeps the most recently used stamp appearances keyed by (HTML, box size in points). The HTML
+    is derived from the template and the certificate and includes the signing date as formatted by
+    the template, so an appearance is reused only while the date shown on it stays the same.
+    With a StampCache as store, appearances are also looked up on disk before being laid out.
+    backend tells how new appearances are laid out (see HtmlStamp): 'html' or 'markup', whose stamps
+    are keyed by their Pango markup rather than HTML.
+    """
+    def __init__(self, max_entries=16, store=None, backend='html'):
+        self.max_entries = max_entries
+        self.store = store
+        self.backend = backend
+        self._stamps = OrderedDict()
+
+    @staticmethod
+    def _key(html_content, width, height):
+        """Returns the cache key of a stamp's content in a box, rounding the box to a tenth of a point."""
+        return (html_content, round(width, 1), round(height, 1))
+
+    def peek(self, html_content: str, width: float, height: float):
+        """Returns the cached appearance for a stamp, or None."""
+        key = self._key(html_content, width, height)
+        if (stamp := self._stamps.get(key)) is not None: self._stamps.move_to_end(key)
+        return stamp
+
+    def load(self, html_content: str, width: float, height: float):
+        """Returns the appearance for a stamp from memory or, already laid out, from the store; None if it has to be laid out."""
+        if (stamp := self.peek(html_content, width, height)) is not None: return stamp
+        if self.store is None or (pdf_bytes := self.store.lookup(html_content, width, height)) is None: return None
+        return self._add(HtmlStamp(html_content, width, height, pdf_bytes))
+
+    def layout_scale_hint(self, html_content: str, width: float, height: float):
+        """Returns the layout scale stored for stamps like this one (see StampCache), or None."""
+        return self.store.lookup_layout_scale(html_content, width, height) if self.store else None
+
+    def get(self, html_content: str, width: float, height: float, pdf_bytes: bytes = None, layout_scale: float = None) -> HtmlStamp:
+        """Returns the cached appearance for a stamp, laying it out (or adopting the pdf_bytes laid out elsewhere) if missing."""
+        if (stamp := self.peek(html_content, width, height) if pdf_bytes is not None else self.load(html_content, width, height)) is not None: return stamp
+        if pdf_bytes is None: layout_scale = self.layout_scale_hint(html_content, width, height)
+        stamp = HtmlStamp(html_content, width, height, pdf_bytes, layout_scale, self.backend)
+        if self.store: self.store.store_stamp(html_content, width, height, stamp.pdf_bytes, stamp.layout_scale)
+        return self._add(stamp)
+
+    def _add(self, stamp: HtmlStamp) -> HtmlStamp:
+        """Caches an appearance, dropping the least recently used ones beyond max_entries, and returns it."""
+        self._stamps[self._key(stamp.html_content, stamp.width, stamp.height)] = stamp
+        while len(self._stamps) > self.max_entries: self._stamps.popitem(last=False)
+        return stamp
+
+    def with_skeleton(self, html_content: str):
+        """Returns the cached appearances, at any box size, of the stamps sharing the layout skeleton of a stamp's HTML (see layout_skeleton)."""
+        skeleton = layout_skeleton(html_content)
+        return [stamp for key, stamp in self._stamps.items() if key[0] == html_content or layout_skeleton(key[0]) == skeleton]
+
+    def clear(self):
+        """Forgets every cached appearance (the on-disk store is kept)."""
+        self._stamps.clear()
@@ -0,0 +1,145 @@
+# stamp_layout.py
+import fitz
+from functools import lru_cache
+from html.parser import HTMLParser
+
+# Base-14 fonts by family and (bold, italic), so stamps need no embedded font files.
+_BASE14 = {
+    'sans': ('helv', 'heit', 'hebo', 'hebi'),
+    'serif': ('tiro', 'tiit', 'tibo', 'tibi'),
+    'mono': ('cour', 'coit', 'cobo', 'cobi'),
+}
+_FAMILIES = {'sans': 'sans', 'sans-serif': 'sans', 'helvetica': 'sans', 'arial': 'sans', 'serif': 'serif', 'times': 'serif',
+             'mono': 'mono', 'monospace': 'mono', 'courier': 'mono'}
+_SIZES = {'xx-small': 6, 'x-small': 7, 'small': 8, 'medium': 10, 'normal': 10, 'large': 13, 'x-large': 16, 'xx-large': 20}
+DEFAULT_SIZE = 10
+LINE_HEIGHT = 1.2
+MARGIN = 1
+
+def font_name(family, bold, italic):
+    """Returns the base-14 font name of a family ('sans', 'serif' or 'mono') and style."""
+    return _BASE14.get(family, _BASE14['sans'])[2 * bold + italic]
+
+@lru_cache(maxsize=None)
+def get_font(family, bold, italic):
+    """Returns the fitz.Font of a family and style, created once per process."""
+    return fitz.Font(font_name(family, bold, italic))
+
+@lru_cache(maxsize=4096)
+def _advance(family, bold, italic, char):
+    """Returns the advance width of a character in a font, at a font size of 1."""
+    return get_font(family, bold, italic).glyph_advance(ord(char))
+
+def text_width(text, family, bold, italic, size):
+    """Returns the width in points of a text in a font and size, from the cached glyph advances."""
+    return size * sum(_advance(family, bold, italic, char) for char in text)
+
+def _parse_color(value):
+    """Returns the RGB tuple (0..1) of a '#rgb' / '#rrggbb' color or a color name, or None."""
+    value = value.strip().lower()
+    if value.startswith('#') and len(value) in (4, 7):
+        digits = value[1:] if len(value) == 7 else "".join(c * 2 for c in value[1:])
+        try: return tuple(int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4))
+        except ValueError: return None
+    return fitz.pdfcolor.get(value.replace(' ', ''))
+
+def _parse_size(value):
+    """Returns the point size of a Pango size attribute: a name, 'Npt' or an integer in 1024ths of a point."""
+    value = value.strip().lower()
+    try:
+        if value in _SIZES: return _SIZES[value]
+        if value.endswith('pt'): return float(value[:-2])
+        return int(value) / 1024
+    except ValueError: return DEFAULT_SIZE
+
+class _MarkupParser(HTMLParser):
+    """Parses the Pango markup subset of stamp templates (b, i, u, span/font attributes) into lines of styled runs."""
+    def __init__(self):
+        super().__init__()
+        self.lines = [[]]
+        self.style_stack = [{'family': 'sans', 'bold': False, 'italic': False, 'underline': False, 'size': DEFAULT_SIZE, 'color': (0, 0, 0)}]
+
+    def handle_starttag(self, tag, attrs):
+        style = self.style_stack[-1].copy()
+        tag = tag.lower()
+        if tag == 'b': style['bold'] = True
+        elif tag == 'i': style['italic'] = True
+        elif tag == 'u': style['underline'] = True
+        elif tag in ('span', 'font'):
+            for attr, value in attrs:
+                attr, value = attr.lower(), value or ""
+                if attr in ('font_family', 'face'): style['family'] = _FAMILIES.get(value.lower(), 'sans')
+                elif attr in ('color', 'foreground', 'fgcolor'): style['color'] = _parse_color(value) or style['color']
+                elif attr == 'size': style['size'] = _parse_size(value)
+                elif attr == 'weight': style['bold'] = value.lower() in ('bold', 'heavy', 'ultrabold', 'semibold') or (value.isdigit() and int(value) >= 600)
+                elif attr == 'style': style['italic'] = value.lower() in ('italic', 'oblique')
+                elif attr == 'underline': style['underline'] = value.lower() != 'none'
+        self.style_stack.append(style)
+
+    def handle_endtag(self, tag):
+        if len(self.style_stack) > 1: self.style_stack.pop()
+
+    def handle_data(self, data):
+        style = self.style_stack[-1]
+        for i, text in enumerate(data.split('\n')):
+            if i: self.lines.append([])
+            if text: self.lines[-1].append((text, style['family'], style['bold'], style['italic'], style['underline'], style['size'], style['color']))
+
+@lru_cache(maxsize=64)
+def parse_markup(markup):
+    """Returns a stamp's Pango markup as a tuple of lines, each a tuple of (text, family, bold, italic, underline, size, color) runs."""
+    parser = _MarkupParser(); parser.feed(markup); parser.close()
+    return tuple(tuple(line) for line in parser.lines)
+
+def _pdf_string(text):
+    """Returns text as a PDF string literal in WinAnsiEncoding; raises UnicodeEncodeError for characters the encoding lacks."""
+    return b'(' + text.encode('cp1252').replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+def _pdf_color(color, operator):
+    """Returns the operation setting an RGB color (operator rg for filling, RG for stroking)."""
+    return b"%g %g %g %s" % (*color, operator)
+
+def layout_markup(markup, width, height):
+    """
+    Lays out a stamp's Pango markup as a single-page PDF of width x height points, whose content stream
+    is written directly in base-14 fonts (referenced, not embedded) measured with the cached font metrics: lines are centered both
+    ways, as the HTML stamps are, and the text is shrunk to fit the box by a single scale computed from
+    the measured runs, so the layout takes one pass. Lines are never wrapped. Returns (pdf_bytes, scale);
+    raises UnicodeEncodeError if the text has characters outside WinAnsiEncoding, which the base-14 fonts cannot show.
+    """
+    lines = parse_markup(markup)
+    widths = [sum(text_width(*run[:4], run[5]) for run in line) for line in lines]
+    heights = [max((run[5] for run in line), default=DEFAULT_SIZE) * LINE_HEIGHT for line in lines]
+    full_width, full_height = max(widths, default=0), sum(heights)
+    box_width, box_height = max(width - 2 * MARGIN, 1), max(height - 2 * MARGIN, 1)
+    scale = min(1, box_width / full_width if full_width else 1, box_height / full_height if full_height else 1)
+
+    content, fonts = [], {}
+    y = (height - full_height * scale) / 2
+    for line, line_width, line_height in zip(lines, widths, heights):
+        x = (width - line_width * scale) / 2
+        ascender = max((get_font(*run[1:4]).ascender * run[5] for run in line), default=0)
+        descender = min((get_font(*run[1:4]).descender * run[5] for run in line), default=0)
+        baseline = height - (y + ((line_height - (ascender - descender)) / 2 + ascender) * scale)
+        for text, family, bold, italic, underline, size, color in line:
+            name, fontsize = font_name(family, bold, italic), size * scale
+            end = x + text_width(text, family, bold, italic, fontsize)
+            fonts[name] = (family, bold, italic)
+            content.append(b"BT %s /%s %g Tf %g %g Td %s Tj ET" % (_pdf_color(color, b"rg"), name.encode('ascii'), fontsize, x, baseline, _pdf_string(text)))
+            if underline:
+                offset = baseline - fontsize * 0.12
+                content.append(b"%s %g w %g %g m %g %g l S" % (_pdf_color(color, b"RG"), fontsize * 0.06, x, offset, end, offset))
+            x = end
+        y += line_height * scale
+
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+    font_dicts = "".join(f"/{name} <</Type /Font /Subtype /Type1 /BaseFont /{get_font(*key).name} /Encoding /WinAnsiEncoding>>" for name, key in sorted(fonts.items()))
+    doc.xref_set_key(page.xref, "Resources", f"<</Font <<{font_dicts}>>>>")
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, b"\n".join(content))
+    doc.xref_set_key(page.xref, "Contents", f"{xref} 0 R")
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes, scale
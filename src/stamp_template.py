@@ -0,0 +1,100 @@
+# stamp_template.py
+import re
+from datetime import datetime
+from functools import lru_cache
+from cryptography import x509
+
+_PLACEHOLDER = re.compile(r'\$\$([A-Z]+)(?:=(.*?))?\$\$')
+_DATE_TOKEN = re.compile(r'yyyy|yy|MM|dd|HH|mm|ss|%')
+_STRFTIME = {'yyyy': '%Y', 'yy': '%y', 'MM': '%m', 'dd': '%d', 'HH': '%H', 'mm': '%M', 'ss': '%S', '%': '%%'}
+SAMPLE_DATE = datetime(2025, 12, 24, 12, 0, 0)
+# The templates created on first run: (name, template text).
+DEFAULT_TEMPLATES = (
+    ("Simple", "Digitally signed by:\n<b>$$SUBJECTCN$$</b>\nDate: $$SIGNDATE=dd-MM-yyyy$$"),
+    ("Detailed", "Digitally signed by: <b>$$SUBJECTCN$$</b>\nDate: $$SIGNDATE=dd-MM-yyyy$$\nIssuer: <b>$$ISSUERCN$$</b>"),
+)
+
+def date_format_to_strftime(date_format):
+    """Translates a template date format (dd, MM, yyyy, yy, HH, mm, ss) into a strftime pattern."""
+    return _DATE_TOKEN.sub(lambda m: _STRFTIME[m.group(0)], date_format)
+
+def _name_attribute(name, oid, fallback=""):
+    """Returns the first value of an attribute of an x509 Name."""
+    try: return name.get_attributes_for_oid(oid)[0].value
+    except (IndexError, AttributeError): return fallback
+
+def _subject_alternative_names(certificate):
+    """Returns the subject alternative names of a certificate, or an empty list."""
+    try: return list(certificate.extensions.get_extension_for_class(x509.SubjectAlternativeName).value)
+    except x509.ExtensionNotFound: return []
+
+def _email(certificate):
+    """Returns the subject's email address, from the subject name or else the subject alternative names."""
+    return _name_attribute(certificate.subject, x509.oid.NameOID.EMAIL_ADDRESS) or \
+        next((general_name.value for general_name in _subject_alternative_names(certificate) if isinstance(general_name, x509.RFC822Name)), "")
+
+# Certificate fields available as $$NAME$$ placeholders: name -> (extractor, sample value for previews without a certificate).
+FIELDS = {
+    'SUBJECTCN': (lambda cert: _name_attribute(cert.subject, x509.oid.NameOID.COMMON_NAME, str(cert.subject)), "Subject Name"),
+    'ISSUERCN': (lambda cert: _name_attribute(cert.issuer, x509.oid.NameOID.COMMON_NAME, str(cert.issuer)), "Issuer Name"),
+    'CERTSERIAL': (lambda cert: str(cert.serial_number), "123456789"),
+    'SUBJECTO': (lambda cert: _name_attribute(cert.subject, x509.oid.NameOID.ORGANIZATION_NAME), "Organization"),
+    'SUBJECTEMAIL': (_email, "name@example.com"),
+    'SUBJECTSAN': (lambda cert: ", ".join(str(general_name.value) for general_name in _subject_alternative_names(cert)), "name@example.com"),
+}
+
+@lru_cache(maxsize=64)
+def _certificate_field(certificate, name):
+    """Returns a field of a certificate, extracted once per certificate."""
+    try: return FIELDS[name][0](certificate)
+    except Exception: return ""
+
+class StampTemplate:
+    """
+    A signature template compiled once into a plan of literal segments and typed placeholders:
+    certificate fields ($$SUBJECTCN$$, $$ISSUERCN$$, $$CERTSERIAL$$, $$SUBJECTO$$, $$SUBJECTEMAIL$$,
+    $$SUBJECTSAN$$), the signing date ($$SIGNDATE=format$$) and the certificate's expiry date
+    ($$CERTEXPIRY=format$$), the date formats being translated to strftime patterns up front.
+    Unknown placeholders are kept as they are. time_resolution is how often, in seconds, the rendered
+    signing date changes: every second if it shows the seconds, every minute otherwise.
+    """
+    def __init__(self, text):
+        """Compiles a template text."""
+        self.text = text
+        self.plan = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            name, argument = match.group(1), match.group(2)
+            if name in FIELDS and argument is None: step = ('field', name)
+            elif name in ('SIGNDATE', 'CERTEXPIRY') and argument is not None: step = (name, date_format_to_strftime(argument))
+            else: continue
+            if match.start() > position: self.plan.append(('text', text[position:match.start()]))
+            self.plan.append(step)
+            position = match.end()
+        if position < len(text): self.plan.append(('text', text[position:]))
+        self.time_resolution = 1 if any(kind == 'SIGNDATE' and '%S' in argument.replace('%%', '') for kind, argument in self.plan) else 60
+
+    def render(self, certificate, sign_time=None):
+        """Returns the template's text for a certificate, dated sign_time (now by default)."""
+        sign_time = sign_time or datetime.now()
+        parts = []
+        for kind, argument in self.plan:
+            if kind == 'text': parts.append(argument)
+            elif kind == 'field': parts.append(_certificate_field(certificate, argument))
+            elif kind == 'SIGNDATE': parts.append(sign_time.strftime(argument))
+            else: parts.append(certificate.not_valid_after_utc.strftime(argument))
+        return "".join(parts)
+
+    def render_sample(self):
+        """Returns the template's text filled with sample values, for previews without a certificate."""
+        parts = []
+        for kind, argument in self.plan:
+            if kind == 'text': parts.append(argument)
+            elif kind == 'field': parts.append(FIELDS[argument][1])
+            else: parts.append(SAMPLE_DATE.strftime(argument))
+        return "".join(parts)
+
+@lru_cache(maxsize=32)
+def compile_template(text):
+    """Returns the compiled StampTemplate of a template text, compiling each distinct text once."""
+    return StampTemplate(text)
@@ -0,0 +1,176 @@
+# thumbnail_store.py
+import os
+import fcntl
+import struct
+import threading
+
+class ThumbnailPack:
+    """
+    The thumbnails of one document, stored as compressed image blobs appended to a single pack
+    file. Each record is a small header (page number, thumbnail width, blob length) followed by
+    the blob; the index of records is rebuilt by scanning the headers when the pack is opened,
+    so the pack needs no separate index file and a truncated last record is simply ignored.
+    """
+    RECORD = struct.Struct('<4sIII')
+    MAGIC = b'GSTH'
+
+    def __init__(self, path, on_write=None):
+        """Opens (creating it if needed) the pack file at path and indexes its records; on_write(path, size) is called after each append."""
+        self.path = path
+        self.on_write = on_write
+        self._lock = threading.Lock()
+        self._index = {}
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        self._scan(0)
+
+    def _scan(self, offset):
+        """Indexes the records from offset to the end of the file; returns the offset where scanning stopped."""
+        size = os.fstat(self._fd).st_size
+        while offset + self.RECORD.size <= size:
+            magic, page_num, width, length = self.RECORD.unpack(os.pread(self._fd, self.RECORD.size, offset))
+            if magic != self.MAGIC or offset + self.RECORD.size + length > size: break
+            self._index[(page_num, width)] = (offset + self.RECORD.size, length)
+            offset += self.RECORD.size + length
+        self._scanned = offset
+        return offset
+
+    def get(self, page_num, width):
+        """Returns the stored blob of a page's thumbnail at a width, or None."""
+        with self._lock:
+            if self._fd is None: return None
+            entry = self._index.get((page_num, width))
+            if entry is None and os.fstat(self._fd).st_size > self._scanned:
+                # Possibly appended by another process since the pack was opened.
+                self._scan(self._scanned); entry = self._index.get((page_num, width))
+            if entry is None: return None
+            try: return os.pread(self._fd, entry[1], entry[0])
+            except OSError: return None
+
+    def keys(self):
+        """Returns the (page number, width) pairs of the stored thumbnails."""
+        with self._lock: return list(self._index)
+
+    def __contains__(self, key):
+        """Tells whether a (page number, width) thumbnail is stored."""
+        return key in self._index
+
+    def put(self, page_num, width, data):
+        """Appends the blob of a page's thumbnail at a width."""
+        with self._lock:
+            if self._fd is None or (page_num, width) in self._index: return
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+                try:
+                    offset = self._scan(self._scanned)
+                    # Drop the torn tail left by a writer that was interrupted.
+                    if os.fstat(self._fd).st_size > offset: os.ftruncate(self._fd, offset)
+                    os.write(self._fd, self.RECORD.pack(self.MAGIC, page_num, width, len(data)) + data)
+                    self._index[(page_num, width)] = (offset + self.RECORD.size, len(data))
+                    self._scanned = offset + self.RECORD.size + len(data)
+                finally:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            except OSError as e:
+                print(f"Error writing thumbnail pack: {e}")
+                return
+        if self.on_write: self.on_write(self.path, self.RECORD.size + len(data))
+
+    def close(self):
+        """Closes the pack file."""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd); self._fd = None
+
+class ThumbnailStore:
+    """
+    A directory of thumbnail packs, one per document content digest, so a document is
+    recognized whatever its path and a modified file never shows stale thumbnails. The
+    total size of the packs is kept under max_bytes by deleting the least recently used
+    packs first; a pack's modification time records when it was last opened or extended.
+    The size is checked when a pack is opened and as the open packs grow.
+    """
+    def __init__(self, directory, max_bytes):
+        """Initializes the store in a directory, creating it if needed."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _pack_path(self, digest):
+        """Returns the path of the pack file for a document digest."""
+        return os.path.join(self.directory, f"{digest}.pack")
+
+    def open_pack(self, digest):
+        """Opens the pack of a document, marking it as recently used, and evicts old packs if over the size cap."""
+        path = self._pack_path(digest)
+        try:
+            pack = ThumbnailPack(path, on_write=self._on_pack_write)
+            os.utime(path)
+        except OSError as e:
+            print(f"Error opening thumbnail pack: {e}")
+            return None
+        self.evict(keep=path)
+        return pack
+
+    def set_max_bytes(self, max_bytes, keep=None):
+        """Changes the size cap, evicting packs (never keep) right away if needed."""
+        self.max_bytes = max_bytes
+        self.evict(keep=keep)
+
+    def copy_pages(self, digest, pack, page_nums):
+        """Copies into pack the stored thumbnails of some pages of another document, e.g. those an incremental update left unchanged."""
+        path = self._pack_path(digest)
+        if not os.path.exists(path): return
+        try: source = ThumbnailPack(path)
+        except OSError: return
+        try:
+            for page_num, width in source.keys():
+                if page_num in page_nums and (page_num, width) not in pack and (data := source.get(page_num, width)) is not None:
+                    pack.put(page_num, width, data)
+        finally:
+            source.close()
+
+    def _on_pack_write(self, path, size):
+        """Counts the bytes appended to an open pack, evicting other packs once the store exceeds max_bytes."""
+        with self._lock:
+            if self._size is None: self._size = self.total_size()
+            else: self._size += size
+            if self._size <= self.max_bytes: return
+        self.evict(keep=path)
+
+    def total_size(self):
+        """Returns the total size in bytes of all stored packs."""
+        return sum(size for _, _, size in self._packs())
+
+    def _packs(self):
+        """Returns (path, mtime, size) for every pack in the store."""
+        packs = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".pack"): continue
+                    try: stat = entry.stat()
+                    except OSError: continue
+                    packs.append((entry.path, stat.st_mtime, stat.st_size))
+        except OSError:
+            pass
+        return packs
+
+    def evict(self, keep=None):
+        """Deletes least recently used packs (never keep) until the store fits in max_bytes."""
+        packs = self._packs()
+        total = sum(size for _, _, size in packs)
+        for path, _, size in sorted(packs, key=lambda pack: pack[1]):
+            if total <= self.max_bytes: break
+            if path == keep: continue
+            try: os.remove(path)
+            except OSError: continue
+            total -= size
+        with self._lock: self._size = total
+
+    def clear(self):
+        """Deletes every stored pack."""
+        for path, _, _ in self._packs():
+            try: os.remove(path)
+            except OSError: pass
+        with self._lock: self._size = None
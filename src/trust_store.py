@@ -0,0 +1,67 @@
+# trust_store.py
+import os
+import hashlib
+from asn1crypto import pem, x509
+from pyhanko_certvalidator import ValidationContext
+from pyhanko_certvalidator.registry import CertificateRegistry, SimpleTrustManager
+
+class TrustStore:
+    """
+    Loads trust anchors and intermediate certificates from a local directory.
+    Self-issued certificates are treated as trust anchors, everything else as
+    intermediates. Certificates are parsed and registered once so that path building
+    never needs the network; digest identifies the set of certificates loaded.
+    """
+    CERT_EXTENSIONS = ('.pem', '.crt', '.cer', '.der')
+
+    def __init__(self, directory):
+        """Initializes the store and loads every certificate found in the directory."""
+        self.directory = directory
+        self.roots, self.intermediates = [], []
+        self.fingerprint = self.directory_fingerprint(directory)
+        self._registry = CertificateRegistry()
+        self._load()
+        self._trust_manager = SimpleTrustManager.build(trust_roots=self.roots)
+        self.digest = hashlib.sha256(b"".join(sorted(cert.sha256 for cert in self.roots + self.intermediates))).hexdigest()
+
+    @classmethod
+    def directory_fingerprint(cls, directory):
+        """Returns a cheap summary of the directory contents, used to detect changes."""
+        entries = []
+        if directory and os.path.isdir(directory):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.lower().endswith(cls.CERT_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        try: entries.append((path, os.path.getmtime(path)))
+                        except OSError: continue
+        return tuple(sorted(entries))
+
+    def _load(self):
+        """Parses all certificate files (PEM bundles or DER) and indexes them."""
+        for path, _ in self.fingerprint:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                blobs = [der for kind, _, der in pem.unarmor(data, multiple=True) if kind == 'CERTIFICATE'] if pem.detect(data) else [data]
+                for der in blobs:
+                    self._add(x509.Certificate.load(der))
+            except Exception as e:
+                print(f"Skipping unreadable certificate {path}: {e}")
+
+    def _add(self, cert):
+        """Indexes a single certificate as a trust anchor or an intermediate."""
+        if not self._registry.register(cert): return
+        if cert.self_issued: self.roots.append(cert)
+        else: self.intermediates.append(cert)
+
+    def build_validation_context(self, allow_fetching=False, fetcher_backend=None):
+        """
+        Builds a ValidationContext backed by this store. Offline contexts trust only
+        the local anchors and never fetch; online ones add them to the system roots.
+        """
+        if allow_fetching:
+            return ValidationContext(extra_trust_roots=self.roots, other_certs=self.intermediates, allow_fetching=True, fetcher_backend=fetcher_backend)
+        registry = CertificateRegistry.build(self.intermediates)
+        return ValidationContext(trust_manager=self._trust_manager, certificate_registry=registry,
+                                 allow_fetching=False, revocation_mode='soft-fail')
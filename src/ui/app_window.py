@@ -7,20 +7,32 @@ import os, fitz
 
 class AppWindow(Adw.ApplicationWindow):
     """The main application window, containing the header bar, sidebar, and content area."""
+    ZOOM_LEVELS = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0)
+    POINTS_TO_PIXELS = 96 / 72
+    ZOOM_SETTLE_MS = 150
+
     def __init__(self, **kwargs):
         """Initializes the main application window and its UI."""
         super().__init__(**kwargs)
         from .components.sidebar import Sidebar; from .components.welcome import WelcomeView
+        from .components.continuous_view import ContinuousView
+        from .tile_renderer import TileRenderer; from .stamp_preview import StampPreviewCache
         self.active_toasts = []
         self.signature_popover = None
         self.popover_active_for_sig = None
         self.signature_view_rects = []
         self.search_highlights = []
+        app = self.get_application()
+        self.tile_renderer = TileRenderer(app.config.get_tile_cache_size() * 1024 * 1024, render_service=app.render_service, on_update=lambda: self.queue_draw_pages())
+        self.stamp_previews = StampPreviewCache(app.stamp_appearances, render_service=app.render_service, on_update=lambda: self.queue_draw_pages())
+        self.continuous_scroll = app.config.get_continuous_scroll()
+        self.zoom = 'fit-width'
+        self._zoom_settle_id, self._zoom_gesture_start, self._pointer = 0, 1.0, None
         self.set_default_size(900, 700); self.set_icon_name("io.github.ppgllrd.GNOME-Sign")
         self.set_hide_on_close(False)
-        self._build_ui(Sidebar, WelcomeView); self._connect_signals()
+        self._build_ui(Sidebar, WelcomeView, ContinuousView); self._connect_signals()
 
-    def _build_ui(self, Sidebar, WelcomeView):
+    def _build_ui(self, Sidebar, WelcomeView, ContinuousView):
         """Constructs the main UI layout and widgets."""
         app = self.get_application()
         self.view_stacker = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
@@ -43,6 +55,13 @@ class AppWindow(Adw.ApplicationWindow):
 
         self.header_bar.pack_start(self.nav_box)
 
+        self.zoom_box = Gtk.Box(); self.zoom_box.get_style_context().add_class("linked")
+        self.zoom_out_button = Gtk.Button(icon_name="zoom-out-symbolic", action_name="app.zoom_out")
+        self.zoom_button = Gtk.MenuButton(label="100%")
+        self.zoom_in_button = Gtk.Button(icon_name="zoom-in-symbolic", action_name="app.zoom_in")
+        self.zoom_box.append(self.zoom_out_button); self.zoom_box.append(self.zoom_button); self.zoom_box.append(self.zoom_in_button)
+        self.header_bar.pack_start(self.zoom_box)
+
         self.search_revealer = Gtk.Revealer(transition_type=Gtk.RevealerTransitionType.SLIDE_LEFT, reveal_child=False)
         search_box = Gtk.Box(spacing=6)
         self.search_entry = Gtk.SearchEntry(hexpand=True)
@@ -73,12 +92,13 @@ class AppWindow(Adw.ApplicationWindow):
         self.certs_button = Gtk.Button(icon_name="dialog-password-symbolic"); self.header_bar.pack_end(self.certs_button)
         self.sign_button = Gtk.Button(icon_name="document-edit-symbolic"); self.header_bar.pack_end(self.sign_button)
         
-        self.sidebar = Sidebar(); self.flap.set_flap(self.sidebar)
+        self.sidebar = Sidebar(render_service=app.render_service); self.flap.set_flap(self.sidebar)
         self.stack = Gtk.Stack(transition_type=Gtk.StackTransitionType.SLIDE_UP_DOWN, vexpand=True); self.flap.set_content(self.stack)
         self.drawing_area = Gtk.DrawingArea(hexpand=True, vexpand=True)
         self.drawing_area.set_can_focus(True)
-        self.scrolled_window = Gtk.ScrolledWindow(hscrollbar_policy="never", vscrollbar_policy="automatic"); self.scrolled_window.set_child(self.drawing_area)
+        self.scrolled_window = Gtk.ScrolledWindow(hscrollbar_policy="automatic", vscrollbar_policy="automatic"); self.scrolled_window.set_child(self.drawing_area)
         self.stack.add_named(self.scrolled_window, "pdf_view")
+        self.continuous_view = ContinuousView(self); self.stack.add_named(self.continuous_view, "continuous_view")
         self.welcome_view = WelcomeView(); self.stack.add_named(self.welcome_view, "welcome_view")
 
         self.signature_popover = Gtk.Popover.new()
@@ -110,6 +130,22 @@ class AppWindow(Adw.ApplicationWindow):
         
         self.drawing_area.set_draw_func(self._draw_page_and_rect)
         self.drawing_area.connect("resize", self._on_drawing_area_resize)
+        self.scrolled_window.get_vadjustment().connect("value-changed", lambda adj: self.drawing_area.queue_draw())
+        self.scrolled_window.get_hadjustment().connect("value-changed", lambda adj: self.drawing_area.queue_draw())
+        self.scrolled_window.get_vadjustment().connect("changed", lambda adj: GLib.idle_add(self.adjust_scroll_and_viewport))
+        for view in (self.scrolled_window, self.continuous_view):
+            scroll_controller = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL)
+            scroll_controller.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+            scroll_controller.connect("scroll", self._on_view_scroll)
+            view.add_controller(scroll_controller)
+            zoom_gesture = Gtk.GestureZoom.new()
+            zoom_gesture.connect("begin", lambda gesture, sequence: setattr(self, "_zoom_gesture_start", self.get_effective_zoom()))
+            zoom_gesture.connect("scale-changed", self._on_zoom_gesture_scale_changed)
+            view.add_controller(zoom_gesture)
+            pointer_controller = Gtk.EventControllerMotion.new()
+            pointer_controller.connect("motion", lambda controller, x, y: setattr(self, "_pointer", (x, y)))
+            pointer_controller.connect("leave", lambda controller: setattr(self, "_pointer", None))
+            view.add_controller(pointer_controller)
         self.connect("map", self._on_window_map)
         
         drag = Gtk.GestureDrag.new(); drag.connect("drag-begin", app.on_drag_begin); drag.connect("drag-update", app.on_drag_update); drag.connect("drag-end", app.on_drag_end)
@@ -137,7 +173,7 @@ class AppWindow(Adw.ApplicationWindow):
         self.search_button.bind_property("active", self.search_revealer, "reveal-child", GObject.BindingFlags.DEFAULT)
         self.search_entry.connect("search-changed", self._on_search_changed)
         self.search_revealer.connect("notify::reveal-child", self._on_search_revealer_state_changed)
-        app.connect("highlight-rect-changed", lambda app, rect: self.drawing_area.queue_draw())
+        app.connect("highlight-rect-changed", lambda app, rect: self.queue_draw_pages())
         app.connect("search-highlights-updated", self._on_search_highlights_updated)
         app.connect("search-result-selected", self._on_search_result_selected)
         app.connect("certificates-changed", self._on_certificates_changed)
@@ -170,12 +206,12 @@ class AppWindow(Adw.ApplicationWindow):
         self.sidebar.select_search_result(app.current_search_result_index)        
         if app.highlight_rect:
             self.scroll_to_rect(app.highlight_rect)            
-        self.drawing_area.queue_draw()
+        self.queue_draw_pages()
 
     def _on_search_highlights_updated(self, app, highlights):
         """Handles the 'search-highlights-updated' signal."""
         self.search_highlights = highlights
-        self.drawing_area.queue_draw()
+        self.queue_draw_pages()
 
     def _on_search_entry_activated(self, entry):
         """
@@ -219,16 +255,19 @@ class AppWindow(Adw.ApplicationWindow):
     def _on_document_changed(self, app, doc):
         """Handles the 'document-changed' signal, updating the main view."""
         is_doc_loaded = doc is not None
-        self.stack.set_visible_child_name("pdf_view" if is_doc_loaded else "welcome_view")
+        self.tile_renderer.set_document(app.current_file_path if is_doc_loaded else None, app.document_source.signature if is_doc_loaded and app.document_source else None, app.display_lists, app.unchanged_pages)
+        self.continuous_view.set_document(doc)
+        self.stack.set_visible_child_name(self._document_view_name() if is_doc_loaded else "welcome_view")
         self.sidebar_button.set_sensitive(is_doc_loaded)
         self.nav_box.set_sensitive(is_doc_loaded)
+        self.zoom_box.set_sensitive(is_doc_loaded)
         if not is_doc_loaded:
             if self.flap.get_reveal_flap(): self.flap.set_reveal_flap(False)
         self.search_button.set_active(False)
         self.search_entry.set_text("")
         self.search_button.set_sensitive(is_doc_loaded)
         self.title_widget.set_subtitle(os.path.basename(app.current_file_path) if is_doc_loaded and app.current_file_path else "")
-        self.sidebar.populate(doc, app.signatures)
+        self.sidebar.populate(doc, app.signatures, app.display_lists, app.unchanged_pages)
         self.welcome_view.update_ui(app)
         self.hide_signature_info()
         self._on_signature_state_changed(app)
@@ -245,12 +284,29 @@ class AppWindow(Adw.ApplicationWindow):
         self.prev_page_button.set_sensitive(current_page > 0)
         self.next_page_button.set_sensitive(current_page < total_pages - 1)
         self.page_entry_button.set_sensitive(True)
-        self.drawing_area.queue_draw()
+        if self.continuous_scroll:
+            self.continuous_view.on_page_changed(current_page)
+        else:
+            self.tile_renderer.cancel_except({current_page - 1, current_page, current_page + 1})
+        self.queue_draw_pages()
+        self.update_zoom_label()
         GLib.idle_add(self.adjust_scroll_and_viewport)
+        GLib.idle_add(self._prefetch_adjacent_pages)
 
         if not keep_sidebar_view:
             self.sidebar.select_page(current_page)
     
+    def _prefetch_adjacent_pages(self):
+        """Asks the tile renderer to prepare the top of the previous and next pages at the current zoom."""
+        app = self.get_application(); view_width = self.get_page_view_width()
+        if app.doc and view_width > 0:
+            page_size = self.active_scrolled_window().get_vadjustment().get_page_size()
+            for page_num in (app.current_page + 1, app.current_page - 1):
+                if 0 <= page_num < len(app.doc):
+                    page = app.doc.load_page(page_num); width = self.page_display_width(page) or view_width
+                    self.tile_renderer.prefetch(page, page_num, width / page.rect.width, (0, 0, width, page_size))
+        return GLib.SOURCE_REMOVE
+
     def _on_signature_state_changed(self, app):
         """Handles the 'signature-state-changed' signal, updating the sign button."""
         can_sign = app.doc is not None and app.signature_rect and app.active_cert_path
@@ -258,12 +314,15 @@ class AppWindow(Adw.ApplicationWindow):
         if can_sign: self.sign_button.set_tooltip_text(app._("sign_button_tooltip_sign"))
         elif not app.active_cert_path: self.sign_button.set_tooltip_text(app._("no_cert_selected_error"))
         else: self.sign_button.set_tooltip_text(app._("sign_button_tooltip_select_area"))
-        self.drawing_area.queue_draw()
+        self.queue_draw_pages()
     
     def _on_signatures_found(self, app, signatures):
-        """Handles the 'signatures-found' signal, showing the info banner."""
+        """Handles the 'signatures-found' signal, showing the info banner and the validated signatures so far."""
         self.show_signature_info(len(signatures))
         self.show_sigs_button.set_visible(bool(signatures))
+        self.sidebar.populate_signatures(signatures)
+        self._update_signature_view_rects()
+        self.queue_draw_pages()
     
     def _on_toast_request(self, app, message, button_label, callback_func):
         """Handles the 'toast-request' signal."""
@@ -272,13 +331,14 @@ class AppWindow(Adw.ApplicationWindow):
 
     def _on_language_changed(self, app):
         """Handles the 'language-changed' signal, updating all translatable texts."""
-        self._build_and_set_menu(app)
+        self._build_and_set_menu(app); self._build_zoom_menu(app)
         self.sidebar_button.set_tooltip_text(app._("toggle_sidebar_tooltip"))
         self.open_button.set_tooltip_text(app._("open_pdf"))
         self.search_button.set_tooltip_text(app._("search_tooltip"))
         self.prev_page_button.set_tooltip_text(app._("prev_page"))
         self.next_page_button.set_tooltip_text(app._("next_page"))
         self.page_entry_button.set_tooltip_text(app._("jump_to_page_title"))
+        self.zoom_out_button.set_tooltip_text(app._("zoom_out")); self.zoom_in_button.set_tooltip_text(app._("zoom_in")); self.zoom_button.set_tooltip_text(app._("zoom"))
         self.show_sigs_button.set_tooltip_text(app._("show_signatures_tooltip"))
         self._update_certs_button_tooltip()
         self._on_signature_state_changed(app)
@@ -308,10 +368,10 @@ class AppWindow(Adw.ApplicationWindow):
         elif keyval == Gdk.KEY_Page_Up:
             app.on_prev_page_clicked(None); return True
         elif keyval == Gdk.KEY_Down:
-            if adj := self.scrolled_window.get_vadjustment():
+            if adj := self.active_scrolled_window().get_vadjustment():
                 adj.set_value(min(adj.get_value() + SCROLL_STEP, adj.get_upper() - adj.get_page_size())); return True
         elif keyval == Gdk.KEY_Up:
-            if adj := self.scrolled_window.get_vadjustment():
+            if adj := self.active_scrolled_window().get_vadjustment():
                 adj.set_value(max(adj.get_value() - SCROLL_STEP, adj.get_lower())); return True
         return False
 
@@ -334,8 +394,16 @@ class AppWindow(Adw.ApplicationWindow):
     
     def _on_drawing_area_click(self, gesture, n_press, x, y):
         """Handles a click on the drawing area to clear highlights or show signature details."""
+        self._on_signature_rects_click(self.signature_view_rects, x, y)
+
+    def on_page_click(self, widget, page_num, x, y):
+        """Handles a click on a page of the continuous view."""
+        if page_num >= 0: self._on_signature_rects_click(self.signature_rects_for_page(page_num, widget.page, widget.get_width()), x, y)
+
+    def _on_signature_rects_click(self, signature_rects, x, y):
+        """Shows the details of the signature under the pointer, or clears the highlight if there is none."""
         app = self.get_application()
-        for rect, sig_details in self.signature_view_rects:
+        for rect, sig_details in signature_rects:
             if rect.contains_point(x, y):
                 app.on_signature_selected(self.sidebar, sig_details)
                 return
@@ -363,15 +431,26 @@ class AppWindow(Adw.ApplicationWindow):
         menu.append(app._("print_document"), "app.print")
         menu.append(app._("sign_document"), "app.sign")
         menu.append_section(None, Gio.Menu.new())
+        menu.append(app._("continuous_scroll"), "app.continuous_scroll")
+        menu.append_section(None, Gio.Menu.new())
         menu.append(app._("edit_stamp_templates"), "app.edit_stamps"); menu.append(app._("preferences"), "app.preferences"); menu.append_section(None, Gio.Menu.new())
         menu.append(app._("about"), "app.about")
         self.menu_button.set_menu_model(menu)
         
+    def _build_zoom_menu(self, app):
+        """Creates the menu of the zoom button with the fit modes and the predefined zoom levels."""
+        menu = Gio.Menu.new()
+        fit_section = Gio.Menu.new(); fit_section.append(app._("fit_width"), "app.zoom::fit-width"); fit_section.append(app._("fit_page"), "app.zoom::fit-page")
+        menu.append_section(None, fit_section)
+        levels_section = Gio.Menu.new()
+        for level in self.ZOOM_LEVELS: levels_section.append(f"{level:.0%}", f"app.zoom::{level:g}")
+        menu.append_section(None, levels_section)
+        self.zoom_button.set_menu_model(menu)
+
     def _on_drawing_area_resize(self, area, width, height):
         """Handles the resize event for the PDF drawing area, triggering a redraw."""
-        app = self.get_application()
-        if app.page: app.display_pixbuf = None
         self._update_signature_view_rects()
+        self.update_zoom_label()
         GLib.idle_add(self.adjust_scroll_and_viewport)
 
     def adjust_scroll_and_viewport(self):
@@ -379,18 +458,143 @@ class AppWindow(Adw.ApplicationWindow):
         self.update_drawing_area_size_request()
 
     def update_drawing_area_size_request(self):
-        """Requests a new size for the drawing area to maintain the PDF's aspect ratio."""
+        """Requests a new size for the drawing area to maintain the PDF's aspect ratio at the current zoom."""
         app = self.get_application()
         if not app.page: self.drawing_area.set_size_request(-1, -1); return
-        width = self.drawing_area.get_width()
+        width = self.page_display_width(app.page)
+        self.drawing_area.set_halign(Gtk.Align.FILL if width is None else Gtk.Align.CENTER)
+        target_w = -1 if width is None else int(width)
+        if width is None: width = self.drawing_area.get_width()
         if width > 0 and app.page.rect.width > 0:
             target_h = width * (app.page.rect.height / app.page.rect.width)
-            if abs(self.drawing_area.get_property("height-request") - int(target_h)) > 1:
-                self.drawing_area.set_size_request(-1, int(target_h))
+            if self.drawing_area.get_property("width-request") != target_w or abs(self.drawing_area.get_property("height-request") - int(target_h)) > 1:
+                self.drawing_area.set_size_request(target_w, int(target_h))
+
+    def page_display_width(self, page):
+        """Returns the width in pixels of a page at the current zoom, or None if pages fill the width of the view."""
+        if self.zoom == 'fit-width' or page.rect.width <= 0: return None
+        if self.zoom == 'fit-page':
+            view = self.active_scrolled_window()
+            if view.get_height() <= 0: return None
+            return max(1, min(view.get_width(), view.get_height() * page.rect.width / page.rect.height))
+        return page.rect.width * self.zoom * self.POINTS_TO_PIXELS
+
+    def get_effective_zoom(self):
+        """Returns the current page's zoom factor, 1.0 meaning its actual size on a 96 dpi screen."""
+        app = self.get_application()
+        if not app.page: return 1.0
+        width = self.page_display_width(app.page) or self.get_page_view_width()
+        return width / (app.page.rect.width * self.POINTS_TO_PIXELS) if width > 0 else 1.0
+
+    def update_zoom_label(self):
+        """Shows the current zoom factor on the zoom button."""
+        self.zoom_button.set_label(f"{self.get_effective_zoom():.0%}")
+
+    def is_zoom_settling(self):
+        """Returns True while a zoom gesture is in progress, when only already rendered tiles should be painted."""
+        return self._zoom_settle_id != 0
+
+    def zoom_in(self):
+        """Zooms in to the next predefined zoom level."""
+        current = self.get_effective_zoom()
+        self.set_zoom(next((level for level in self.ZOOM_LEVELS if level > current * 1.01), self.ZOOM_LEVELS[-1]))
+
+    def zoom_out(self):
+        """Zooms out to the previous predefined zoom level."""
+        current = self.get_effective_zoom()
+        self.set_zoom(next((level for level in reversed(self.ZOOM_LEVELS) if level < current / 1.01), self.ZOOM_LEVELS[0]))
+
+    def set_zoom(self, zoom, anchor=None, settle=False):
+        """
+        Sets the zoom to 'fit-width', 'fit-page' or a factor, keeping the point at anchor (view coordinates,
+        the center by default) in place. With settle, new tiles are only rendered once zooming stops.
+        """
+        app = self.get_application()
+        if zoom not in ('fit-width', 'fit-page'): zoom = max(self.ZOOM_LEVELS[0], min(zoom, self.ZOOM_LEVELS[-1]))
+        if zoom == self.zoom: return
+        view = self.active_scrolled_window()
+        anchor = anchor or (view.get_width() / 2, view.get_height() / 2)
+        adjustments = (view.get_hadjustment(), view.get_vadjustment())
+        fractions = [(adj.get_value() + a) / adj.get_upper() if adj.get_upper() > 0 else 0 for adj, a in zip(adjustments, anchor)]
+        selection_width = self.get_page_view_width(app.get_signature_page())
+        self.zoom = zoom
+        if action := app.lookup_action("zoom"): action.set_state(GLib.Variant('s', zoom if isinstance(zoom, str) else f"{zoom:g}"))
+        if settle:
+            if self._zoom_settle_id: GLib.source_remove(self._zoom_settle_id)
+            self._zoom_settle_id = GLib.timeout_add(self.ZOOM_SETTLE_MS, self._on_zoom_settled)
+        self.update_drawing_area_size_request()
+        self.continuous_view.update_zoom()
+        self._after_layout(lambda: self._restore_zoom_anchor(adjustments, fractions, anchor, selection_width))
+
+    def _after_layout(self, callback):
+        """Runs callback once, after the next layout of the window (right away if it is not realized)."""
+        if not (clock := self.get_frame_clock()): callback(); return
+        def on_layout(clock):
+            clock.disconnect(handler_id); callback()
+        handler_id = clock.connect("layout", on_layout)
+        self.queue_resize()
+
+    def _restore_zoom_anchor(self, adjustments, fractions, anchor, selection_width):
+        """Scrolls so the anchor point shows the same part of the document as before zooming, and rescales the signature area selected."""
+        app = self.get_application()
+        for adj, fraction, a in zip(adjustments, fractions, anchor):
+            adj.set_value(max(adj.get_lower(), min(fraction * adj.get_upper() - a, adj.get_upper() - adj.get_page_size())))
+        new_width = self.get_page_view_width(app.get_signature_page())
+        if app.signature_rect and selection_width > 0 and new_width > 0 and new_width != selection_width:
+            ratio = new_width / selection_width
+            app.signature_rect = tuple(value * ratio for value in app.signature_rect)
+            app.emit("signature-state-changed")
+        self._update_signature_view_rects(); self.update_zoom_label(); self.queue_draw_pages()
+
+    def _on_zoom_settled(self):
+        """Renders the tiles of the final zoom level once a zoom gesture stops."""
+        self._zoom_settle_id = 0
+        self.queue_draw_pages()
+        return GLib.SOURCE_REMOVE
+
+    def _on_view_scroll(self, controller, dx, dy):
+        """Zooms around the pointer on Ctrl+scroll; plain scrolling is left to the scrolled window."""
+        if not self.get_application().doc or not controller.get_current_event_state() & Gdk.ModifierType.CONTROL_MASK: return False
+        self.set_zoom(self.get_effective_zoom() * 1.1 ** -dy, anchor=self._pointer, settle=True)
+        return True
+
+    def _on_zoom_gesture_scale_changed(self, gesture, scale):
+        """Zooms around the center of a pinch gesture."""
+        if not self.get_application().doc: return
+        has_center, x, y = gesture.get_bounding_box_center()
+        self.set_zoom(self._zoom_gesture_start * scale, anchor=(x, y) if has_center else None, settle=True)
+
+    def _document_view_name(self):
+        """Returns the name of the stack page used to show documents in the current scroll mode."""
+        return "continuous_view" if self.continuous_scroll else "pdf_view"
+
+    def set_continuous_scroll(self, enabled):
+        """Switches between the single-page view and the continuous-scroll view."""
+        app = self.get_application()
+        if enabled == self.continuous_scroll: return
+        self.continuous_scroll = enabled
+        if app.doc:
+            self.stack.set_visible_child_name(self._document_view_name())
+            if enabled: GLib.idle_add(lambda: self.continuous_view.on_page_changed(app.current_page) or GLib.SOURCE_REMOVE)
+            self._update_signature_view_rects(); self.queue_draw_pages()
+
+    def active_scrolled_window(self):
+        """Returns the scrolled window of the view currently showing the document."""
+        return self.continuous_view if self.continuous_scroll else self.scrolled_window
+
+    def get_page_view_width(self, page_num=None):
+        """Returns the width, in pixels, at which a page (the current one by default) is currently drawn."""
+        return self.continuous_view.get_page_width(page_num) if self.continuous_scroll else self.drawing_area.get_width()
+
+    def queue_draw_pages(self):
+        """Redraws the pages shown by the active view."""
+        if self.continuous_scroll: self.continuous_view.queue_draw_pages()
+        else: self.drawing_area.queue_draw()
 
     def scroll_to_rect(self, pdf_rect):
         """Schedules a scroll operation to bring the specified PDF rectangle into view."""
-        GLib.idle_add(self._do_scroll_to_rect, pdf_rect)
+        if self.continuous_scroll: self.continuous_view.scroll_to_rect(self.get_application().current_page, pdf_rect)
+        else: GLib.idle_add(self._do_scroll_to_rect, pdf_rect)
 
     def _do_scroll_to_rect(self, pdf_rect):
         """Performs the actual scrolling to a rectangle."""
@@ -402,50 +606,50 @@ class AppWindow(Adw.ApplicationWindow):
         _, y0, _, y1 = pdf_rect; view_y = (app.page.rect.height - y1) * scale_factor; view_h = (y1 - y0) * scale_factor
         target_pos = view_y + view_h / 2 - vadjustment.get_page_size() / 2
         clamped_pos = max(0, min(target_pos, vadjustment.get_upper() - vadjustment.get_page_size()))
-        vadjustment.set_value(clamped_pos); return GLib.SOURCE_REMOVE
+        vadjustment.set_value(clamped_pos)
+        hadjustment = self.scrolled_window.get_hadjustment(); x0, _, x1, _ = pdf_rect
+        hadjustment.set_value(max(0, min((x0 + x1) / 2 * scale_factor - hadjustment.get_page_size() / 2, hadjustment.get_upper() - hadjustment.get_page_size())))
+        return GLib.SOURCE_REMOVE
 
     def _draw_page_and_rect(self, drawing_area, cr, width, height):
         """Draw callback for the main canvas; renders the PDF page and the signature rectangle."""
         app = self.get_application()
         if app.page and width > 0:
-            if not app.display_pixbuf or app.display_pixbuf.get_width() != width:
-                zoom = width / app.page.rect.width
-                pix = app.page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
-                app.display_pixbuf = GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(pix.samples), GdkPixbuf.Colorspace.RGB, False, 8, pix.width, pix.height, pix.stride)
-            Gdk.cairo_set_source_pixbuf(cr, app.display_pixbuf, 0, 0); cr.paint()
+            _, x, y = self.scrolled_window.translate_coordinates(self.drawing_area, 0, 0)
+            visible_rect = (x, y, self.scrolled_window.get_width() or width, self.scrolled_window.get_height() or height)
+            self.tile_renderer.draw(cr, app.page, app.current_page, width / app.page.rect.width, visible_rect, refine=not self.is_zoom_settling())
+            self.draw_page_overlays(cr, app.current_page, app.page, width, self.search_highlights)
 
-        if app.page and width > 0:
-            scale_factor = width / app.page.rect.width
-            if self.search_highlights:
-                cr.set_source_rgba(0.0, 0.0, 1.0, 0.25) # Semi-transparent blue
-                for rect in self.search_highlights:
-                    x0, y0, x1, y1 = rect
-                    view_x, view_y = x0 * scale_factor, y0 * scale_factor
-                    view_w, view_h = (x1 - x0) * scale_factor, (y1 - y0) * scale_factor
-                    cr.rectangle(view_x, view_y, view_w, view_h)
-                    cr.fill()
-
-        if app.highlight_rect and app.page and width > 0:
-            scale_factor = width / app.page.rect.width
+    def draw_page_overlays(self, cr, page_num, page, width, search_highlights=None):
+        """Draws the search highlights, the highlighted rectangle and the signature area selected on a page drawn at the given width."""
+        app = self.get_application()
+        if width <= 0: return
+        scale_factor = width / page.rect.width
+        if search_highlights is None:
+            search_highlights = [result.rect for result in app.search_results if result.page_num == page_num]
+        if search_highlights:
+            cr.set_source_rgba(0.0, 0.0, 1.0, 0.25) # Semi-transparent blue
+            for rect in search_highlights:
+                x0, y0, x1, y1 = rect
+                view_x, view_y = x0 * scale_factor, y0 * scale_factor
+                view_w, view_h = (x1 - x0) * scale_factor, (y1 - y0) * scale_factor
+                cr.rectangle(view_x, view_y, view_w, view_h)
+                cr.fill()
+
+        if app.highlight_rect and page_num == app.current_page:
             x0, y0, x1, y1 = app.highlight_rect
-            view_x, view_y = x0 * scale_factor, (app.page.rect.height - y1) * scale_factor
+            view_x, view_y = x0 * scale_factor, (page.rect.height - y1) * scale_factor
             view_w, view_h = (x1 - x0) * scale_factor, (y1 - y0) * scale_factor
             cr.set_source_rgba(1.0, 1.0, 0.0, 0.25); cr.rectangle(view_x, view_y, view_w, view_h); cr.fill()
             cr.set_source_rgb(0.9, 0.8, 0.0); cr.set_line_width(1.0); cr.rectangle(view_x, view_y, view_w, view_h); cr.stroke()
+        if page_num != app.get_signature_page(): return
         if rect_to_draw := app.signature_rect or ((min(app.start_x, app.end_x), min(app.start_y, app.end_y), abs(app.end_x - app.start_x), abs(app.end_y - app.start_y)) if app.start_x != -1 else None):
             x, y, w, h = rect_to_draw
             if w < 5 or h < 5: cr.set_source_rgba(0.0, 0.5, 0.0, 0.5); cr.rectangle(x, y, w, h); cr.fill(); return
             cr.set_source_rgb(0.0, 0.5, 0.0); cr.set_line_width(1.5); cr.rectangle(x, y, w, h); cr.stroke_preserve(); cr.set_source_rgba(1.0, 1.0, 1.0, 0.8); cr.fill()
             if w > 20 and h > 20 and app.active_cert_path:
-                if password := Secret.password_lookup_sync(app.cert_manager.KEYRING_SCHEMA, {"path": app.active_cert_path}, None):
-                        _, certificate_pyca = app.cert_manager.get_credentials(app.active_cert_path, password)
-                        if certificate_pyca: 
-                            from stamp_creator import HtmlStamp, pango_to_html
-                            parsed_pango_text = app.get_parsed_stamp_text(certificate_pyca)
-                            html_content = pango_to_html(parsed_pango_text)
-                            scale = app.page.rect.width / self.drawing_area.get_width() if self.drawing_area.get_width() > 0 else 1
-                            stamp_creator = HtmlStamp(html_content=html_content, width=w * scale, height=h * scale)
-                            if stamp_pixbuf := stamp_creator.get_pixbuf(int(w), int(h)): Gdk.cairo_set_source_pixbuf(cr, stamp_pixbuf, x, y); cr.paint()
+                if stamp_content := app.get_active_stamp_content():
+                    self.stamp_previews.draw(cr, stamp_content, x, y, w, h, w / scale_factor, h / scale_factor)
 
     def _on_toast_dismissed(self, toast):
         """Callback for a toast's 'dismissed' signal."""
@@ -468,17 +672,23 @@ class AppWindow(Adw.ApplicationWindow):
         """Calculates and caches the view coordinates of signature rectangles for the current page."""
         self.signature_view_rects.clear()
         app = self.get_application()
-        if not app.page or not app.signatures: return
-        width = self.drawing_area.get_width()
-        if width <= 0 or app.page.rect.width <= 0: return
-        scale_factor = width / app.page.rect.width
+        if not app.page: return
+        self.signature_view_rects.extend(self.signature_rects_for_page(app.current_page, app.page, self.drawing_area.get_width()))
+
+    def signature_rects_for_page(self, page_num, page, width):
+        """Returns (Gdk.Rectangle, signature) pairs with the view coordinates of the signatures on a page drawn at the given width."""
+        app = self.get_application()
+        if not page or not app.signatures or width <= 0 or page.rect.width <= 0: return []
+        scale_factor = width / page.rect.width
+        signature_rects = []
         for sig in app.signatures:
-            if sig.page_num == app.current_page and sig.rect:
+            if sig.page_num == page_num and sig.rect:
                 x0, y0, x1, y1 = sig.rect
-                view_x, view_y = x0 * scale_factor, (app.page.rect.height - y1) * scale_factor
+                view_x, view_y = x0 * scale_factor, (page.rect.height - y1) * scale_factor
                 view_w, view_h = (x1 - x0) * scale_factor, (y1 - y0) * scale_factor
                 gdk_rect = Gdk.Rectangle(); gdk_rect.x, gdk_rect.y = int(view_x), int(view_y); gdk_rect.width, gdk_rect.height = int(view_w), int(view_h)
-                self.signature_view_rects.append((gdk_rect, sig))
+                signature_rects.append((gdk_rect, sig))
+        return signature_rects
 
     def _update_popover_content(self, sig_details):
         """Prepares the signature details text for the popover."""
@@ -493,8 +703,16 @@ class AppWindow(Adw.ApplicationWindow):
 
     def _on_drawing_area_motion(self, controller, x, y):
         """Handles mouse motion over the drawing area to show the signature popover."""
+        self._update_signature_popover(self.drawing_area, self.signature_view_rects, x, y)
+
+    def on_page_motion(self, widget, page_num, x, y):
+        """Handles mouse motion over a page of the continuous view."""
+        if page_num >= 0: self._update_signature_popover(widget, self.signature_rects_for_page(page_num, widget.page, widget.get_width()), x, y)
+
+    def _update_signature_popover(self, widget, signature_rects, x, y):
+        """Shows the signature popover when the pointer is over one of the signature rectangles of a widget, hiding it otherwise."""
         found_sig_tuple = None
-        for rect, sig in self.signature_view_rects:
+        for rect, sig in signature_rects:
             if rect.contains_point(x, y):
                 found_sig_tuple = (rect, sig); break
         if found_sig_tuple:
@@ -503,10 +721,10 @@ class AppWindow(Adw.ApplicationWindow):
             self.popover_active_for_sig = sig
             self._update_popover_content(sig)
             
-            dest_x, dest_y = self.drawing_area.translate_coordinates(self, rect_da.x, rect_da.y)
+            _, dest_x, dest_y = widget.translate_coordinates(self, rect_da.x, rect_da.y)
             
             pointing_rect = Gdk.Rectangle()
-            pointing_rect.x, pointing_rect.y = dest_x, dest_y
+            pointing_rect.x, pointing_rect.y = int(dest_x), int(dest_y)
             pointing_rect.width, pointing_rect.height = rect_da.width, rect_da.height
             
             self.signature_popover.set_pointing_to(pointing_rect)
@@ -514,4 +732,4 @@ class AppWindow(Adw.ApplicationWindow):
         else:
             if self.popover_active_for_sig is not None:
                 self.popover_active_for_sig = None
-                self.signature_popover.popdown()
\ No newline at end of file
+                self.signature_popover.popdown()
@@ -0,0 +1,183 @@
+# ui/components/continuous_view.py
+import gi
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, GLib
+
+PAGE_SPACING = 12
+
+class PageWidget(Gtk.DrawingArea):
+    """A recycled widget showing one page of the continuous view at the window's zoom; its height follows the page's aspect ratio."""
+    def __init__(self, view):
+        """Initializes an unbound page widget with its own gestures."""
+        super().__init__(hexpand=True, margin_bottom=PAGE_SPACING)
+        self.view = view
+        self.page_num, self.page, self.aspect = -1, None, 1.414
+        self.set_draw_func(self._draw)
+        self.connect("resize", lambda area, width, height: self.page_num == self.view.app.current_page and self.view.window.update_zoom_label())
+        drag = Gtk.GestureDrag.new()
+        drag.connect("drag-begin", self._on_drag_begin); drag.connect("drag-update", lambda g, x, y: self.view.app.on_drag_update(g, x, y)); drag.connect("drag-end", lambda g, x, y: self.view.app.on_drag_end(g, x, y))
+        self.add_controller(drag)
+        click = Gtk.GestureClick.new(); click.connect("released", lambda g, n, x, y: self.view.window.on_page_click(self, self.page_num, x, y))
+        self.add_controller(click)
+        motion = Gtk.EventControllerMotion.new()
+        motion.connect("motion", lambda c, x, y: self.view.window.on_page_motion(self, self.page_num, x, y))
+        motion.connect("leave", lambda c: self.view.window._on_drawing_area_leave(c))
+        self.add_controller(motion)
+
+    def do_get_request_mode(self):
+        """Pages are measured height-for-width."""
+        return Gtk.SizeRequestMode.HEIGHT_FOR_WIDTH
+
+    def do_measure(self, orientation, for_size):
+        """Requests a height matching the page's aspect ratio for the given width."""
+        if orientation == Gtk.Orientation.HORIZONTAL:
+            width = int(self.view.window.page_display_width(self.page) or 1) if self.page else 1
+            return width, width, -1, -1
+        height = int(for_size * self.aspect) if for_size > 0 else 1
+        return height, height, -1, -1
+
+    def bind(self, page_num):
+        """Attaches the widget to a page of the current document."""
+        self.page_num = page_num
+        self.page = self.view.app.doc.load_page(page_num)
+        self.aspect = self.page.rect.height / self.page.rect.width if self.page.rect.width > 0 else 1.414
+        self.update_zoom(); self.queue_draw()
+
+    def update_zoom(self):
+        """Fills the row at fit-width zoom, or is centered at its own width otherwise, and re-measures."""
+        self.set_halign(Gtk.Align.FILL if self.view.window.zoom == 'fit-width' else Gtk.Align.CENTER)
+        self.queue_resize()
+
+    def unbind(self):
+        """Detaches the widget from its page so it can be recycled."""
+        self.page_num, self.page = -1, None
+
+    def _on_drag_begin(self, gesture, x, y):
+        """Makes this page the current one before starting a signature area selection on it."""
+        self.view.activate_page(self.page_num)
+        self.view.app.on_drag_begin(gesture, x, y)
+
+    def visible_rect(self, width, height):
+        """Returns the part of the widget inside the scrolled viewport, as (x, y, width, height) in widget coordinates."""
+        _, x, y = self.view.translate_coordinates(self, 0, 0)
+        if y >= height or y + self.view.get_height() <= 0 or x >= width or x + self.view.get_width() <= 0: return None
+        return (x, y, self.view.get_width(), self.view.get_height())
+
+    def _draw(self, area, cr, width, height):
+        """Draws the visible tiles of the page followed by the window's overlays for it."""
+        if not self.page or width <= 0: return
+        if visible := self.visible_rect(width, height):
+            self.view.window.tile_renderer.draw(cr, self.page, self.page_num, width / self.page.rect.width, visible, refine=not self.view.window.is_zoom_settling())
+        self.view.window.draw_page_overlays(cr, self.page_num, self.page, width)
+
+class ContinuousView(Gtk.ScrolledWindow):
+    """
+    Shows every page of the document in a vertically scrolling Gtk.ListView. Only the rows
+    near the viewport exist as (recycled) PageWidgets, and those only render the tiles that
+    are actually visible, so cost does not grow with the number of pages. The page at the
+    center of the viewport becomes the application's current page.
+    """
+    def __init__(self, window):
+        """Initializes the view for the given AppWindow."""
+        super().__init__(hscrollbar_policy="automatic", vscrollbar_policy="automatic", vexpand=True)
+        self.window = window
+        self.app = window.get_application()
+        self.bound_widgets = set()
+        self._activating = False
+        self._tracking_blocked = False
+        self.model = Gtk.StringList()
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", lambda f, item: item.set_child(PageWidget(self)))
+        factory.connect("bind", self._on_bind)
+        factory.connect("unbind", self._on_unbind)
+        self.list_view = Gtk.ListView(model=Gtk.NoSelection(model=self.model), factory=factory)
+        self.list_view.add_css_class("view")
+        self.set_child(self.list_view)
+        self.get_vadjustment().connect("value-changed", self._on_scrolled)
+        self.get_hadjustment().connect("value-changed", lambda adjustment: self.queue_draw_pages())
+
+    def _on_bind(self, factory, item):
+        """Binds a recycled page widget to the page of its list item."""
+        widget = item.get_child()
+        widget.bind(int(item.get_item().get_string()))
+        self.bound_widgets.add(widget)
+
+    def _on_unbind(self, factory, item):
+        """Releases a page widget scrolled far out of view."""
+        widget = item.get_child()
+        widget.unbind()
+        self.bound_widgets.discard(widget)
+
+    def set_document(self, doc):
+        """Rebuilds the page list for a document (or empties it)."""
+        self.model.splice(0, self.model.get_n_items(), [str(n) for n in range(len(doc))] if doc else [])
+
+    def page_widget(self, page_num):
+        """Returns the realized widget showing a page, or None if the page is far from the viewport."""
+        return next((w for w in self.bound_widgets if w.page_num == page_num), None)
+
+    def get_page_width(self, page_num=None):
+        """Returns the width a page (the current one by default) is drawn at."""
+        widget = self.page_widget(self.app.current_page if page_num is None else page_num)
+        if widget and widget.get_width() > 0: return widget.get_width()
+        return next((w.get_width() for w in self.bound_widgets if w.get_width() > 0), self.list_view.get_width())
+
+    def update_zoom(self):
+        """Re-measures the realized pages after the window's zoom changed."""
+        for widget in self.bound_widgets: widget.update_zoom()
+
+    def queue_draw_pages(self):
+        """Redraws every realized page widget."""
+        for widget in self.bound_widgets: widget.queue_draw()
+
+    def activate_page(self, page_num):
+        """Makes a page current without scrolling the view to it."""
+        if page_num < 0 or page_num == self.app.current_page: return
+        self._activating = True
+        try: self.app.display_page(page_num, keep_sidebar_view=False)
+        finally: self._activating = False
+
+    def on_page_changed(self, page_num):
+        """Scrolls to a page made current by navigation (not by scrolling the view itself)."""
+        if self._activating: return
+        self._scroll_to_page(page_num)
+        GLib.idle_add(self._unblock_tracking)
+
+    def _scroll_to_page(self, page_num):
+        """Scrolls a page into view without letting the intermediate positions change the current page."""
+        self._tracking_blocked = True
+        self.list_view.scroll_to(page_num, Gtk.ListScrollFlags.NONE, None)
+
+    def _unblock_tracking(self):
+        """Resumes tracking the current page once a programmatic scroll has been laid out."""
+        self._tracking_blocked = False
+        return GLib.SOURCE_REMOVE
+
+    def _on_scrolled(self, adjustment):
+        """Redraws the newly exposed tiles and tracks the page at the center of the viewport."""
+        self.queue_draw_pages()
+        center = self.get_height() / 2
+        for widget in self.bound_widgets:
+            if self._tracking_blocked or widget.page_num < 0: continue
+            _, _, y = widget.translate_coordinates(self, 0, 0)
+            if y <= center < y + widget.get_height() + PAGE_SPACING:
+                self.activate_page(widget.page_num)
+                break
+        self.window.tile_renderer.cancel_except({w.page_num for w in self.bound_widgets} | {self.app.current_page - 1, self.app.current_page, self.app.current_page + 1})
+
+    def scroll_to_rect(self, page_num, pdf_rect):
+        """Scrolls so that a rectangle (in PDF coordinates) of a page is centered in the viewport."""
+        self._scroll_to_page(page_num)
+        GLib.idle_add(self._center_rect, page_num, pdf_rect)
+
+    def _center_rect(self, page_num, pdf_rect):
+        """Adjusts the scroll position once the target page's widget has been laid out."""
+        widget = self.page_widget(page_num)
+        if not widget or not widget.page or widget.get_width() <= 0: return self._unblock_tracking()
+        scale = widget.get_width() / widget.page.rect.width
+        x0, y0, x1, y1 = pdf_rect
+        _, widget_x, widget_y = widget.translate_coordinates(self, 0, 0)
+        for adjustment, rect_center, view_size in ((self.get_hadjustment(), widget_x + (x0 + x1) / 2 * scale, self.get_width()),
+                                                  (self.get_vadjustment(), widget_y + (widget.page.rect.height - (y0 + y1) / 2) * scale, self.get_height())):
+            adjustment.set_value(max(adjustment.get_lower(), min(adjustment.get_value() + rect_center - view_size / 2, adjustment.get_upper() - adjustment.get_page_size())))
+        return self._unblock_tracking()
@@ -1,25 +1,55 @@
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-gi.require_version('GdkPixbuf', '2.0')
-from gi.repository import Gtk, GdkPixbuf, GLib, GObject, Adw
-import fitz
+gi.require_version('Gdk', '4.0')
+from gi.repository import Gtk, Gdk, GLib, GObject, Adw
+from collections import OrderedDict
 
 THUMBNAIL_WIDTH = 150
+THUMBNAIL_CACHE_SIZE = 256
+
+class ThumbnailRow(Gtk.Box):
+    """A recycled row of the pages pane: a thumbnail, empty until rendered, above the page number."""
+    def __init__(self):
+        """Initializes an unbound row."""
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=4, halign=Gtk.Align.CENTER,
+                         margin_top=5, margin_bottom=5, margin_start=5, margin_end=5)
+        self.page_num = -1
+        self.picture = Gtk.Picture(content_fit=Gtk.ContentFit.CONTAIN)
+        self.label = Gtk.Label()
+        self.append(self.picture); self.append(self.label)
+        self.set_size_request(THUMBNAIL_WIDTH, -1)
+
+    def bind(self, page_num, page_rect, texture):
+        """Shows a page: the placeholder is sized from the page's rectangle, so nothing is rendered to lay it out."""
+        self.page_num = page_num
+        self.label.set_label(str(page_num + 1))
+        self.picture.set_size_request(THUMBNAIL_WIDTH, int(THUMBNAIL_WIDTH * page_rect.height / page_rect.width) if page_rect.width > 0 else THUMBNAIL_WIDTH)
+        self.picture.set_paintable(texture)
 
 class Sidebar(Gtk.Box):
     """
     A sidebar widget that displays page thumbnails or a list of existing signatures,
-    switchable via a button group at the bottom.
+    switchable via a button group at the bottom. The pages pane is a Gtk.ListView, so only
+    the rows in view exist, and their thumbnails are rendered in the background (by the
+    RenderService if given) when first shown and then kept in a bounded cache. With a
+    ThumbnailPack attached, rendered thumbnails are also stored on disk as PNG, so the
+    thumbnails of a document opened before are loaded instead of rendered.
     """
     __gsignals__ = { 
         'page-selected': (GObject.SignalFlags.RUN_FIRST, None, (int,)), 
         'signature-selected': (GObject.SignalFlags.RUN_FIRST, None, (object,)) 
     }
     
-    def __init__(self, **kwargs):
+    def __init__(self, render_service=None, **kwargs):
         """Initializes the sidebar widget with a vertical Box layout."""
         super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
+        self.render_service = render_service
+        self.doc, self.display_lists = None, None
+        self.bound_rows = set()
+        self._thumbnails = OrderedDict()
+        self._generation = 0
+        self.thumbnail_pack = None
         
         # --- Main View Stack ---
         self.stack = Gtk.Stack()
@@ -28,9 +58,15 @@ class Sidebar(Gtk.Box):
 
         # --- Pages View ---
         self.pages_scrolled_window = Gtk.ScrolledWindow(hscrollbar_policy="never", vscrollbar_policy="automatic", vexpand=True)
-        self.pages_listbox = Gtk.ListBox(selection_mode=Gtk.SelectionMode.SINGLE)
-        self.pages_listbox.connect("row-selected", self._on_page_row_selected)
-        self.pages_scrolled_window.set_child(self.pages_listbox)
+        self.pages_model = Gtk.StringList()
+        self.pages_selection = Gtk.SingleSelection(model=self.pages_model, autoselect=False, can_unselect=True)
+        self.pages_selection.connect("notify::selected", self._on_page_row_selected)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", lambda f, item: item.set_child(ThumbnailRow()))
+        factory.connect("bind", self._on_thumbnail_bind)
+        factory.connect("unbind", self._on_thumbnail_unbind)
+        self.pages_listview = Gtk.ListView(model=self.pages_selection, factory=factory)
+        self.pages_scrolled_window.set_child(self.pages_listview)
         self.stack.add_named(self.pages_scrolled_window, "pages")
 
         # --- Signatures View ---
@@ -82,47 +118,106 @@ class Sidebar(Gtk.Box):
         if button.get_active():
             self.stack.set_visible_child_name(view_name)
     
-    def populate(self, doc, signatures):
-        """Fills the sidebar panes with page thumbnails and signature information."""
+    def populate(self, doc, signatures, display_lists=None, keep_pages=None):
+        """
+        Fills the sidebar panes with (not yet rendered) page thumbnails and signature information.
+        The thumbnails of keep_pages are kept, for a document whose pages render as the previous one's.
+        """
         # Clear previous content
-        self.pages_listbox.unselect_all()
-        while (row := self.pages_listbox.get_row_at_index(0)): self.pages_listbox.remove(row)
-        while (row := self.signatures_listbox.get_row_at_index(0)): self.signatures_listbox.remove(row)
+        self._generation += 1
+        for page_num in [page_num for page_num in self._thumbnails if not keep_pages or page_num not in keep_pages]: del self._thumbnails[page_num]
+        self.doc, self.display_lists = doc, display_lists
+        self.block_signal = True
+        self.pages_selection.unselect_all()
+        self.pages_model.splice(0, self.pages_model.get_n_items(), [str(page_num) for page_num in range(len(doc))] if doc else [])
+        self.block_signal = False
         while (row := self.search_listbox.get_row_at_index(0)): self.search_listbox.remove(row)
         self.search_button.set_visible(False)
 
         if not doc: 
+            self.populate_signatures([])
             self.set_visible(False)
             return
         
         self.set_visible(True)
 
-        # Populate page thumbnails
-        for page_num in range(len(doc)):
-            row = Gtk.ListBoxRow()
-            page = doc.load_page(page_num)
-            page_rect = page.rect
-            if page_rect.width == 0: continue
-            zoom = THUMBNAIL_WIDTH / page_rect.width
-            matrix = fitz.Matrix(zoom, zoom)
-            thumbnail_height = page_rect.height * zoom
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
-            pixbuf = GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(pix.samples), GdkPixbuf.Colorspace.RGB, False, 8, pix.width, pix.height, pix.stride)
-            picture = Gtk.Picture.new_for_pixbuf(pixbuf)
-            picture.set_content_fit(Gtk.ContentFit.CONTAIN)
-            picture.set_size_request(THUMBNAIL_WIDTH, thumbnail_height)
-            label = Gtk.Label.new(str(page_num + 1))
-            item_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
-            item_box.set_size_request(THUMBNAIL_WIDTH, -1)
-            item_box.set_halign(Gtk.Align.CENTER)
-            item_box.set_margin_top(5)
-            item_box.set_margin_bottom(5)
-            item_box.set_margin_start(5)
-            item_box.set_margin_end(5)
-            item_box.append(picture)
-            item_box.append(label)
-            row.set_child(item_box)
-            self.pages_listbox.append(row)
+        self.populate_signatures(signatures)
+
+        # Always default to showing pages, and ensure the button is active
+        self.pages_button.set_active(True)
+        self.stack.set_visible_child_name("pages")
+
+    def set_thumbnail_pack(self, pack):
+        """Attaches the on-disk thumbnail pack of the current document: stores the thumbnails rendered so far and loads those of the rows in view."""
+        self.thumbnail_pack = pack
+        if pack is None: return
+        for page_num, (_, png) in self._thumbnails.items():
+            if (page_num, THUMBNAIL_WIDTH) not in pack: pack.put(page_num, THUMBNAIL_WIDTH, png)
+        for row in self.bound_rows:
+            if row.page_num >= 0 and row.page_num not in self._thumbnails and (texture := self._load_thumbnail(row.page_num)):
+                row.picture.set_paintable(texture)
+
+    def _load_thumbnail(self, page_num):
+        """Returns a page's thumbnail from the on-disk pack (and caches it in memory), or None if not stored."""
+        if self.thumbnail_pack is None or (data := self.thumbnail_pack.get(page_num, THUMBNAIL_WIDTH)) is None: return None
+        return self._cache_thumbnail(page_num, data)
+
+    def _cache_thumbnail(self, page_num, png):
+        """Decodes a thumbnail's PNG into a texture and keeps both in the in-memory LRU cache; returns the texture, or None if it cannot be decoded."""
+        try: texture = Gdk.Texture.new_from_bytes(GLib.Bytes.new(png))
+        except GLib.Error as e:
+            print(f"Error loading thumbnail: {e}")
+            return None
+        self._thumbnails[page_num] = (texture, png)
+        while len(self._thumbnails) > THUMBNAIL_CACHE_SIZE: self._thumbnails.popitem(last=False)
+        return texture
+
+    def _on_thumbnail_bind(self, factory, item):
+        """Shows a page's cached or stored thumbnail in a recycled row, or requests it if it has not been rendered yet."""
+        row, page_num = item.get_child(), int(item.get_item().get_string())
+        if (cached := self._thumbnails.get(page_num)) is not None:
+            self._thumbnails.move_to_end(page_num)
+            texture = cached[0]
+        else: texture = self._load_thumbnail(page_num)
+        row.bind(page_num, self.doc.load_page(page_num).rect, texture)
+        self.bound_rows.add(row)
+        if texture is None: self._request_thumbnail(page_num)
+
+    def _on_thumbnail_unbind(self, factory, item):
+        """Cancels the rendering of a thumbnail scrolled out of view before it started."""
+        row = item.get_child()
+        self.bound_rows.discard(row)
+        if self.render_service and row.page_num not in self._thumbnails:
+            key = ('thumbnail', row.page_num)
+            self.render_service.cancel_where(lambda k: k == key)
+        row.page_num = -1
+
+    def _request_thumbnail(self, page_num):
+        """Renders a page's thumbnail in the background: on the render service, or on idle from the display lists."""
+        page_rect = self.doc.load_page(page_num).rect
+        if page_rect.width <= 0: return
+        zoom, generation = THUMBNAIL_WIDTH / page_rect.width, self._generation
+        if self.render_service:
+            self.render_service.request_thumbnail(('thumbnail', page_num), page_num, zoom,
+                                                  lambda key, png: GLib.idle_add(self._on_thumbnail_rendered, generation, page_num, png))
+        elif self.display_lists:
+            def render():
+                if generation == self._generation and any(row.page_num == page_num for row in self.bound_rows):
+                    self._on_thumbnail_rendered(generation, page_num, self.display_lists.get_pixmap(page_num, zoom).tobytes("png"))
+                return GLib.SOURCE_REMOVE
+            GLib.idle_add(render)
+
+    def _on_thumbnail_rendered(self, generation, page_num, png):
+        """Main-loop handler for a thumbnail rendered as PNG: caches and stores it, and shows it if its row is still in view."""
+        if generation != self._generation or (texture := self._cache_thumbnail(page_num, png)) is None: return GLib.SOURCE_REMOVE
+        if self.thumbnail_pack: self.thumbnail_pack.put(page_num, THUMBNAIL_WIDTH, png)
+        for row in self.bound_rows:
+            if row.page_num == page_num: row.picture.set_paintable(texture)
+        return GLib.SOURCE_REMOVE
+
+    def populate_signatures(self, signatures):
+        """Fills the signatures pane; called again each time a new signature finishes validating."""
+        while (row := self.signatures_listbox.get_row_at_index(0)): self.signatures_listbox.remove(row)
 
         # Populate signatures and control switcher visibility
         if signatures:
@@ -140,10 +235,6 @@ class Sidebar(Gtk.Box):
                 self.signatures_listbox.append(row)
         else: 
             self.signatures_button.set_visible(False)
-
-        # Always default to showing pages, and ensure the button is active
-        self.pages_button.set_active(True)
-        self.stack.set_visible_child_name("pages")
             
     def select_page(self, page_num):
         """Programmatically selects a specific page in the thumbnail list and ensures it is visible."""
@@ -152,10 +243,9 @@ class Sidebar(Gtk.Box):
         self.pages_button.set_active(True)
         
         self.block_signal = True
-        row = self.pages_listbox.get_row_at_index(page_num)
-        if row:
-            self.pages_listbox.select_row(row)
-            GLib.idle_add(self._scroll_to_selected_row, self.pages_listbox)
+        if 0 <= page_num < self.pages_model.get_n_items():
+            self.pages_selection.set_selected(page_num)
+            self.pages_listview.scroll_to(page_num, Gtk.ListScrollFlags.NONE, None)
         self.block_signal = False
 
     def _scroll_to_selected_row(self, listbox):
@@ -177,10 +267,11 @@ class Sidebar(Gtk.Box):
 
         return GLib.SOURCE_REMOVE
 
-    def _on_page_row_selected(self, listbox, row):
+    def _on_page_row_selected(self, selection, pspec):
         """Emits the 'page-selected' signal when a user clicks a page thumbnail."""
-        if row and not self.block_signal: 
-            self.emit("page-selected", row.get_index())
+        page_num = selection.get_selected()
+        if page_num != Gtk.INVALID_LIST_POSITION and not self.block_signal: 
+            self.emit("page-selected", page_num)
 
     def _on_search_row_selected(self, listbox, row):
         """Calls the application to select the corresponding search result."""
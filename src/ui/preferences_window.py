@@ -63,11 +63,61 @@ class PreferencesWindow(Adw.PreferencesWindow):
         self.location_row = Adw.EntryRow.new()
         self.location_row.connect("notify::text", self._on_location_changed)
         self.signing_group.add(self.location_row)
+
+        self.session_ttl_row = self._add_spin_row(self.signing_group, 0, 86400, 60, self.app.config.get_credential_session_ttl(), self.app.set_credential_session_ttl)
+        
+        self.validation_group = Adw.PreferencesGroup.new()
+        self.page_general.add(self.validation_group)
+
+        self.validation_mode_row = Adw.ComboRow.new()
+        self.validation_mode_row.set_model(Gtk.StringList.new(["", ""]))
+        self.validation_mode_row.set_selected(1 if self.app.config.get_validation_mode() == "offline" else 0)
+        self.validation_mode_handler = self.validation_mode_row.connect("notify::selected", self._on_validation_mode_changed)
+        self.validation_group.add(self.validation_mode_row)
+
+        self.trust_store_row = Adw.ActionRow.new()
+        self.trust_store_button = Gtk.Button(icon_name="folder-open-symbolic", valign=Gtk.Align.CENTER)
+        self.trust_store_button.connect("clicked", self._on_choose_trust_store_clicked)
+        self.trust_store_row.add_suffix(self.trust_store_button)
+        self.validation_group.add(self.trust_store_row)
+
+        self.deep_verification_row = Adw.ActionRow.new()
+        self.deep_verification_switch = Gtk.Switch(valign=Gtk.Align.CENTER)
+        self.deep_verification_switch.set_active(self.app.config.get_deep_verification())
+        self.deep_verification_switch.connect("notify::active", self._on_deep_verification_toggled)
+        self.deep_verification_row.add_suffix(self.deep_verification_switch)
+        self.deep_verification_row.set_activatable_widget(self.deep_verification_switch)
+        self.validation_group.add(self.deep_verification_row)
+
+        self.validation_workers_row = self._add_spin_row(self.validation_group, 0, 64, 1, self.app.config.get_validation_workers(), self.app.set_validation_workers)
+
+        self.performance_group = Adw.PreferencesGroup.new()
+        self.page_general.add(self.performance_group)
+
+        self.stamp_backend_row = Adw.ComboRow.new()
+        self.stamp_backend_row.set_model(Gtk.StringList.new(["", ""]))
+        self.stamp_backend_row.set_selected(1 if self.app.config.get_stamp_backend() == "markup" else 0)
+        self.stamp_backend_handler = self.stamp_backend_row.connect("notify::selected", self._on_stamp_backend_changed)
+        self.performance_group.add(self.stamp_backend_row)
+
+        self.render_workers_row = self._add_spin_row(self.performance_group, 1, 16, 1, self.app.config.get_render_workers(), self.app.set_render_workers)
+        self.tile_cache_row = self._add_spin_row(self.performance_group, 16, 4096, 16, self.app.config.get_tile_cache_size(), self.app.set_tile_cache_size)
+        self.thumbnail_cache_row = self._add_spin_row(self.performance_group, 8, 4096, 8, self.app.config.get_thumbnail_cache_size(), self.app.set_thumbnail_cache_size)
         
         self.certs_page = Adw.PreferencesPage.new()
         self.certs_page.set_name("certificates") 
         self.add(self.certs_page)
 
+    def _add_spin_row(self, group, lower, upper, step, value, on_changed):
+        """Adds to a group a row with a spin button, calling on_changed with the new integer value; returns the row."""
+        row = Adw.ActionRow.new()
+        spin = Gtk.SpinButton.new_with_range(lower, upper, step)
+        spin.set_valign(Gtk.Align.CENTER); spin.set_value(value)
+        spin.connect("value-changed", lambda button: on_changed(button.get_value_as_int()))
+        row.add_suffix(spin); row.set_activatable_widget(spin)
+        group.add(row)
+        return row
+
     def _update_texts(self):
         """Updates all translatable text elements in the window."""
         self.set_title(self.i18n._("preferences"))
@@ -80,6 +130,31 @@ class PreferencesWindow(Adw.PreferencesWindow):
         self.reason_row.set_tooltip_text(self.i18n._("reason_placeholder"))
         self.location_row.set_title(self.i18n._("signature_location"))
         self.location_row.set_tooltip_text(self.i18n._("location_placeholder"))
+        self.session_ttl_row.set_title(self.i18n._("credential_session_ttl"))
+        self.session_ttl_row.set_subtitle(self.i18n._("credential_session_ttl_subtitle"))
+        self.validation_group.set_title(self.i18n._("signature_validation"))
+        self.validation_mode_row.set_title(self.i18n._("validation_mode"))
+        with self.validation_mode_row.handler_block(self.validation_mode_handler):
+            self.validation_mode_row.set_model(Gtk.StringList.new([self.i18n._("validation_mode_online"), self.i18n._("validation_mode_offline")]))
+            self.validation_mode_row.set_selected(1 if self.app.config.get_validation_mode() == "offline" else 0)
+        self.trust_store_row.set_title(self.i18n._("trust_store_folder"))
+        self.trust_store_button.set_tooltip_text(self.i18n._("choose_folder"))
+        self.deep_verification_row.set_title(self.i18n._("deep_verification"))
+        self.deep_verification_row.set_subtitle(self.i18n._("deep_verification_subtitle"))
+        self.validation_workers_row.set_title(self.i18n._("validation_workers"))
+        self.validation_workers_row.set_subtitle(self.i18n._("validation_workers_subtitle"))
+        self.performance_group.set_title(self.i18n._("performance"))
+        self.stamp_backend_row.set_title(self.i18n._("stamp_backend"))
+        self.stamp_backend_row.set_subtitle(self.i18n._("stamp_backend_subtitle"))
+        with self.stamp_backend_row.handler_block(self.stamp_backend_handler):
+            self.stamp_backend_row.set_model(Gtk.StringList.new([self.i18n._("stamp_backend_html"), self.i18n._("stamp_backend_markup")]))
+            self.stamp_backend_row.set_selected(1 if self.app.config.get_stamp_backend() == "markup" else 0)
+        self.render_workers_row.set_title(self.i18n._("render_workers"))
+        self.render_workers_row.set_subtitle(self.i18n._("render_workers_subtitle"))
+        self.tile_cache_row.set_title(self.i18n._("tile_cache_size"))
+        self.tile_cache_row.set_subtitle(self.i18n._("tile_cache_size_subtitle"))
+        self.thumbnail_cache_row.set_title(self.i18n._("thumbnail_cache_size"))
+        self.thumbnail_cache_row.set_subtitle(self.i18n._("thumbnail_cache_size_subtitle"))
         self.certs_page.set_title(self.i18n._("certificates"))
         self.certs_page.set_icon_name("dialog-password-symbolic")
         self.update_ui()
@@ -104,6 +179,7 @@ class PreferencesWindow(Adw.PreferencesWindow):
 
         self.reason_row.set_text(self.app.config.get_signature_reason())
         self.location_row.set_text(self.app.config.get_signature_location())
+        self.trust_store_row.set_subtitle(self.app.config.get_trust_store_dir())
         
         cert_details_list = self.app.cert_manager.get_all_certificate_details()
         cert_details_list = sorted(cert_details_list, key=lambda cert: cert['subject_cn'].lower())
@@ -178,4 +254,30 @@ class PreferencesWindow(Adw.PreferencesWindow):
 
     def _on_location_changed(self, entry_row, param):
         """Updates the signature location in the configuration (in-memory)."""
-        self.app.config.set_signature_location(entry_row.get_text())
\ No newline at end of file
+        self.app.config.set_signature_location(entry_row.get_text())
+
+    def _on_validation_mode_changed(self, combo_row, param):
+        """Switches between online and offline signature validation."""
+        mode = "offline" if combo_row.get_selected() == 1 else "online"
+        if mode != self.app.config.get_validation_mode():
+            self.app.set_validation_mode(mode)
+
+    def _on_deep_verification_toggled(self, switch, param):
+        """Enables or disables the background modification analysis."""
+        self.app.set_deep_verification(switch.get_active())
+
+    def _on_stamp_backend_changed(self, combo_row, param):
+        """Switches how signature stamps are laid out."""
+        backend = "markup" if combo_row.get_selected() == 1 else "html"
+        if backend != self.app.config.get_stamp_backend():
+            self.app.set_stamp_backend(backend)
+
+    def _on_choose_trust_store_clicked(self, button):
+        """Shows a folder chooser to select the local trust store directory."""
+        def on_response(dialog, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                if folder := dialog.get_file():
+                    self.app.set_trust_store_dir(folder.get_path())
+                    self.trust_store_row.set_subtitle(self.app.config.get_trust_store_dir())
+        file_chooser = Gtk.FileChooserNative.new(self.i18n._("trust_store_folder"), self, Gtk.FileChooserAction.SELECT_FOLDER, self.i18n._("accept"), self.i18n._("cancel"))
+        file_chooser.connect("response", on_response); file_chooser.show()
\ No newline at end of file
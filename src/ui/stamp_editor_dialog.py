@@ -5,7 +5,7 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Pango, PangoCairo, Secret, Gdk
 import uuid
 import re
-from certificate_manager import KEYRING_SCHEMA
+from stamp_template import compile_template
 
 class StampEditorDialog(Gtk.Dialog):
     """A dialog for creating, editing, and managing signature stamp templates."""
@@ -185,8 +185,7 @@ class StampEditorDialog(Gtk.Dialog):
     def _load_certificate_for_preview(self):
         """Loads the active certificate to render a more accurate preview."""
         if self.app.active_cert_path:
-            password = Secret.password_lookup_sync(KEYRING_SCHEMA, {"path": self.app.active_cert_path}, None)
-            if password: _, self.loaded_cert = self.app.cert_manager.get_credentials(self.app.active_cert_path, password)
+            self.loaded_cert = self.app.cert_manager.get_certificate(self.app.active_cert_path)
 
     def _get_current_form_state(self):
         """Returns a dictionary with the current data from the form fields."""
@@ -319,7 +318,7 @@ class StampEditorDialog(Gtk.Dialog):
         if self.loaded_cert:
             preview_text = self.app.get_parsed_stamp_text(self.loaded_cert, override_template=text)
         else:
-            preview_text = re.sub(r'\$\$SIGNDATE=.*?Z\$\$', "24/12/2025", text.replace("$$SUBJECTCN$$", "Subject Name").replace("$$ISSUERCN$$", "Issuer Name").replace("$$CERTSERIAL$$", "123456789"))
+            preview_text = compile_template(text).render_sample()
         
         layout = PangoCairo.create_layout(cr)
         layout.set_width(Pango.units_from_double(width - 40))
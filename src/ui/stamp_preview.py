@@ -0,0 +1,91 @@
+# ui/stamp_preview.py
+import gi
+from gi.repository import GLib
+import math, cairo
+from render_service import render_stamp, map_shared
+
+class StampPreviewCache:
+    """
+    Renders the preview of the signature stamp drawn inside the selection rectangle. Previews are
+    kept on the stamp appearances of a StampAppearanceCache (keyed by the stamp HTML, which derives
+    from the template and the certificate, and the box size in points), by size in pixels, so that
+    signing reuses the appearance that was previewed. On a miss the closest preview of the same HTML,
+    or else of a stamp sharing its layout skeleton (the same stamp showing an earlier date or time), is
+    painted scaled, and the exact one is rendered (on the RenderService if given) only once the
+    rectangle has not changed for SETTLE_MS, so dragging or resizing never waits for the HTML layout.
+    """
+    SETTLE_MS = 120
+
+    def __init__(self, appearances, render_service=None, on_update=None):
+        """Initializes the previews of a StampAppearanceCache; on_update is called on the main loop when a preview is ready."""
+        self.appearances = appearances
+        self.render_service = render_service
+        self.on_update = on_update
+        self._target = None
+        self._settle_source = None
+
+    def draw(self, cr, html, x, y, width, height, box_width, box_height):
+        """Paints the preview of the stamp html, laid out in box_width x box_height points, into the (x, y, width, height) pixel rectangle."""
+        size = (int(width), int(height))
+        stamp = self.appearances.peek(html, box_width, box_height)
+        if stamp is not None and (surface := stamp.previews.get(size)) is not None:
+            stamp.previews.move_to_end(size)
+        else:
+            surface = self._closest(html, width, height)
+            self._schedule(html, box_width, box_height, size)
+        if surface is None: return
+        cr.save(); cr.translate(x, y); cr.scale(width / surface.get_width(), height / surface.get_height())
+        cr.set_source_surface(surface, 0, 0)
+        cr.rectangle(0, 0, surface.get_width(), surface.get_height()); cr.fill()
+        cr.restore()
+
+    def _closest(self, html, width, height):
+        """
+        Returns the preview (at any box size) whose pixel size is closest to width x height, of the stamp
+        html or, if it has none yet, of a stamp sharing its layout skeleton; None if there is none.
+        """
+        if width <= 0 or height <= 0: return None
+        candidates = [(stamp.html_content != html, abs(math.log(w / width)) + abs(math.log(h / height)), surface)
+                      for stamp in self.appearances.with_skeleton(html) for (w, h), surface in stamp.previews.items()]
+        return min(candidates, key=lambda candidate: candidate[:2])[2] if candidates else None
+
+    @staticmethod
+    def _request_key(html, box_width, box_height, size):
+        """Returns the RenderService key of a preview request, with the box rounded as StampAppearanceCache keys it."""
+        return ('stamp', html, round(box_width, 1), round(box_height, 1), size)
+
+    def _schedule(self, html, box_width, box_height, size):
+        """(Re)starts the settle timer for the latest missing preview, unless it is already waiting for or rendering that same preview."""
+        if box_width <= 0 or min(size) <= 0: return
+        target = (html, box_width, box_height, size)
+        if target == self._target and (self._settle_source or (self.render_service and self.render_service.is_pending(self._request_key(*target)))): return
+        self._target = target
+        if self._settle_source: GLib.source_remove(self._settle_source)
+        self._settle_source = GLib.timeout_add(self.SETTLE_MS, self._on_settled)
+
+    def _on_settled(self):
+        """Renders the preview requested last, once the rectangle stopped changing; an appearance already laid out is only rasterized."""
+        self._settle_source = None
+        html, box_width, box_height, size = self._target
+        stamp = self.appearances.load(html, box_width, box_height)
+        if stamp is not None and size in stamp.previews: return GLib.SOURCE_REMOVE
+        stamp_key, pdf_bytes = (html, box_width, box_height), stamp.pdf_bytes if stamp else None
+        layout_scale = self.appearances.layout_scale_hint(html, box_width, box_height) if stamp is None else None
+        args = (html, box_width, box_height, size[0] / box_width, pdf_bytes, layout_scale, self.appearances.backend)
+        if self.render_service:
+            key = self._request_key(html, box_width, box_height, size)
+            self.render_service.cancel_where(lambda k: k[0] == 'stamp' and k != key)
+            self.render_service.submit(key, render_stamp, args, lambda key, result: GLib.idle_add(self._on_rendered, stamp_key, size, result, pdf_bytes), "stamp preview")
+        else:
+            try: self._on_rendered(stamp_key, size, map_shared(render_stamp(*args)), pdf_bytes)
+            except Exception as e: print(f"Error rendering stamp preview: {e}")
+        return GLib.SOURCE_REMOVE
+
+    def _on_rendered(self, stamp_key, size, result, pdf_bytes=None):
+        """Main-loop handler for a rendered preview: adopts the laid-out stamp and keeps the preview on it as a cairo surface wrapping the mapped samples."""
+        laid_out_bytes, layout_scale, (_, _, width, height, stride, samples) = result
+        stamp = self.appearances.get(*stamp_key, pdf_bytes=laid_out_bytes or pdf_bytes, layout_scale=layout_scale)
+        if width > 0 and height > 0:
+            stamp.add_preview(size, cairo.ImageSurface.create_for_data(samples, cairo.FORMAT_RGB24, width, height, stride))
+            if self.on_update: self.on_update()
+        return GLib.SOURCE_REMOVE
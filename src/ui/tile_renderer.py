@@ -0,0 +1,178 @@
+# ui/tile_renderer.py
+import gi
+from gi.repository import GLib
+from collections import OrderedDict
+from display_list_cache import render_rgb24
+import math, cairo, fitz
+
+class TileRenderer:
+    """
+    Renders PDF pages as square tiles, drawing only those that intersect the visible area.
+    Zoom factors are rounded up to geometric buckets so that small width changes reuse the
+    tiles already rendered (scaled down slightly when painted). Tiles are kept in an LRU
+    cache keyed by (page, zoom bucket, tile x, tile y) and bounded by a memory budget. Tiles are
+    cairo surfaces wrapping the rendered samples in place; they are never converted when painted.
+    With a RenderService, missing tiles are rendered in the background; meanwhile a
+    low-resolution preview of the page and the tiles of the nearest cached zoom buckets
+    are painted scaled, so rendering goes progressively from coarse to sharp.
+    """
+    TILE_SIZE = 256
+    ZOOM_STEP = 1.02
+    PREVIEW_WIDTH = 256
+    FALLBACK_BUCKETS = 2
+
+    def __init__(self, max_bytes=128 * 1024 * 1024, render_service=None, on_update=None):
+        """Initializes the renderer; on_update is called on the main loop when new tiles arrive."""
+        self.max_bytes = max_bytes
+        self.render_service = render_service
+        self.on_update = on_update
+        self._tiles = OrderedDict()
+        self._total_bytes = 0
+        self._bucket_tiles = {}
+        self._generation = 0
+        self.display_lists = None
+
+    def clear(self):
+        """Drops every cached tile, e.g. when another document is opened."""
+        self._tiles.clear(); self._total_bytes = 0
+        self._bucket_tiles.clear()
+        self._generation += 1
+
+    def set_document(self, file_path, signature=None, display_lists=None, keep_pages=None):
+        """
+        Clears the cache and points the render service (or, without one, the DisplayListCache used to render) at another document.
+        The tiles of keep_pages are kept, for a document that renders those pages exactly as the previous one did.
+        """
+        if keep_pages: self.retain_pages(keep_pages)
+        else: self.clear()
+        self.display_lists = display_lists
+        if self.render_service: self.render_service.set_document(file_path, signature)
+
+    def retain_pages(self, page_nums):
+        """Drops the cached tiles of every page not in page_nums and ignores renders still in flight."""
+        for key in [key for key in self._tiles if key[0] not in page_nums]:
+            self._total_bytes -= self._tiles.pop(key)[3]
+        self._bucket_tiles = {bucket_key: count for bucket_key, count in self._bucket_tiles.items() if bucket_key[0] in page_nums}
+        self._generation += 1
+
+    def set_max_bytes(self, max_bytes):
+        """Changes the memory budget, evicting tiles if needed."""
+        self.max_bytes = max_bytes; self._evict()
+
+    def _evict(self):
+        """Drops least recently used tiles until the cache fits in its budget."""
+        while self._tiles and self._total_bytes > self.max_bytes:
+            key, (_, _, _, size, _) = self._tiles.popitem(last=False)
+            self._total_bytes -= size
+            if len(key) == 4:
+                bucket_key = key[:2]
+                self._bucket_tiles[bucket_key] -= 1
+                if not self._bucket_tiles[bucket_key]: del self._bucket_tiles[bucket_key]
+
+    @classmethod
+    def zoom_bucket(cls, zoom):
+        """Returns the bucket index for a zoom factor; the bucket's zoom is never smaller than zoom."""
+        return math.ceil(math.log(zoom) / math.log(cls.ZOOM_STEP) - 1e-9)
+
+    def _store(self, key, result, pixmap=None):
+        """
+        Caches a render result (x, y, width, height, stride, samples) as a tile. The cairo surface uses the
+        samples (mapped from shared memory, or the buffer of pixmap, which is kept with the tile) as its pixel buffer.
+        """
+        x, y, width, height, stride, samples = result
+        surface = cairo.ImageSurface.create_for_data(samples, cairo.FORMAT_RGB24, width, height, stride)
+        tile = self._tiles[key] = (surface, x, y, stride * height, pixmap)
+        self._total_bytes += tile[3]
+        if len(key) == 4: self._bucket_tiles[key[:2]] = self._bucket_tiles.get(key[:2], 0) + 1
+        self._evict()
+        return tile
+
+    def _on_rendered(self, generation, key, result):
+        """Main-loop handler for a tile rendered in the background."""
+        if generation == self._generation and key not in self._tiles:
+            self._store(key, result)
+            if self.on_update: self.on_update()
+        return GLib.SOURCE_REMOVE
+
+    def _get(self, key, page, page_num, zoom, clip, render):
+        """Returns a cached tile; on a miss, renders it (synchronously without a render service) if render is True."""
+        if (tile := self._tiles.get(key)) is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        if not render: return None
+        if self.render_service is None:
+            pix = self.display_lists.render_rgb24(page_num, zoom, clip) if self.display_lists else render_rgb24(page.get_displaylist(), zoom, clip)
+            return self._store(key, (pix.x, pix.y, pix.width, pix.height, pix.stride, pix.samples_mv), pixmap=pix)
+        generation = self._generation
+        self.render_service.request(key, page_num, zoom, tuple(clip) if clip else None,
+                                    lambda key, result: GLib.idle_add(self._on_rendered, generation, key, result))
+        return None
+
+    def _tile_range(self, page_rect, bucket_zoom, scale, visible_rect):
+        """Returns the (tx0, ty0, tx1, ty1) range of tiles intersecting visible_rect."""
+        x, y, w, h = visible_rect
+        last_tx = math.ceil(page_rect.width * bucket_zoom / self.TILE_SIZE) - 1
+        last_ty = math.ceil(page_rect.height * bucket_zoom / self.TILE_SIZE) - 1
+        return (max(0, int(x / scale // self.TILE_SIZE)), max(0, int(y / scale // self.TILE_SIZE)),
+                min(last_tx, int((x + w) / scale // self.TILE_SIZE)), min(last_ty, int((y + h) / scale // self.TILE_SIZE)))
+
+    def _layer(self, page, page_rect, page_num, bucket, zoom, visible_rect, render):
+        """Yields the tiles of one zoom bucket intersecting visible_rect, or None for those not available yet."""
+        bucket_zoom = self.ZOOM_STEP ** bucket
+        step = self.TILE_SIZE / bucket_zoom
+        tx0, ty0, tx1, ty1 = self._tile_range(page_rect, bucket_zoom, zoom / bucket_zoom, visible_rect)
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                clip = fitz.Rect(tx * step, ty * step, (tx + 1) * step, (ty + 1) * step) & page_rect
+                yield self._get((page_num, bucket, tx, ty), page, page_num, bucket_zoom, clip, render)
+
+    def _paint(self, cr, tile, scale):
+        """Paints a tile (or preview) rendered at a zoom that is scale times smaller than the view's."""
+        surface, px, py = tile[:3]
+        cr.save(); cr.scale(scale, scale)
+        cr.set_source_surface(surface, px, py)
+        cr.rectangle(px, py, surface.get_width(), surface.get_height()); cr.fill()
+        cr.restore()
+
+    def _fallback_buckets(self, page_num, bucket):
+        """Returns the cached zoom buckets of a page closest to bucket, the farthest first so that the closest is painted on top."""
+        buckets = sorted((b for p, b in self._bucket_tiles if p == page_num and b != bucket), key=lambda b: abs(b - bucket))
+        return buckets[:self.FALLBACK_BUCKETS][::-1]
+
+    def draw(self, cr, page, page_num, zoom, visible_rect, refine=True):
+        """
+        Paints the tiles of a page intersecting visible_rect (x, y, width, height in view pixels) at the given zoom.
+        With refine False (e.g. while a zoom gesture is in progress) only what is cached is painted and no new tiles are requested.
+        """
+        if zoom <= 0: return
+        page_rect = page.rect
+        bucket = self.zoom_bucket(zoom)
+        if refine and self.render_service:
+            self.render_service.cancel_where(lambda key: self._is_tile_key(key) and key[0] == page_num and key[1] not in (bucket, 'preview'))
+        tiles = list(self._layer(page, page_rect, page_num, bucket, zoom, visible_rect, render=refine))
+        if any(tile is None for tile in tiles):
+            preview_zoom = self.PREVIEW_WIDTH / page_rect.width
+            if preview := self._get((page_num, 'preview'), page, page_num, preview_zoom, None, render=True):
+                self._paint(cr, preview, zoom / preview_zoom)
+            for fallback in self._fallback_buckets(page_num, bucket):
+                for tile in self._layer(page, page_rect, page_num, fallback, zoom, visible_rect, render=False):
+                    if tile: self._paint(cr, tile, zoom / self.ZOOM_STEP ** fallback)
+        for tile in tiles:
+            if tile: self._paint(cr, tile, zoom / self.ZOOM_STEP ** bucket)
+
+    @staticmethod
+    def _is_tile_key(key):
+        """Tells this renderer's request keys, which start with a page number, from those of other render service clients."""
+        return isinstance(key[0], int)
+
+    def cancel_except(self, page_nums):
+        """Cancels the background requests of every page not in page_nums, e.g. pages scrolled far away."""
+        if self.render_service:
+            self.render_service.cancel_where(lambda key: self._is_tile_key(key) and key[0] not in page_nums)
+
+    def prefetch(self, page, page_num, zoom, visible_rect):
+        """Requests, in the background, the preview and the tiles of a page that would be visible at this zoom."""
+        if self.render_service is None or zoom <= 0: return
+        page_rect = page.rect
+        self._get((page_num, 'preview'), page, page_num, self.PREVIEW_WIDTH / page_rect.width, None, render=True)
+        for _ in self._layer(page, page_rect, page_num, self.zoom_bucket(zoom), zoom, visible_rect, render=True): pass
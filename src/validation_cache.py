@@ -0,0 +1,57 @@
+# validation_cache.py
+import json
+from datetime import datetime
+from disk_cache import DiskCache
+
+class ValidationCache:
+    """
+    Persists signature validation summaries keyed by the file's content digest and
+    each signature's /ByteRange, so unchanged documents are not re-validated.
+    Entries expire so that trust and revocation results are refreshed periodically,
+    and results obtained under different validation settings are kept apart.
+    """
+    MAX_AGE = 24 * 3600
+    MAX_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, directory, max_age=MAX_AGE, max_bytes=MAX_BYTES):
+        """Initializes the cache in the given directory."""
+        self.store = DiskCache(directory, max_bytes=max_bytes, max_age=max_age)
+
+    @staticmethod
+    def _key(digest, byte_range, context_key):
+        """Builds the cache key for one signature of a document under given validation settings."""
+        return f"{digest}:{','.join(str(int(v)) for v in byte_range)}:{context_key}"
+
+    def lookup(self, digest, byte_range, context_key=""):
+        """Returns the cached summary for a signature, or None."""
+        data = self.store.get(self._key(digest, byte_range, context_key))
+        if data is None: return None
+        try:
+            summary = json.loads(data)
+            if summary.get('sign_time'):
+                summary['sign_time'] = datetime.fromisoformat(summary['sign_time'])
+            return summary
+        except (ValueError, TypeError):
+            return None
+
+    def store_summary(self, digest, byte_range, context_key, summary):
+        """Stores the summary of a freshly validated signature."""
+        serializable = dict(summary)
+        if isinstance(serializable.get('sign_time'), datetime):
+            serializable['sign_time'] = serializable['sign_time'].isoformat()
+        self.store.put(self._key(digest, byte_range, context_key), json.dumps(serializable).encode('utf-8'))
+
+    def lookup_modifications(self, digest):
+        """Returns the cached modification levels of every signature of a document, or None."""
+        data = self.store.get(f"{digest}:modifications")
+        if data is None: return None
+        try: return json.loads(data)
+        except ValueError: return None
+
+    def store_modifications(self, digest, levels):
+        """Stores the modification levels found by the difference analysis of a document."""
+        self.store.put(f"{digest}:modifications", json.dumps(levels).encode('utf-8'))
+
+    def flush(self):
+        """Persists pending access-time updates to disk."""
+        self.store.flush()
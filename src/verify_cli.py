@@ -0,0 +1,167 @@
+# verify_cli.py
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from signature_validator import SignatureDetails, ValidationSettings, iter_validated_signatures, analyze_modifications_at, SUSPICIOUS_MODIFICATION
+
+EXIT_OK, EXIT_INTEGRITY_FAILURE, EXIT_ERROR = 0, 1, 2
+RECORD_FIELDS = ('file', 'status') + SignatureDetails.SUMMARY_FIELDS + ('error',)
+FAILED_MODIFICATION_LEVELS = ('OTHER', SUSPICIOUS_MODIFICATION)
+
+def default_cache_dir():
+    """Returns the application's user cache directory, as GLib would, without importing it."""
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "gnomesign")
+
+def iter_pdf_files(paths):
+    """Yields the PDF files named on the command line, walking directories recursively in sorted order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith('.pdf'): yield os.path.join(root, name)
+        else:
+            yield path
+
+class ValidationLog(logging.Handler):
+    """
+    Collects the warnings pyHanko logs while validating (such as why a signer is not trusted, with a
+    traceback) as one-line messages, instead of letting them reach standard error.
+    """
+    def __init__(self):
+        """Initializes the handler with no messages."""
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        """Keeps a record's message, once however many times it is logged."""
+        message = record.getMessage()
+        if message not in self.messages: self.messages.append(message)
+
+    def take(self):
+        """Returns the messages collected since the last call, joined, or None."""
+        messages, self.messages = self.messages, []
+        return "; ".join(messages) or None
+
+    def __enter__(self):
+        logging.getLogger().addHandler(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        logging.getLogger().removeHandler(self)
+
+def verify_file(file_path, settings, deep=False):
+    """Worker entry point: validates every signature of one file and returns its records, each with the warnings logged while validating it."""
+    with ValidationLog() as log:
+        try:
+            records = []
+            for index, details in enumerate(iter_validated_signatures(file_path, settings=settings)):
+                record = details.to_summary()
+                if deep: record['modification_level'] = analyze_modifications_at(file_path, index)
+                record['error'] = log.take()
+                records.append(record)
+            return file_path, records, None
+        except Exception as e:
+            return file_path, [], str(e)
+
+def verify_files(file_paths, settings, workers, deep=False):
+    """
+    Verifies files on a pool of worker processes, yielding (file, records, error) as each one finishes.
+    Only a bounded number of files is queued at a time, so arbitrarily long inputs are streamed.
+    """
+    if workers <= 1:
+        for file_path in file_paths: yield verify_file(file_path, settings, deep)
+        return
+    # Forked workers inherit the imported modules, and the logging setup of ValidationLog.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+        pending, file_paths = set(), iter(file_paths)
+        for file_path in file_paths:
+            pending.add(executor.submit(verify_file, file_path, settings, deep))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done: yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done: yield future.result()
+
+def to_record(file_path, summary=None, error=None):
+    """
+    Builds one output record, with values converted to JSON/CSV friendly types: a signature's (status 'signed'),
+    or the file's if it has no signatures ('unsigned') or could not be processed ('error').
+    """
+    record = {'file': file_path, 'status': 'signed' if summary else 'error' if error else 'unsigned', 'error': error}
+    if summary:
+        record.update(summary)
+        if record.get('sign_time') is not None: record['sign_time'] = record['sign_time'].isoformat()
+    return record
+
+class RecordWriter:
+    """Streams records to a text stream as JSON lines or CSV rows, flushing after each document."""
+    def __init__(self, stream, output_format):
+        """Initializes the writer for the given stream and format ('jsonl' or 'csv')."""
+        self.stream = stream
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames=RECORD_FIELDS, extrasaction='ignore')
+            self.csv_writer.writeheader()
+
+    def write(self, record):
+        """Writes a single record."""
+        if self.csv_writer is None:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            row = dict(record)
+            if row.get('rect') is not None: row['rect'] = " ".join(f"{v:g}" for v in row['rect'])
+            self.csv_writer.writerow(row)
+
+    def flush(self):
+        """Flushes the underlying stream."""
+        self.stream.flush()
+
+def build_parser():
+    """Returns the argument parser of the verify command."""
+    parser = argparse.ArgumentParser(prog="gnomesign verify", description="Verify the digital signatures of PDF files without opening the GUI.",
+                                     epilog="Exit status is 1 if any signature fails the integrity check (its signed bytes were altered, or later changes are not allowed) "
+                                            "and 2 if a file could not be processed. Whether signers are trusted is reported in each record but does not affect it.")
+    parser.add_argument("paths", nargs="+", help="PDF files or directories to search recursively")
+    parser.add_argument("-f", "--format", choices=("jsonl", "csv"), default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument("-o", "--output", help="write the report to this file instead of standard output")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of worker processes (default: one per CPU core)")
+    parser.add_argument("--offline", action="store_true", help="validate against the local trust store only, never fetching from the network")
+    parser.add_argument("--trust-store", help="directory of trusted root and intermediate certificates")
+    parser.add_argument("--deep", action="store_true", help="also analyze modifications made after each signature (slow)")
+    parser.add_argument("--no-cache", action="store_true", help="do not cache CRL and OCSP responses on disk")
+    return parser
+
+def main(argv):
+    """Runs the verify command and returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    if args.offline and not args.trust_store:
+        print("gnomesign verify: --offline requires --trust-store", file=sys.stderr)
+        return EXIT_ERROR
+    settings = ValidationSettings(offline=args.offline, trust_store_dir=args.trust_store,
+                                  revocation_cache_dir=None if args.no_cache else os.path.join(default_cache_dir(), "revocation"))
+    stream = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    writer = RecordWriter(stream, args.format)
+    exit_code = EXIT_OK
+    try:
+        for file_path, summaries, error in verify_files(iter_pdf_files(args.paths), settings, args.jobs, args.deep):
+            if error is not None:
+                exit_code = EXIT_ERROR
+            if not summaries:
+                writer.write(to_record(file_path, error=error))
+            for summary in summaries:
+                writer.write(to_record(file_path, summary, summary.pop('error', None)))
+                if not summary['intact'] or summary.get('modification_level') in FAILED_MODIFICATION_LEVELS:
+                    exit_code = max(exit_code, EXIT_INTEGRITY_FAILURE)
+            writer.flush()
+    except KeyboardInterrupt:
+        return EXIT_ERROR
+    finally:
+        if stream is not sys.stdout: stream.close()
+    return exit_code
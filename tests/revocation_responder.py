@@ -0,0 +1,106 @@
+# revocation_responder.py
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509 import ocsp
+from cryptography.x509.oid import NameOID
+
+def _name(common_name):
+    return x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+
+class RevocationResponder:
+    """
+    A test CA whose signer certificate points at a CRL distribution point and an OCSP responder served
+    over HTTP on localhost. Every request is counted in crl_hits / ocsp_hits. The CRL and the OCSP
+    response are valid from an hour ago until `lifetime` from now.
+    """
+    def __init__(self, lifetime=timedelta(days=1)):
+        """Starts the HTTP server on a free port and issues the CA and signer certificates pointing at it."""
+        self.crl_hits, self.ocsp_hits = 0, 0
+        self.lifetime = lifetime
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.crl_url, self.ocsp_url = f"{self.base_url}/ca.crl", f"{self.base_url}/ocsp"
+        self._issue_certificates()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _issue_certificates(self):
+        """Issues a self-signed CA and a signer certificate carrying the CRL and OCSP URLs."""
+        now = datetime.now(timezone.utc)
+        self.ca_key = ec.generate_private_key(ec.SECP256R1())
+        self.ca_cert = (x509.CertificateBuilder().subject_name(_name("Test CA")).issuer_name(_name("Test CA"))
+                        .public_key(self.ca_key.public_key()).serial_number(1)
+                        .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=365))
+                        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+                        .add_extension(x509.KeyUsage(digital_signature=True, content_commitment=False, key_encipherment=False, data_encipherment=False,
+                                                     key_agreement=False, key_cert_sign=True, crl_sign=True, encipher_only=False, decipher_only=False), critical=True)
+                        .add_extension(x509.SubjectKeyIdentifier.from_public_key(self.ca_key.public_key()), critical=False)
+                        .sign(self.ca_key, hashes.SHA256()))
+        self.signer_key = ec.generate_private_key(ec.SECP256R1())
+        self.signer_cert = (x509.CertificateBuilder().subject_name(_name("Test Signer")).issuer_name(self.ca_cert.subject)
+                            .public_key(self.signer_key.public_key()).serial_number(1000)
+                            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=365))
+                            .add_extension(x509.KeyUsage(digital_signature=True, content_commitment=True, key_encipherment=False, data_encipherment=False,
+                                                         key_agreement=False, key_cert_sign=False, crl_sign=False, encipher_only=False, decipher_only=False), critical=True)
+                            .add_extension(x509.AuthorityKeyIdentifier.from_issuer_public_key(self.ca_key.public_key()), critical=False)
+                            .add_extension(x509.CRLDistributionPoints([x509.DistributionPoint([x509.UniformResourceIdentifier(self.crl_url)], None, None, None)]), critical=False)
+                            .add_extension(x509.AuthorityInformationAccess([x509.AccessDescription(x509.oid.AuthorityInformationAccessOID.OCSP,
+                                                                                                   x509.UniformResourceIdentifier(self.ocsp_url))]), critical=False)
+                            .sign(self.ca_key, hashes.SHA256()))
+
+    def ca_pem(self):
+        return self.ca_cert.public_bytes(serialization.Encoding.PEM)
+
+    def crl_der(self, this_update=None, next_update=None):
+        """Returns an empty CRL of the CA, valid from this_update to next_update (by default, from an hour ago for the lifetime)."""
+        now = datetime.now(timezone.utc)
+        builder = (x509.CertificateRevocationListBuilder().issuer_name(self.ca_cert.subject)
+                   .last_update(this_update or now - timedelta(hours=1)).next_update(next_update or now + self.lifetime))
+        return builder.sign(self.ca_key, hashes.SHA256()).public_bytes(serialization.Encoding.DER)
+
+    def ocsp_der(self, this_update=None, next_update=None):
+        """Returns a 'good' OCSP response for the signer certificate, signed by the CA (without nextUpdate if next_update is False)."""
+        now = datetime.now(timezone.utc)
+        next_update = now + self.lifetime if next_update is None else next_update or None
+        builder = ocsp.OCSPResponseBuilder().add_response(
+            cert=self.signer_cert, issuer=self.ca_cert, algorithm=hashes.SHA1(), cert_status=ocsp.OCSPCertStatus.GOOD,
+            this_update=this_update or now - timedelta(hours=1), next_update=next_update,
+            revocation_time=None, revocation_reason=None)
+        builder = builder.responder_id(ocsp.OCSPResponderEncoding.HASH, self.ca_cert).certificates([self.ca_cert])
+        return builder.sign(self.ca_key, hashes.SHA256()).public_bytes(serialization.Encoding.DER)
+
+    def _handler(self):
+        responder = self
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path != "/ca.crl": return self.send_error(404)
+                with responder._lock: responder.crl_hits += 1
+                self._reply(responder.crl_der(), "application/pkix-crl")
+
+            def do_POST(self):
+                if self.path != "/ocsp": return self.send_error(404)
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with responder._lock: responder.ocsp_hits += 1
+                self._reply(responder.ocsp_der(), "application/ocsp-response")
+
+            def log_message(self, *args): pass
+        return Handler
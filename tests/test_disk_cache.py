@@ -0,0 +1,37 @@
+# test_disk_cache.py
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from disk_cache import DiskCache
+
+class DiskCacheTest(unittest.TestCase):
+    """Blobs are written atomically and the index only when flushed, then shared with other instances."""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.cache = DiskCache(self.directory, max_bytes=1000)
+
+    def test_put_leaves_no_temporary_files(self):
+        for n in range(5): self.cache.put(f"key{n}", b"x" * 10)
+        self.assertEqual(self.cache.get("key3"), b"x" * 10)
+        self.assertFalse([name for name in os.listdir(self.directory) if name.endswith(".tmp")])
+
+    def test_index_is_written_on_flush(self):
+        self.cache.put("key", b"data")
+        self.assertFalse(os.path.exists(os.path.join(self.directory, DiskCache.INDEX_FILE)))
+        self.cache.flush()
+        self.assertEqual(DiskCache(self.directory, max_bytes=1000).get("key"), b"data")
+
+    def test_size_cap_applies_before_flush(self):
+        for n in range(5): self.cache.put(f"key{n}", b"x" * 300)
+        self.assertLessEqual(self.cache.total_size(), 1000)
+        self.assertIsNone(self.cache.get("key0"))
+        self.assertEqual(self.cache.get("key4"), b"x" * 300)
+
+if __name__ == "__main__":
+    unittest.main()
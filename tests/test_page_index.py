@@ -0,0 +1,39 @@
+# test_page_index.py
+import os
+import sys
+import unittest
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import fitz
+from pyhanko.pdf_utils.reader import PdfFileReader
+from page_index import PageIndex
+
+class PageTreeTest(unittest.TestCase):
+    """Only /Page leaves of the page tree are numbered, as MuPDF numbers them."""
+    def _index(self, extra_kid=None):
+        """Returns the PageIndex and MuPDF page count of a three-page PDF, with extra_kid (an object's source) appended to the root's /Kids."""
+        doc = fitz.open()
+        for _ in range(3): doc.new_page()
+        if extra_kid is not None:
+            pages_xref = int(doc.xref_get_key(doc.pdf_catalog(), "Pages")[1].split()[0])
+            xref = doc.get_new_xref(); doc.update_object(xref, extra_kid)
+            kids = doc.xref_get_key(pages_xref, "Kids")[1]
+            doc.xref_set_key(pages_xref, "Kids", kids[:-1] + f" {xref} 0 R]")
+        data = doc.tobytes(); doc.close()
+        mupdf_count = len(fitz.open(stream=data))
+        return PageIndex(PdfFileReader(BytesIO(data), strict=False)), mupdf_count
+
+    def test_pages_are_counted(self):
+        index, mupdf_count = self._index()
+        self.assertEqual(len(index), 3)
+        self.assertEqual(len(index), mupdf_count)
+
+    def test_kids_that_are_not_pages_are_skipped(self):
+        index, mupdf_count = self._index("<</Type /Annot /Subtype /Text /Rect [0 0 10 10]>>")
+        self.assertEqual(len(index), 3)
+        self.assertEqual(len(index), mupdf_count)
+
+if __name__ == "__main__":
+    unittest.main()
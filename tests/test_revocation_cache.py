@@ -0,0 +1,111 @@
+# test_revocation_cache.py
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import fitz
+from asn1crypto import crl, ocsp, x509 as asn1_x509
+from cryptography.hazmat.primitives import serialization
+from pyhanko.keys.internal import translate_pyca_cryptography_cert_to_asn1, translate_pyca_cryptography_key_to_asn1
+from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+from pyhanko.sign import signers
+from pyhanko_certvalidator.authority import AuthorityWithCert
+from pyhanko_certvalidator.registry import SimpleCertificateStore
+from revocation_cache import RevocationCache
+from revocation_responder import RevocationResponder
+from signature_validator import ValidationSettings, iter_validated_signatures
+
+def _asn1_cert(cert):
+    return asn1_x509.Certificate.load(cert.public_bytes(serialization.Encoding.DER))
+
+class RevocationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+class FetchOnceTest(RevocationTestCase):
+    """Validating a batch of documents signed under one CA fetches its CRL and OCSP response at most once."""
+    DOCUMENTS = 4
+
+    def _sign_documents(self, responder):
+        """Signs DOCUMENTS one-page PDFs with the responder's signer certificate and returns their paths."""
+        ca_cert, signer_cert = translate_pyca_cryptography_cert_to_asn1(responder.ca_cert), translate_pyca_cryptography_cert_to_asn1(responder.signer_cert)
+        signer = signers.SimpleSigner(signing_cert=signer_cert, signing_key=translate_pyca_cryptography_key_to_asn1(responder.signer_key),
+                                      cert_registry=SimpleCertificateStore.from_certs([signer_cert, ca_cert]))
+        paths = []
+        for n in range(self.DOCUMENTS):
+            doc = fitz.open(); doc.new_page().insert_text((72, 72), f"Document {n}")
+            path = os.path.join(self.directory, f"document{n}.pdf")
+            with open(path, 'wb') as f:
+                signers.sign_pdf(IncrementalPdfFileWriter(BytesIO(doc.tobytes())), signers.PdfSignatureMetadata(field_name="Signature"), signer=signer, output=f)
+            doc.close()
+            paths.append(path)
+        return paths
+
+    def test_batch_fetches_revocation_info_once(self):
+        with RevocationResponder() as responder:
+            trust_dir = os.path.join(self.directory, "trust")
+            os.makedirs(trust_dir)
+            with open(os.path.join(trust_dir, "ca.pem"), 'wb') as f: f.write(responder.ca_pem())
+            settings = ValidationSettings(trust_store_dir=trust_dir, revocation_cache_dir=os.path.join(self.directory, "revocation"))
+            for path in self._sign_documents(responder):
+                [details] = list(iter_validated_signatures(path, settings=settings))
+                self.assertTrue(details.intact)
+                self.assertTrue(details.trusted)
+                self.assertFalse(details.revoked)
+            self.assertGreater(responder.crl_hits + responder.ocsp_hits, 0)
+            self.assertLessEqual(responder.crl_hits, 1)
+            self.assertLessEqual(responder.ocsp_hits, 1)
+
+class FreshnessWindowTest(RevocationTestCase):
+    """RevocationCache serves a response only within its thisUpdate/nextUpdate window, and drops it otherwise."""
+    def setUp(self):
+        super().setUp()
+        self.cache = RevocationCache(self.directory)
+        self.responder = RevocationResponder()
+        self.addCleanup(self.responder.server.server_close)
+        self.now = datetime.now(timezone.utc)
+        self.signer, self.authority = _asn1_cert(self.responder.signer_cert), AuthorityWithCert(_asn1_cert(self.responder.ca_cert))
+
+    def _put_crl(self, **window):
+        self.cache.put_crl("http://ca/crl", crl.CertificateList.load(self.responder.crl_der(**window)))
+
+    def _put_ocsp(self, **window):
+        self.cache.put_ocsp(self.signer, self.authority, ocsp.OCSPResponse.load(self.responder.ocsp_der(**window)))
+
+    def test_current_crl_is_served(self):
+        self._put_crl()
+        self.assertIsNotNone(self.cache.get_crl("http://ca/crl"))
+
+    def test_expired_crl_is_dropped(self):
+        self._put_crl(this_update=self.now - timedelta(days=2), next_update=self.now - timedelta(minutes=1))
+        self.assertIsNone(self.cache.get_crl("http://ca/crl"))
+        self.assertIsNone(self.cache.store.get("crl:http://ca/crl"))
+
+    def test_crl_from_the_future_is_not_served(self):
+        self._put_crl(this_update=self.now + timedelta(hours=1), next_update=self.now + timedelta(days=1))
+        self.assertIsNone(self.cache.get_crl("http://ca/crl"))
+
+    def test_current_ocsp_response_is_served(self):
+        self._put_ocsp()
+        self.assertIsNotNone(self.cache.get_ocsp(self.signer, self.authority))
+
+    def test_expired_ocsp_response_is_dropped(self):
+        self._put_ocsp(this_update=self.now - timedelta(days=2), next_update=self.now - timedelta(minutes=1))
+        self.assertIsNone(self.cache.get_ocsp(self.signer, self.authority))
+
+    def test_ocsp_response_without_next_update_lasts_the_default_lifetime(self):
+        self.cache.DEFAULT_LIFETIME = timedelta(hours=2)
+        self._put_ocsp(this_update=self.now - timedelta(hours=1), next_update=False)
+        self.assertIsNotNone(self.cache.get_ocsp(self.signer, self.authority))
+        self.cache.DEFAULT_LIFETIME = timedelta(minutes=30)
+        self.assertIsNone(self.cache.get_ocsp(self.signer, self.authority))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# test_signature_details.py
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import fitz
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from pyhanko.keys.internal import translate_pyca_cryptography_cert_to_asn1, translate_pyca_cryptography_key_to_asn1
+from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+from pyhanko.sign import signers
+from pyhanko_certvalidator.registry import SimpleCertificateStore
+from signature_validator import SignatureDetails, ValidationSettings, iter_validated_signatures
+
+class LoadEmbeddedSignatureTest(unittest.TestCase):
+    """Details rebuilt from a cached summary re-open the full pyHanko signature from the file on demand."""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, "signed.pdf")
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Test Signer")])
+        now = datetime.now(timezone.utc)
+        cert = translate_pyca_cryptography_cert_to_asn1(
+            x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()).serial_number(7)
+            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=30)).sign(key, hashes.SHA256()))
+        signer = signers.SimpleSigner(signing_cert=cert, signing_key=translate_pyca_cryptography_key_to_asn1(key),
+                                      cert_registry=SimpleCertificateStore.from_certs([cert]))
+        doc = fitz.open(); doc.new_page().insert_text((72, 72), "Signed")
+        with open(self.path, 'wb') as f:
+            signers.sign_pdf(IncrementalPdfFileWriter(BytesIO(doc.tobytes())), signers.PdfSignatureMetadata(field_name="Signature1"), signer=signer, output=f)
+        doc.close()
+        settings = ValidationSettings(offline=True, revocation_cache_dir=os.path.join(self.directory, "revocation"))
+        [validated] = list(iter_validated_signatures(self.path, settings=settings))
+        self.details = SignatureDetails.from_summary(validated.to_cache_summary(), self.path, 0)
+
+    def test_summary_details_reopen_the_signature(self):
+        sig = self.details.load_embedded_signature()
+        self.assertIsNotNone(sig)
+        self.assertEqual(str(sig.field_name), "Signature1")
+        self.assertEqual(sig.signer_cert.subject.native['common_name'], self.details.signer_name)
+        self.assertEqual(str(sig.signer_cert.serial_number), self.details.serial)
+        self.assertEqual(sig.md_algorithm, 'sha256')
+
+    def test_signature_gone_from_the_file(self):
+        doc = fitz.open(); doc.new_page()
+        doc.save(self.path); doc.close()
+        self.assertIsNone(self.details.load_embedded_signature())
+
+    def test_details_without_a_file(self):
+        self.assertIsNone(SignatureDetails.from_summary(self.details.to_summary()).load_embedded_signature())
+
+if __name__ == "__main__":
+    unittest.main()
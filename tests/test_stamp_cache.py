@@ -0,0 +1,97 @@
+# test_stamp_cache.py
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from stamp_cache import StampCache, layout_skeleton
+from stamp_creator import HtmlStamp, StampAppearanceCache, pango_to_html
+from stamp_template import DEFAULT_TEMPLATES, compile_template
+
+BACKENDS = ('html', 'markup')
+
+def _certificate(common_name="Test Signer 2"):
+    """Returns a self-signed certificate to fill the templates with."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.now(timezone.utc)
+    return (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()).serial_number(1)
+            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=365)).sign(key, hashes.SHA256()))
+
+def stamp_content(backend, certificate, sign_time, template=DEFAULT_TEMPLATES[0][1]):
+    """Returns a stamp as the application keys it for a backend: its Pango markup, or the HTML converted from it."""
+    markup = compile_template(template).render(certificate, sign_time)
+    return markup if backend == 'markup' else pango_to_html(markup)
+
+class LayoutSkeletonTest(unittest.TestCase):
+    """Stamps of the default templates differing only in their date share one layout skeleton, with either backend."""
+    def setUp(self):
+        self.certificate = _certificate()
+        self.first, self.second = datetime(2026, 10, 17, 9, 30), datetime(2026, 11, 28, 17, 45)
+
+    def test_dates_are_masked_with_every_backend_and_default_template(self):
+        for backend in BACKENDS:
+            for name, template in DEFAULT_TEMPLATES:
+                with self.subTest(backend=backend, template=name):
+                    first, second = (stamp_content(backend, self.certificate, when, template) for when in (self.first, self.second))
+                    self.assertNotEqual(first, second)
+                    self.assertNotEqual(layout_skeleton(first), first)
+                    self.assertEqual(layout_skeleton(first), layout_skeleton(second))
+
+    def test_text_outside_tags_is_masked_and_tags_are_kept(self):
+        self.assertEqual(layout_skeleton('12 <span size="9pt">at 10:45</span> on 24-12'), '00 <span size="9pt">at 00:00</span> on 00-00')
+
+class StampCacheTest(unittest.TestCase):
+    """Dated stamps leave only their skeleton's layout scale on disk; digit-free stamps are stored whole."""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.cache = StampCache(self.directory)
+        self.certificate = _certificate()
+
+    def test_dated_stamps_store_only_the_layout_scale(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                first, second = (stamp_content(backend, self.certificate, when) for when in (datetime(2026, 10, 17), datetime(2026, 10, 18)))
+                self.cache.store_stamp(first, 200, 80, b"%PDF" + b"0" * 100000, 0.75)
+                self.assertIsNone(self.cache.lookup(first, 200, 80))
+                self.assertEqual(self.cache.lookup_layout_scale(second, 200, 80), 0.75)
+        self.cache.flush()
+        self.assertLess(self.cache.stats()['bytes'], 1000)
+
+    def test_digit_free_stamps_are_stored_whole(self):
+        self.cache.store_stamp("<b>Signed</b>", 200, 80, b"%PDF-stamp", 0.75)
+        self.assertEqual(self.cache.lookup("<b>Signed</b>", 200, 80), b"%PDF-stamp")
+
+class AppearanceSkeletonTest(unittest.TestCase):
+    """The preview fallback finds the appearance of the same stamp shown with an earlier date, with either backend."""
+    def test_earlier_date_is_found_by_skeleton(self):
+        certificate = _certificate()
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                appearances = StampAppearanceCache(backend=backend)
+                earlier = appearances._add(HtmlStamp(stamp_content(backend, certificate, datetime(2026, 10, 17)), 200, 80, b"%PDF"))
+                appearances._add(HtmlStamp(stamp_content(backend, _certificate("Someone Else"), datetime(2026, 10, 17)), 200, 80, b"%PDF"))
+                self.assertEqual(appearances.with_skeleton(stamp_content(backend, certificate, datetime(2026, 10, 18))), [earlier])
+
+class MarkupFallbackTest(unittest.TestCase):
+    """Markup the base-14 fonts cannot encode is laid out by the HTML engine instead of failing."""
+    def test_unencodable_text_falls_back_to_html(self):
+        stamp = HtmlStamp("Firmado por: <b>山田太郎</b>", 200, 80, backend='markup')
+        self.assertTrue(stamp.pdf_bytes.startswith(b"%PDF"))
+        self.assertIsNotNone(stamp.layout_scale)
+
+    def test_encodable_text_is_laid_out_directly(self):
+        stamp = HtmlStamp("Firmado por: <b>José Muñoz</b>", 200, 80, backend='markup')
+        self.assertLess(len(stamp.pdf_bytes), 4000)
+
+if __name__ == "__main__":
+    unittest.main()